@@ -0,0 +1,115 @@
+# benchmarks/bench_discord_calls.py
+"""
+Benchmark liczby wywołań API Discorda na cykl aktualizacji.
+
+Uruchamia cykle bota (tablica bugów w obu trybach, dzienny raport, tablica wyników) na
+sztucznym kliencie Discorda (fake_discord) i sztucznej Jirze (fake_jira_server) i podaje dla
+każdego cyklu liczbę wywołań według operacji, liczbę wywołań wstrzymanych przez symulowane
+limity zapytań oraz czas, jaki zajęłyby same wywołania Discorda (zegar wirtualny).
+
+Tablica bugów jest mierzona w trzech cyklach: pierwsze wysłanie (z czyszczeniem starych
+wiadomości), cykl bez zmian w Jirze i cykl po zmianie bugów.
+
+Uruchomienie (z katalogu głównego projektu):
+    python benchmarks/bench_discord_calls.py [--bugs 200] [--done 2000] [--latency-ms 100] [--json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_jira_server import FakeJiraData, start_fake_jira  # noqa: E402
+
+BUGS_CHANNEL_ID = 101
+REPORTS_CHANNEL_ID = 102
+OLD_BUG_MESSAGES = 3
+# Odstęp między cyklami na zegarze wirtualnym (jak domyślny UPDATE_INTERVAL)
+CYCLE_INTERVAL = 300
+
+
+async def run_cycles(server, args):
+    """Wykonuje cykle i zwraca podsumowania wywołań Discorda dla każdego z nich"""
+    # Moduły bota importowane dopiero po ustawieniu zmiennych środowiskowych (plik stanu, Jira)
+    import discord
+    from bot_config import set_board_mode, set_channel_id
+    from fake_discord import FakeDiscordClient
+    from leaderboard import send_leaderboard_to_channel
+    from message_updater import update_bugs_message
+    from reports import send_daily_report
+
+    client = FakeDiscordClient(latency=args.latency_ms / 1000)
+    bugs_channel = client.add_channel(BUGS_CHANNEL_ID, "bugi")
+    client.add_channel(REPORTS_CHANNEL_ID, "raporty")
+    set_channel_id('reports', REPORTS_CHANNEL_ID)
+
+    results = []
+
+    async def cycle(name, action):
+        client.advance(CYCLE_INTERVAL)
+        client.reset_calls()
+        success = await action()
+        results.append({"cycle": name, "success": bool(success), **client.summary()})
+
+    for mode in ('full', 'paginated'):
+        set_board_mode(mode)
+        set_channel_id('bugs', BUGS_CHANNEL_ID)  # Czyści zapamiętane ID wiadomości tablicy
+        bugs_channel.messages.clear()
+        for _ in range(OLD_BUG_MESSAGES):
+            bugs_channel.add_message(embeds=[discord.Embed(title="🐞 Aktualna lista bugów")])
+
+        server.data = FakeJiraData(bugs=args.bugs, done=args.done, seed=0)
+        await cycle(f"bugs[{mode}]: pierwsze wysłanie", lambda: update_bugs_message(client))
+        await cycle(f"bugs[{mode}]: bez zmian", lambda: update_bugs_message(client))
+        server.data = FakeJiraData(bugs=args.bugs, done=args.done, seed=1)
+        await cycle(f"bugs[{mode}]: po zmianie bugów", lambda: update_bugs_message(client))
+
+    await cycle("raport dzienny", lambda: send_daily_report(client))
+    await cycle("tablica wyników", lambda: send_leaderboard_to_channel(client, REPORTS_CHANNEL_ID))
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Liczba wywołań API Discorda na cykl aktualizacji")
+    parser.add_argument("--bugs", type=int, default=200, help="Liczba otwartych bugów w sztucznej Jirze")
+    parser.add_argument("--done", type=int, default=2000, help="Liczba ukończonych zadań w sztucznej Jirze")
+    parser.add_argument("--latency-ms", type=float, default=100, help="Czas odpowiedzi Discorda (ms)")
+    parser.add_argument("--json", action="store_true", help="Wypisz wyniki jako JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix="bench_discord_")
+    server = start_fake_jira(data=FakeJiraData(bugs=args.bugs, done=args.done))
+    os.environ.update({
+        'JIRA_SERVER': server.url, 'JIRA_USERNAME': 'bench', 'JIRA_API_TOKEN': 'bench', 'JIRA_PROJECT': 'BENCH',
+        'BOT_STATE_FILE': os.path.join(workdir, 'bot_state.json'),
+        'COMPLETION_LOG_FILE': os.path.join(workdir, 'completions.log'),
+        # Tablica wyników mierzona jest osobno, a nie jako część raportu dziennego
+        'LEADERBOARD_WEEKLY_DAY': '7',
+    })
+
+    try:
+        results = asyncio.run(run_cycles(server, args))
+    finally:
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"{'Cykl':<34} {'wywołania':>9} {'limit':>6} {'czekanie':>9} {'czas':>8}  operacje")
+    for result in results:
+        operations = ", ".join(f"{name}={count}" for name, count in sorted(result["operations"].items()))
+        flag = "" if result["success"] else "  (niepowodzenie)"
+        print(f"{result['cycle']:<34} {result['calls']:>9} {result['rate_limited']:>6} "
+              f"{result['waited_seconds']:>8.2f}s {result['elapsed_seconds']:>7.2f}s  {operations}{flag}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
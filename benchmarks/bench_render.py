@@ -0,0 +1,155 @@
+# benchmarks/bench_render.py
+"""
+Benchmark renderowania i agregacji na sztucznych zadaniach (fake_issues).
+
+Mierzy czas (najlepszy z kilku powtórzeń) i szczytowe zużycie pamięci (tracemalloc) dla:
+tablicy bugów (create_bugs_embeds), raportu ukończonych zadań (create_completed_tasks_report),
+tablicy wyników (create_leaderboard_embed) i agregacji statystyk z fetch_user_statistics
+(aggregate_user_statistics).
+
+Wyniki można zapisać jako punkt odniesienia (--save-baseline). Kolejne uruchomienia porównują
+się z nim i kończą kodem 1, jeśli czas lub pamięć przekroczą punkt odniesienia więcej niż
+--tolerance razy. Punkt odniesienia zależy od maszyny - zapisuj go tam, gdzie potem porównujesz.
+
+Uruchomienie (z katalogu głównego projektu):
+    python benchmarks/bench_render.py [--sizes 100 1000 10000 100000] [--save-baseline] [--tolerance 1.5]
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discord_embeds import create_bugs_embeds, create_completed_tasks_report  # noqa: E402
+from fake_issues import generate_raw_issues, make_assignees, name_mapping_env, to_issues  # noqa: E402
+from leaderboard import aggregate_user_statistics, create_leaderboard_embed  # noqa: E402
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+ASSIGNEES = 25
+JIRA_SERVER = "https://jira.example.com"
+
+
+def measure_time(func: Callable, repeat: int) -> float:
+    """Zwraca najlepszy czas wykonania funkcji w milisekundach"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def measure_peak_memory(func: Callable) -> float:
+    """Zwraca szczytową ilość pamięci zaalokowanej przez funkcję w KiB"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        func()
+        return (tracemalloc.get_traced_memory()[1] - before) / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def build_cases(size: int) -> List[Tuple[str, Callable]]:
+    """Przygotowuje dane (poza pomiarem) i zwraca mierzone funkcje"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    bugs = to_issues(generate_raw_issues(size, seed=size, issue_type="Bug", assignees=ASSIGNEES))
+    done = to_issues(generate_raw_issues(size, seed=size + 1, assignees=ASSIGNEES, resolved_within_days=30, now=now))
+    stats = aggregate_user_statistics(done)
+
+    return [
+        ("create_bugs_embeds", lambda: create_bugs_embeds(bugs)),
+        ("create_completed_tasks_report",
+         lambda: create_completed_tasks_report(done, now - datetime.timedelta(days=30), now, JIRA_SERVER)),
+        ("aggregate_user_statistics", lambda: aggregate_user_statistics(done)),
+        ("create_leaderboard_embed", lambda: create_leaderboard_embed(stats, 30)),
+    ]
+
+
+def run(sizes: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    """Wykonuje wszystkie pomiary i zwraca wyniki w postaci {"przypadek@rozmiar": {"ms", "peak_kib"}}"""
+    results = {}
+    for size in sizes:
+        print(f"\n{size} zadań")
+        for name, func in build_cases(size):
+            # Duże rozmiary mierzone są raz - jedno wykonanie trwa wystarczająco długo
+            ms = measure_time(func, repeat if size < 100_000 else 1)
+            peak_kib = measure_peak_memory(func)
+            results[f"{name}@{size}"] = {"ms": round(ms, 3), "peak_kib": round(peak_kib, 1)}
+            print(f"  {name:<32} {ms:10.2f} ms {peak_kib:12.1f} KiB")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """
+    Porównuje wyniki z punktem odniesienia.
+
+    Returns:
+        List[str]: Opisy regresji (pusta lista - brak regresji)
+    """
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric, unit in (("ms", "ms"), ("peak_kib", "KiB")):
+            if reference[metric] > 0 and result[metric] > reference[metric] * tolerance:
+                regressions.append(f"{key}: {metric} {result[metric]:.1f} {unit} "
+                                   f"(punkt odniesienia {reference[metric]:.1f} {unit}, "
+                                   f"×{result[metric] / reference[metric]:.2f})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark renderowania i agregacji na sztucznych zadaniach")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Liczby zadań")
+    parser.add_argument("--repeat", type=int, default=3, help="Liczba powtórzeń pomiaru czasu")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Plik z punktem odniesienia (JSON)")
+    parser.add_argument("--save-baseline", action="store_true", help="Zapisz wyniki jako punkt odniesienia")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Ile razy wynik może przekroczyć punkt odniesienia (domyślnie 1.5)")
+    args = parser.parse_args()
+
+    # Komunikaty renderowania nie są częścią pomiaru
+    logging.basicConfig(level=logging.WARNING)
+    os.environ['NAME_MAPPING'] = name_mapping_env(make_assignees(ASSIGNEES))
+
+    results = run(args.sizes, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nZapisano punkt odniesienia: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("\nBrak punktu odniesienia - uruchom z --save-baseline, aby go zapisać")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nRegresje (tolerancja ×{args.tolerance}):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nBrak regresji względem {args.baseline} (tolerancja ×{args.tolerance})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# benchmarks/bench_stats_engine.py
+"""
+Benchmark silnika statystyk tablicy wyników.
+
+Porównuje klasyczne zliczanie zadań (aggregate_user_statistics) z odczytem
+z tablicy liczników (sumy prefiksowe) i z silnikiem kolumnowym (insight_stats),
+w wersji z numpy i w czystym Pythonie.
+
+Uruchomienie (z katalogu głównego projektu):
+    python benchmarks/bench_stats_engine.py [liczba_zadań ...]
+"""
+import datetime
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stats_engine  # noqa: E402
+from completion_counters import CompletionCounterTable  # noqa: E402
+from completion_log import issue_key_hash  # noqa: E402
+from leaderboard import aggregate_user_statistics  # noqa: E402
+
+USERS = 25
+TYPES = ["Task", "Bug", "Story", "Sub-task", "Improvement"]
+HISTORY_DAYS = 400
+WINDOWS = [7, 30, 90, 365]
+
+
+def fake_completions(count: int, today: datetime.date):
+    """Generuje sztuczne ukończone zadania w formacie zbliżonym do obiektów Issue z Jiry"""
+    rng = random.Random(count)
+    users = [SimpleNamespace(displayName=f"Użytkownik {i}", accountId=f"acc-{i}") for i in range(USERS)]
+    tasks = []
+    for i in range(count):
+        day = today - datetime.timedelta(days=rng.randrange(HISTORY_DAYS))
+        tasks.append(SimpleNamespace(key=f"BENCH-{i}", day=day, fields=SimpleNamespace(
+            issuetype=SimpleNamespace(name=rng.choice(TYPES)),
+            assignee=rng.choice(users),
+        )))
+    return tasks
+
+
+def timed(func, repeat: int = 5) -> float:
+    """Zwraca najlepszy czas wykonania funkcji w milisekundach"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(count: int):
+    today = datetime.date.today()
+    tasks = fake_completions(count, today)
+
+    table = CompletionCounterTable(today)
+    build_ms = timed(lambda: [table.record(issue_key_hash(t.key), t.day, t.fields.assignee.displayName, t.fields.assignee.accountId,
+                                           t.fields.issuetype.name) for t in tasks], repeat=1)
+
+    def legacy():
+        for days in WINDOWS:
+            start = today - datetime.timedelta(days=days)
+            aggregate_user_statistics([t for t in tasks if t.day >= start])
+
+    def prefix_sums():
+        for days in WINDOWS:
+            table.window_stats(today - datetime.timedelta(days=days), today)
+
+    def insights():
+        for days in WINDOWS:
+            table.insight_stats(days, today)
+
+    results = [("zliczanie zadań (dict)", timed(legacy, repeat=1)), ("sumy prefiksowe", timed(prefix_sums))]
+
+    numpy_available = stats_engine.np is not None
+    for use_numpy in ([True, False] if numpy_available else [False]):
+        stats_engine.USE_NUMPY = use_numpy
+        label = "silnik kolumnowy (numpy)" if use_numpy else "silnik kolumnowy (python)"
+        results.append((label, timed(insights)))
+    stats_engine.USE_NUMPY = None
+
+    print(f"\n{count} zadań, okna {WINDOWS} dni (budowa tablicy: {build_ms:.1f} ms)")
+    for label, ms in results:
+        print(f"  {label:<28} {ms:10.2f} ms")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        run(size)
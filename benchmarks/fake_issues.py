@@ -0,0 +1,146 @@
+# benchmarks/fake_issues.py
+"""
+Generator realistycznych, sztucznych zadań z Jiry do benchmarków i testów obciążeniowych.
+
+Zadania są tworzone w formacie odpowiedzi REST API Jiry (słowniki "raw"), więc mogą być
+zwracane przez sztuczny serwer Jiry albo zamienione na obiekty Issue biblioteki jira
+(to_issues) i przekazane bezpośrednio do funkcji renderujących.
+"""
+import datetime
+import random
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
+from jira.resources import Issue
+
+# Statusy otwartych bugów i zadań
+OPEN_STATUSES = ("Do zrobienia", "W toku", "Code review", "Testy", "Zablokowane", "Gotowe do wdrożenia")
+DONE_STATUS = "Done"
+
+# Typy zadań (z wagami zbliżonymi do typowego projektu)
+ISSUE_TYPES = ("Task", "Bug", "Story", "Sub-task", "Improvement", "Epic")
+ISSUE_TYPE_WEIGHTS = (35, 25, 15, 15, 8, 2)
+
+PRIORITIES = ("Highest", "High", "Medium", "Low", "Lowest")
+
+FIRST_NAMES = ("Łukasz", "Paweł", "Michał", "Jędrzej", "Bartłomiej", "Małgorzata", "Zuzanna", "Agnieszka",
+               "Grzegorz", "Józef", "Żaneta", "Wojciech", "Łucja", "Przemysław", "Jolanta", "Sławomir")
+LAST_NAMES = ("Żółkiewski", "Wiśniewski", "Kołodziej", "Dąbrowska", "Szczęsny", "Gęślarz", "Wójcik", "Łęcki",
+              "Śliwińska", "Kaczmarczyk", "Zając", "Król", "Pietrzak", "Grabowski", "Jabłońska", "Ćwik")
+
+SUMMARY_WORDS = ("błąd", "zapisywania", "użytkownika", "płatności", "żądania", "wyświetlania", "powiadomień",
+                 "ścieżki", "źródła", "konfiguracji", "logowania", "raportu", "ładowania", "wydajności",
+                 "przycisku", "formularza", "zamówienia", "faktury", "eksportu", "synchronizacji", "nie",
+                 "działa", "po", "zmianie", "hasła", "w", "module", "rozliczeń", "przy", "dużej", "liczbie",
+                 "rekordów", "źle", "liczone", "sumy", "zniżek", "gdy", "koszyk", "jest", "pusty")
+
+# Format dat zwracanych przez API Jiry
+JIRA_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.000+0000'
+
+
+def strip_diacritics(text: str) -> str:
+    """Zamienia polskie znaki na ich odpowiedniki bez znaków diakrytycznych"""
+    decomposed = unicodedata.normalize('NFKD', text.replace('ł', 'l').replace('Ł', 'L'))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def make_assignees(count: int, seed: int = 0, diacritics: bool = True) -> List[Dict]:
+    """
+    Tworzy pulę osób przypisanych do zadań (pola assignee w formacie Jiry).
+
+    Args:
+        count (int): Liczba osób
+        seed (int): Ziarno generatora
+        diacritics (bool): Czy nazwy mają zawierać polskie znaki
+
+    Returns:
+        List[Dict]: Słowniki z displayName i accountId
+    """
+    rng = random.Random(seed)
+    assignees = []
+    used = set()
+    while len(assignees) < count:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in used:
+            name = f"{name} {len(assignees)}"
+        used.add(name)
+        assignees.append({
+            "displayName": name if diacritics else strip_diacritics(name),
+            "accountId": f"5b10ac8d82e05b22cc7d{len(assignees):04d}"
+        })
+    return assignees
+
+
+def name_mapping_env(assignees: Sequence[Dict], share: float = 0.5) -> str:
+    """
+    Buduje wartość NAME_MAPPING dla części puli osób (pełna nazwa -> imię),
+    żeby benchmark obejmował też mapowanie imion.
+
+    Args:
+        assignees (Sequence[Dict]): Pula osób z make_assignees
+        share (float): Jaka część osób ma mapowanie
+
+    Returns:
+        str: Wartość zmiennej NAME_MAPPING
+    """
+    mapped = assignees[:int(len(assignees) * share)]
+    return ";".join(f"{person['displayName']}:{person['displayName'].split()[0]}" for person in mapped)
+
+
+def generate_raw_issues(count: int, seed: int = 0, project: str = "BENCH", issue_type: Optional[str] = None,
+                        statuses: Sequence[str] = OPEN_STATUSES, assignees: int = 25,
+                        unassigned_ratio: float = 0.1, summary_words: Sequence[int] = (3, 14),
+                        diacritics: bool = True, resolved_within_days: Optional[int] = None,
+                        now: Optional[datetime.datetime] = None, first_number: int = 1) -> List[Dict]:
+    """
+    Generuje zadania w formacie odpowiedzi API Jiry.
+
+    Args:
+        count (int): Liczba zadań
+        seed (int): Ziarno generatora (te same argumenty dają te same zadania)
+        project (str): Klucz projektu
+        issue_type (str, optional): Stały typ zadań (np. 'Bug'); domyślnie losowany z ISSUE_TYPES
+        statuses (Sequence[str]): Statusy otwartych zadań
+        assignees (int): Liczba różnych osób przypisanych do zadań
+        unassigned_ratio (float): Jaka część zadań jest nieprzypisana
+        summary_words (Sequence[int]): Minimalna i maksymalna liczba słów tytułu
+        diacritics (bool): Czy tytuły i nazwy osób mają zawierać polskie znaki
+        resolved_within_days (int, optional): Jeśli podano, zadania są ukończone (status Done)
+            z datą rozwiązania z ostatnich tylu dni
+        now (datetime.datetime, optional): Chwila odniesienia dla dat (domyślnie teraz, UTC)
+        first_number (int): Numer pierwszego zadania (klucze kolejnych zbiorów nie powinny się powtarzać)
+
+    Returns:
+        List[Dict]: Zadania ("key", "id", "fields")
+    """
+    rng = random.Random(seed)
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    # Ten sam zespół niezależnie od ziarna zadań (zgodny z name_mapping_env(make_assignees(n)))
+    people = make_assignees(assignees, 0, diacritics)
+    words = SUMMARY_WORDS if diacritics else tuple(strip_diacritics(word) for word in SUMMARY_WORDS)
+
+    issues = []
+    for number in range(first_number, first_number + count):
+        summary = " ".join(rng.choice(words) for _ in range(rng.randint(*summary_words))).capitalize()
+        created = now - datetime.timedelta(days=rng.uniform(0, 400))
+        fields = {
+            "summary": summary,
+            "issuetype": {"name": issue_type or rng.choices(ISSUE_TYPES, ISSUE_TYPE_WEIGHTS)[0]},
+            "priority": {"name": rng.choice(PRIORITIES)},
+            "assignee": None if rng.random() < unassigned_ratio else dict(rng.choice(people)),
+            "created": created.strftime(JIRA_DATE_FORMAT),
+        }
+        if resolved_within_days is not None:
+            resolved = now - datetime.timedelta(seconds=rng.uniform(0, resolved_within_days * 86400))
+            fields["status"] = {"name": DONE_STATUS}
+            fields["resolutiondate"] = resolved.strftime(JIRA_DATE_FORMAT)
+        else:
+            fields["status"] = {"name": rng.choice(statuses)}
+            fields["resolutiondate"] = None
+        issues.append({"key": f"{project}-{number}", "id": str(10000 + number), "fields": fields})
+    return issues
+
+
+def to_issues(raw_issues: Sequence[Dict]) -> List[Issue]:
+    """Zamienia zadania w formacie API na obiekty Issue biblioteki jira (jak z search_issues)"""
+    return [Issue({}, None, raw=raw) for raw in raw_issues]
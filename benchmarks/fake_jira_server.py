@@ -0,0 +1,393 @@
+# benchmarks/fake_jira_server.py
+"""
+Lokalny, sztuczny serwer REST API Jiry do testów obciążeniowych i strojenia (bez sieci).
+
+Obsługuje endpointy używane przez bota: /rest/api/2/serverInfo, /field, /myself, /search
+(startAt, maxResults, fields, total) oraz /rest/agile/1.0/board i /board/{id}/sprint.
+Dane pochodzą z generatora fake_issues: otwarte bugi i zadania ukończone w ostatnich dniach.
+Zapytania JQL są rozpoznawane w uproszczeniu - zbiór wybierany jest po "status = Done"
+/ "status changed to Done" (zadania ukończone) albo "issuetype = Bug" (bugi), a daty w
+cudzysłowie po >=, >, AFTER i <=, <, BEFORE zawężają datę rozwiązania.
+
+Opóźnienie, odsetek błędów 500, odsetek odpowiedzi 429 (z nagłówkiem Retry-After) i limit
+rozmiaru strony są konfigurowalne. Błędy wstrzykiwane są tylko do zapytań o dane (search,
+board, sprint). Liczniki zapytań są dostępne pod /_fake/stats (JSON) i wypisywane po Ctrl+C.
+
+Uruchomienie (z katalogu głównego projektu):
+    python benchmarks/fake_jira_server.py [--port 8089] [--bugs 200] [--done 2000] [--latency-ms 150]
+        [--jitter-ms 50] [--error-rate 0.01] [--rate-limit-rate 0.02] [--max-page-size 100]
+
+Bot kieruje się na serwer przez zmienne środowiskowe (dowolny login i token):
+    JIRA_SERVER=http://127.0.0.1:8089 JIRA_USERNAME=bench JIRA_API_TOKEN=bench JIRA_PROJECT=BENCH
+"""
+import argparse
+import bisect
+import datetime
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_issues import JIRA_DATE_FORMAT, PRIORITIES, generate_raw_issues  # noqa: E402
+
+# Domyślny limit rozmiaru strony wyników (jak w Jira Cloud)
+DEFAULT_MAX_PAGE_SIZE = 100
+DEFAULT_PAGE_SIZE = 50
+
+# Pola zwracane przez /rest/api/2/field (klient jira używa ich do tłumaczenia nazw pól)
+FIELDS = [
+    {"id": field_id, "name": name, "custom": False, "clauseNames": [field_id]}
+    for field_id, name in (("summary", "Summary"), ("status", "Status"), ("assignee", "Assignee"),
+                           ("issuetype", "Issue Type"), ("priority", "Priority"), ("created", "Created"),
+                           ("resolutiondate", "Resolved"))
+]
+
+_LOWER_BOUND = re.compile(r'(?:>=|>|\bAFTER)\s*"([^"]+)"', re.IGNORECASE)
+_UPPER_BOUND = re.compile(r'(?:<=|<|\bBEFORE)\s*"([^"]+)"', re.IGNORECASE)
+_DONE_QUERY = re.compile(r'status\s*(?:=|changed\s+to)\s*"?Done"?', re.IGNORECASE)
+_BUG_QUERY = re.compile(r'issuetype\s*=\s*"?Bug"?', re.IGNORECASE)
+
+
+def _parse_jql_date(value: str) -> Optional[datetime.datetime]:
+    """Zamienia datę z JQL ("YYYY-MM-DD" lub "YYYY-MM-DD HH:MM") na datetime w UTC"""
+    for date_format in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.datetime.strptime(value.strip(), date_format).replace(tzinfo=datetime.timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+class FakeJiraData:
+    """Wygenerowany zbiór danych sztucznej Jiry: bugi, ukończone zadania, tablice i sprinty"""
+
+    def __init__(self, project: str = "BENCH", bugs: int = 200, done: int = 2000, days: int = 30,
+                 assignees: int = 25, boards: int = 2, seed: int = 0):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.project = project
+
+        # Bugi w kolejności z zapytania bota: status rosnąco, priorytet malejąco
+        priority_rank = {name: rank for rank, name in enumerate(PRIORITIES)}
+        self.bugs = sorted(
+            generate_raw_issues(bugs, seed=seed, project=project, issue_type="Bug", assignees=assignees, now=now),
+            key=lambda raw: (raw["fields"]["status"]["name"], priority_rank[raw["fields"]["priority"]["name"]]))
+
+        # Ukończone zadania posortowane według daty rozwiązania (wyszukiwanie zakresu przez bisect)
+        done_issues = generate_raw_issues(done, seed=seed + 1, project=project, assignees=assignees,
+                                          resolved_within_days=days, now=now, first_number=bugs + 1)
+        resolved = [(datetime.datetime.strptime(raw["fields"]["resolutiondate"], JIRA_DATE_FORMAT)
+                     .replace(tzinfo=datetime.timezone.utc), raw) for raw in done_issues]
+        resolved.sort(key=lambda item: item[0])
+        self.done_dates = [item[0] for item in resolved]
+        self.done = [item[1] for item in resolved]
+
+        self.boards = [{"id": board_id, "name": f"Tablica {project} {board_id}", "type": "scrum"}
+                       for board_id in range(1, boards + 1)]
+        self.sprints = {
+            board["id"]: [
+                {"id": board["id"] * 100 + number, "name": f"{project} Sprint {number}",
+                 "state": "closed" if number < 3 else "active", "originBoardId": board["id"]}
+                for number in range(1, 4)
+            ]
+            for board in self.boards
+        }
+
+    def search(self, jql: str) -> List[Dict]:
+        """
+        Zwraca zadania pasujące do (uproszczonego) zapytania JQL.
+
+        Args:
+            jql (str): Zapytanie JQL
+
+        Returns:
+            List[Dict]: Zadania w formacie API
+        """
+        if _DONE_QUERY.search(jql):
+            lower = _LOWER_BOUND.search(jql)
+            upper = _UPPER_BOUND.search(jql)
+            lower_date = _parse_jql_date(lower.group(1)) if lower else None
+            upper_date = _parse_jql_date(upper.group(1)) if upper else None
+            start = bisect.bisect_left(self.done_dates, lower_date) if lower_date else 0
+            end = bisect.bisect_right(self.done_dates, upper_date) if upper_date else len(self.done)
+            return self.done[start:end]
+        if _BUG_QUERY.search(jql):
+            return self.bugs
+        return self.bugs + self.done
+
+
+class FakeJiraServer(ThreadingHTTPServer):
+    """
+    Serwer HTTP sztucznej Jiry (każde zapytanie w osobnym wątku, więc opóźnienia
+    nakładają się jak w prawdziwym serwerze) z wstrzykiwaniem opóźnień i błędów.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], data: FakeJiraData, latency_ms: float = 0,
+                 jitter_ms: float = 0, error_rate: float = 0, rate_limit_rate: float = 0,
+                 retry_after: int = 1, max_page_size: int = DEFAULT_MAX_PAGE_SIZE, seed: int = 0,
+                 verbose: bool = False):
+        super().__init__(address, FakeJiraHandler)
+        self.data = data
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.max_page_size = max_page_size
+        self.verbose = verbose
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def url(self) -> str:
+        """Adres serwera do ustawienia w JIRA_SERVER"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        """Zeruje liczniki zapytań"""
+        with self._lock:
+            self._requests = Counter()
+            self._statuses = Counter()
+            self._issues_served = 0
+            self._started = time.monotonic()
+
+    def stats(self) -> Dict:
+        """
+        Zwraca liczniki zapytań od uruchomienia (lub ostatniego reset_stats).
+
+        Returns:
+            Dict: Zapytania według endpointu, odpowiedzi według kodu, liczba zwróconych zadań i czas
+        """
+        with self._lock:
+            return {
+                "requests": dict(self._requests),
+                "total_requests": sum(self._requests.values()),
+                "statuses": {str(status): count for status, count in self._statuses.items()},
+                "issues_served": self._issues_served,
+                "elapsed_seconds": round(time.monotonic() - self._started, 3),
+            }
+
+    def record(self, endpoint: str, status: int, issues: int = 0):
+        with self._lock:
+            self._requests[endpoint] += 1
+            self._statuses[status] += 1
+            self._issues_served += issues
+
+    def draw_fault(self) -> Optional[int]:
+        """Losuje wstrzykiwany błąd: 429, 500 albo None"""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+    def delay(self) -> float:
+        """Losuje opóźnienie odpowiedzi w sekundach"""
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        return (self.latency_ms + jitter) / 1000
+
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    """Obsługa endpointów REST API Jiry używanych przez bota"""
+    server: FakeJiraServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        # Lista pól może przyjść jako kilka parametrów fields (requests tak koduje listy)
+        params = {key: ','.join(values) if key == 'fields' else values[-1]
+                  for key, values in parse_qs(url.query).items()}
+        self._dispatch(url.path, params)
+
+    def do_POST(self):
+        # Klient jira może wyszukiwać przez POST (use_post=True) - parametry są wtedy w treści
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            params = {}
+        self._dispatch(urlparse(self.path).path, params)
+
+    def _dispatch(self, path: str, params: Dict):
+        path = path.rstrip('/')
+        if path == '/_fake/stats':
+            self._send_json(200, self.server.stats())
+            return
+
+        if path == '/rest/api/2/serverInfo':
+            endpoint, body = 'serverInfo', {
+                "baseUrl": self.server.url, "version": "9.12.0", "versionNumbers": [9, 12, 0],
+                "deploymentType": "Server", "serverTitle": "Sztuczna Jira"
+            }
+        elif path == '/rest/api/2/field':
+            endpoint, body = 'field', FIELDS
+        elif path == '/rest/api/2/myself':
+            endpoint, body = 'myself', {
+                "name": "bench", "accountId": "bench", "displayName": "Benchmark",
+                "emailAddress": "bench@example.com", "active": True
+            }
+        elif path == '/rest/api/2/search':
+            endpoint, body = 'search', None
+        elif path == '/rest/agile/1.0/board':
+            endpoint, body = 'board', None
+        elif re.fullmatch(r'/rest/agile/1\.0/board/\d+/sprint', path):
+            endpoint, body = 'sprint', None
+        else:
+            self.server.record('unknown', 404)
+            self._send_json(404, {"errorMessages": [f"Nieobsługiwany endpoint: {path}"], "errors": {}})
+            return
+
+        delay = self.server.delay()
+        if delay:
+            time.sleep(delay)
+
+        if body is None:
+            fault = self.server.draw_fault()
+            if fault == 429:
+                self.server.record(endpoint, 429)
+                self._send_json(429, {"errorMessages": ["Rate limit exceeded"], "errors": {}},
+                                {"Retry-After": str(self.server.retry_after)})
+                return
+            if fault == 500:
+                self.server.record(endpoint, 500)
+                self._send_json(500, {"errorMessages": ["Internal server error (wstrzyknięty)"], "errors": {}})
+                return
+
+        issues = 0
+        if endpoint == 'search':
+            body = self._search(params)
+            issues = len(body["issues"])
+        elif endpoint == 'board':
+            key = params.get('projectKeyOrId')
+            boards = self.server.data.boards if key in (None, self.server.data.project) else []
+            body = self._page(boards, params)
+        elif endpoint == 'sprint':
+            board_id = int(path.split('/')[-2])
+            states = params.get('state')
+            sprints = self.server.data.sprints.get(board_id, [])
+            if states:
+                sprints = [sprint for sprint in sprints if sprint["state"] in states.split(',')]
+            body = self._page(sprints, params)
+
+        self.server.record(endpoint, 200, issues)
+        self._send_json(200, body)
+
+    def _page_bounds(self, params: Dict) -> Tuple[int, int]:
+        """Zwraca startAt i maxResults z uwzględnieniem limitu rozmiaru strony"""
+        start_at = max(int(params.get('startAt') or 0), 0)
+        max_results = int(params.get('maxResults') or DEFAULT_PAGE_SIZE)
+        return start_at, max(min(max_results, self.server.max_page_size), 0)
+
+    def _page(self, values: List[Dict], params: Dict) -> Dict:
+        """Strona wyników w formacie API agile (values, isLast)"""
+        start_at, max_results = self._page_bounds(params)
+        page = values[start_at:start_at + max_results]
+        return {"startAt": start_at, "maxResults": max_results, "total": len(values),
+                "isLast": start_at + len(page) >= len(values), "values": page}
+
+    def _search(self, params: Dict) -> Dict:
+        """Strona wyników wyszukiwania (issues, total) z wybranymi polami"""
+        matches = self.server.data.search(params.get('jql') or "")
+        start_at, max_results = self._page_bounds(params)
+        page = matches[start_at:start_at + max_results]
+
+        fields = params.get('fields') or "*all"
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        if "*all" not in fields and "*navigable" not in fields:
+            wanted = set(fields)
+            page = [{**raw, "fields": {name: value for name, value in raw["fields"].items() if name in wanted}}
+                    for raw in page]
+
+        return {"expand": "schema,names", "startAt": start_at, "maxResults": max_results,
+                "total": len(matches), "issues": page}
+
+    def _send_json(self, status: int, body, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_fake_jira(host: str = "127.0.0.1", port: int = 0, data: Optional[FakeJiraData] = None,
+                    **options) -> FakeJiraServer:
+    """
+    Uruchamia sztuczną Jirę w wątku w tle (do testów obciążeniowych w jednym procesie).
+
+    Args:
+        host (str): Adres nasłuchiwania
+        port (int): Port (0 - dowolny wolny)
+        data (FakeJiraData, optional): Zbiór danych (domyślnie FakeJiraData())
+        **options: Parametry FakeJiraServer (latency_ms, error_rate, max_page_size, ...)
+
+    Returns:
+        FakeJiraServer: Uruchomiony serwer (adres w .url, zatrzymanie przez .shutdown())
+    """
+    server = FakeJiraServer((host, port), data or FakeJiraData(), **options)
+    threading.Thread(target=server.serve_forever, name="fake-jira", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sztuczny serwer REST API Jiry do testów obciążeniowych")
+    parser.add_argument("--host", default="127.0.0.1", help="Adres nasłuchiwania")
+    parser.add_argument("--port", type=int, default=8089, help="Port")
+    parser.add_argument("--project", default="BENCH", help="Klucz projektu (JIRA_PROJECT)")
+    parser.add_argument("--bugs", type=int, default=200, help="Liczba otwartych bugów")
+    parser.add_argument("--done", type=int, default=2000, help="Liczba ukończonych zadań")
+    parser.add_argument("--days", type=int, default=30, help="Z ilu ostatnich dni są ukończone zadania")
+    parser.add_argument("--assignees", type=int, default=25, help="Liczba osób przypisanych do zadań")
+    parser.add_argument("--boards", type=int, default=2, help="Liczba tablic (każda z jednym aktywnym sprintem)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Stałe opóźnienie odpowiedzi (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Losowe dodatkowe opóźnienie (0..ms)")
+    parser.add_argument("--error-rate", type=float, default=0, help="Odsetek odpowiedzi 500 (0-1)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0, help="Odsetek odpowiedzi 429 (0-1)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Wartość nagłówka Retry-After (s)")
+    parser.add_argument("--max-page-size", type=int, default=DEFAULT_MAX_PAGE_SIZE,
+                        help=f"Maksymalna liczba wyników na stronę (domyślnie {DEFAULT_MAX_PAGE_SIZE})")
+    parser.add_argument("--seed", type=int, default=0, help="Ziarno generatora danych i błędów")
+    parser.add_argument("--verbose", action="store_true", help="Wypisuj każde zapytanie")
+    args = parser.parse_args()
+
+    data = FakeJiraData(project=args.project, bugs=args.bugs, done=args.done, days=args.days,
+                        assignees=args.assignees, boards=args.boards, seed=args.seed)
+    server = FakeJiraServer((args.host, args.port), data, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                            error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                            retry_after=args.retry_after, max_page_size=args.max_page_size, seed=args.seed,
+                            verbose=args.verbose)
+    print(f"Sztuczna Jira pod {server.url} (projekt {args.project}: {args.bugs} bugów, "
+          f"{args.done} ukończonych zadań z {args.days} dni)")
+    print(f"JIRA_SERVER={server.url} JIRA_USERNAME=bench JIRA_API_TOKEN=bench JIRA_PROJECT={args.project}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
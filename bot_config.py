@@ -1,4 +1,5 @@
 # bot_config.py
+import datetime
 import logging
 import os
 import traceback
@@ -6,19 +7,28 @@ import traceback
 import discord
 from discord import app_commands
 
+from loop_monitor import get_loop_monitor, is_loop_monitor_enabled
+from scheduler import get_scheduler
+from state_store import load_state, get_state, set_state
+from supervisor import get_supervisor
+
 logger = logging.getLogger('WielkiInkwizytorFilipa')
 
 # Zmienne globalne
 last_message_id = None
+bug_message_ids = []
 current_bugs_channel_id = None
 current_reports_channel_id = None
 current_leaderboard_channel_id = None
 UPDATE_INTERVAL = None
+BUGS_BOARD_MODE = 'full'  # 'full' - pełna lista, 'paginated' - jedna wiadomość ze stronami
 
 # Nowe zmienne do śledzenia stanu
 REPORTS_ENABLED = True
 LEADERBOARD_ENABLED = True
 
+BOARD_MODES = ('full', 'paginated')
+
 # Konfiguracja czasu
 REPORT_HOUR = 21
 REPORT_MINUTE = 36
@@ -26,6 +36,9 @@ LEADERBOARD_HOUR = 9
 LEADERBOARD_MINUTE = 0
 LEADERBOARD_DAY = 0  # Poniedziałek
 
+# Funkcje powiadamiane o zmianach konfiguracji (add_config_listener)
+_config_listeners = []
+
 
 def setup_bot_and_config():
     """
@@ -34,7 +47,7 @@ def setup_bot_and_config():
     """
     try:
         global current_bugs_channel_id, current_reports_channel_id, current_leaderboard_channel_id
-        global UPDATE_INTERVAL, REPORTS_ENABLED, LEADERBOARD_ENABLED
+        global UPDATE_INTERVAL, REPORTS_ENABLED, LEADERBOARD_ENABLED, BUGS_BOARD_MODE
         global REPORT_HOUR, REPORT_MINUTE, LEADERBOARD_HOUR, LEADERBOARD_MINUTE, LEADERBOARD_DAY
 
         # Konfiguracja Discord
@@ -52,6 +65,12 @@ def setup_bot_and_config():
         # Interwał aktualizacji
         UPDATE_INTERVAL = int(os.getenv('UPDATE_INTERVAL', '300'))  # Interwał aktualizacji bugów w sekundach
 
+        # Tryb tablicy bugów
+        BUGS_BOARD_MODE = os.getenv('BUGS_BOARD_MODE', 'full').lower()
+        if BUGS_BOARD_MODE not in BOARD_MODES:
+            logger.warning(f"Nieznany tryb tablicy bugów: {BUGS_BOARD_MODE}, używam 'full'")
+            BUGS_BOARD_MODE = 'full'
+
         # Konfiguracja raportów i leaderboardu
         REPORTS_ENABLED = os.getenv('REPORTS_ENABLED', 'true').lower() == 'true'
         LEADERBOARD_ENABLED = os.getenv('LEADERBOARD_ENABLED', 'true').lower() == 'true'
@@ -65,6 +84,10 @@ def setup_bot_and_config():
         LEADERBOARD_MINUTE = int(os.getenv('LEADERBOARD_MINUTE', '0'))
         LEADERBOARD_DAY = int(os.getenv('LEADERBOARD_WEEKLY_DAY', '0'))
 
+        # Nadpisanie konfiguracji zmianami zapisanymi w trwałym stanie (komendy slash)
+        load_state()
+        _apply_persisted_state()
+
         # Konfiguracja bota Discord
         intents = discord.Intents.default()
         intents.message_content = True
@@ -91,6 +114,67 @@ def setup_bot_and_config():
         return client, tree
 
 
+def _apply_persisted_state():
+    """
+    Nakłada na konfigurację z .env wartości zapisane w trwałym stanie bota.
+    Zmiany wprowadzone komendami mają pierwszeństwo przed plikiem .env.
+    Wiadomości tablicy bugów są przywracane tylko, jeśli dotyczą bieżącego kanału.
+    """
+    global current_bugs_channel_id, current_reports_channel_id, current_leaderboard_channel_id
+    global UPDATE_INTERVAL, REPORTS_ENABLED, LEADERBOARD_ENABLED, BUGS_BOARD_MODE
+    global REPORT_HOUR, REPORT_MINUTE, LEADERBOARD_HOUR, LEADERBOARD_MINUTE, LEADERBOARD_DAY
+    global bug_message_ids, last_message_id
+
+    try:
+        config = get_state('config', {})
+        current_bugs_channel_id = config.get('bugs_channel_id', current_bugs_channel_id)
+        current_reports_channel_id = config.get('reports_channel_id', current_reports_channel_id)
+        current_leaderboard_channel_id = config.get('leaderboard_channel_id', current_leaderboard_channel_id)
+        UPDATE_INTERVAL = config.get('update_interval', UPDATE_INTERVAL)
+        BUGS_BOARD_MODE = config.get('bugs_board_mode', BUGS_BOARD_MODE)
+        REPORTS_ENABLED = config.get('reports_enabled', REPORTS_ENABLED)
+        LEADERBOARD_ENABLED = config.get('leaderboard_enabled', LEADERBOARD_ENABLED)
+        REPORT_HOUR, REPORT_MINUTE = config.get('report_time', [REPORT_HOUR, REPORT_MINUTE])
+        LEADERBOARD_DAY, LEADERBOARD_HOUR, LEADERBOARD_MINUTE = config.get(
+            'leaderboard_time', [LEADERBOARD_DAY, LEADERBOARD_HOUR, LEADERBOARD_MINUTE])
+
+        if config:
+            logger.info(f"Zastosowano zapisaną konfigurację: {', '.join(sorted(config))}")
+
+        board = get_state('bugs_board', {})
+        if board.get('channel_id') == current_bugs_channel_id and board.get('message_ids'):
+            bug_message_ids = list(board['message_ids'])
+            last_message_id = bug_message_ids[-1]
+            logger.info(f"Przywrócono {len(bug_message_ids)} wiadomości tablicy bugów, ID ostatniej: {last_message_id}")
+    except Exception as e:
+        logger.error(f"Błąd podczas stosowania zapisanego stanu bota: {e}")
+        logger.error(traceback.format_exc())
+
+
+def add_config_listener(callback):
+    """
+    Rejestruje funkcję wywoływaną po każdej zmianie konfiguracji (np. harmonogram zadań).
+
+    Args:
+        callback (Callable[[Set[str]], None]): Funkcja przyjmująca nazwy zmienionych ustawień
+    """
+    _config_listeners.append(callback)
+
+
+def _persist_config(**values):
+    """Zapisuje zmienione wartości konfiguracji w trwałym stanie bota i powiadamia słuchaczy"""
+    config = dict(get_state('config', {}))
+    config.update(values)
+    set_state('config', config)
+
+    for callback in list(_config_listeners):
+        try:
+            callback(set(values))
+        except Exception as e:
+            logger.error(f"Błąd w obsłudze zmiany konfiguracji: {e}")
+            logger.error(traceback.format_exc())
+
+
 def get_channel_id(channel_type):
     """
     Pobiera aktualne ID kanału na podstawie typu.
@@ -123,21 +207,24 @@ def set_channel_id(channel_type, channel_id):
     Returns:
         bool: True jeśli ustawiono pomyślnie
     """
-    global current_bugs_channel_id, current_reports_channel_id, current_leaderboard_channel_id, last_message_id
+    global current_bugs_channel_id, current_reports_channel_id, current_leaderboard_channel_id
 
     try:
         if channel_type == 'bugs':
             current_bugs_channel_id = channel_id
-            last_message_id = None  # Reset ID wiadomości po zmianie kanału
+            set_bug_message_ids([])  # Reset ID wiadomości po zmianie kanału
             os.environ['DISCORD_BUGS_CHANNEL_ID'] = str(channel_id)
+            _persist_config(bugs_channel_id=channel_id)
             return True
         elif channel_type == 'reports':
             current_reports_channel_id = channel_id
             os.environ['DISCORD_REPORTS_CHANNEL_ID'] = str(channel_id)
+            _persist_config(reports_channel_id=channel_id)
             return True
         elif channel_type == 'leaderboard':
             current_leaderboard_channel_id = channel_id
             os.environ['DISCORD_LEADERBOARD_CHANNEL_ID'] = str(channel_id)
+            _persist_config(leaderboard_channel_id=channel_id)
             return True
         else:
             logger.error(f"Nieznany typ kanału: {channel_type}")
@@ -155,8 +242,48 @@ def get_last_message_id():
 
 def set_last_message_id(message_id):
     """Ustawia ID ostatniej wysłanej wiadomości z bugami"""
-    global last_message_id
-    last_message_id = message_id
+    set_bug_message_ids([message_id] if message_id else [])
+
+
+def get_bug_message_ids():
+    """Zwraca listę ID wiadomości tworzących tablicę bugów (w kolejności wyświetlania)"""
+    return list(bug_message_ids)
+
+
+def set_bug_message_ids(message_ids):
+    """
+    Ustawia listę ID wiadomości tworzących tablicę bugów i zapisuje ją w trwałym stanie,
+    dzięki czemu po restarcie bot edytuje istniejące wiadomości zamiast wysyłać nowe.
+
+    Args:
+        message_ids (list): Lista ID wiadomości w kolejności wyświetlania
+    """
+    global bug_message_ids, last_message_id
+    bug_message_ids = [message_id for message_id in message_ids if message_id]
+    last_message_id = bug_message_ids[-1] if bug_message_ids else None
+    set_state('bugs_board', {'channel_id': current_bugs_channel_id, 'message_ids': bug_message_ids})
+
+
+def get_last_run(job_name):
+    """
+    Zwraca czas ostatniego uruchomienia zadania okresowego.
+
+    Args:
+        job_name (str): Nazwa zadania, np. 'bugs_update', 'daily_report', 'leaderboard'
+
+    Returns:
+        str: Czas w formacie ISO 8601 lub None, jeśli zadanie jeszcze się nie wykonało
+    """
+    return get_state('last_run', {}).get(job_name)
+
+
+def set_last_run(job_name, when=None):
+    """Zapisuje czas ostatniego uruchomienia zadania okresowego (domyślnie teraz, UTC)"""
+    if when is None:
+        when = datetime.datetime.now(datetime.timezone.utc)
+    last_run = dict(get_state('last_run', {}))
+    last_run[job_name] = when.isoformat()
+    set_state('last_run', last_run)
 
 
 def get_update_interval():
@@ -170,6 +297,7 @@ def set_update_interval(seconds):
     try:
         UPDATE_INTERVAL = seconds
         os.environ['UPDATE_INTERVAL'] = str(seconds)
+        _persist_config(update_interval=seconds)
         logger.info(f"Ustawiono nowy interwał aktualizacji: {seconds} sekund")
         return True
     except Exception as e:
@@ -178,6 +306,41 @@ def set_update_interval(seconds):
         return False
 
 
+def get_board_mode():
+    """Zwraca tryb tablicy bugów: 'full' lub 'paginated'"""
+    return BUGS_BOARD_MODE
+
+
+def set_board_mode(mode):
+    """
+    Ustawia tryb tablicy bugów. Zmiana trybu zeruje zapamiętane wiadomości tablicy,
+    więc przy następnej aktualizacji stara tablica zostanie usunięta i wysłana w nowym trybie.
+
+    Args:
+        mode (str): 'full' lub 'paginated'
+
+    Returns:
+        bool: True jeśli ustawiono pomyślnie
+    """
+    global BUGS_BOARD_MODE
+    try:
+        if mode not in BOARD_MODES:
+            logger.error(f"Nieznany tryb tablicy bugów: {mode}")
+            return False
+
+        if mode != BUGS_BOARD_MODE:
+            BUGS_BOARD_MODE = mode
+            set_bug_message_ids([])
+        os.environ['BUGS_BOARD_MODE'] = mode
+        _persist_config(bugs_board_mode=mode)
+        logger.info(f"Ustawiono tryb tablicy bugów: {mode}")
+        return True
+    except Exception as e:
+        logger.error(f"Błąd podczas ustawiania trybu tablicy bugów: {e}")
+        logger.error(traceback.format_exc())
+        return False
+
+
 # Nowe funkcje do zarządzania stanem bota
 
 def is_reports_enabled():
@@ -191,6 +354,7 @@ def set_reports_enabled(enabled):
     try:
         REPORTS_ENABLED = enabled
         os.environ['REPORTS_ENABLED'] = str(enabled).lower()
+        _persist_config(reports_enabled=enabled)
         logger.info(f"Raporty zostały {'włączone' if enabled else 'wyłączone'}")
         return True
     except Exception as e:
@@ -210,6 +374,7 @@ def set_leaderboard_enabled(enabled):
     try:
         LEADERBOARD_ENABLED = enabled
         os.environ['LEADERBOARD_ENABLED'] = str(enabled).lower()
+        _persist_config(leaderboard_enabled=enabled)
         logger.info(f"Tablica wyników została {'włączona' if enabled else 'wyłączona'}")
         return True
     except Exception as e:
@@ -231,6 +396,7 @@ def set_report_time(hour, minute):
         REPORT_MINUTE = minute
         os.environ['REPORT_HOUR'] = str(hour)
         os.environ['REPORT_MINUTE'] = str(minute)
+        _persist_config(report_time=[hour, minute])
         logger.info(f"Ustawiono czas raportu na {hour}:{minute:02d}")
         return True
     except Exception as e:
@@ -259,6 +425,7 @@ def set_leaderboard_time(day, hour, minute):
         os.environ['LEADERBOARD_WEEKLY_DAY'] = str(day)
         os.environ['LEADERBOARD_HOUR'] = str(hour)
         os.environ['LEADERBOARD_MINUTE'] = str(minute)
+        _persist_config(leaderboard_time=[day, hour, minute])
         logger.info(f"Ustawiono czas tablicy wyników na dzień {day} (0=pon), godzina {hour}:{minute:02d}")
         return True
     except Exception as e:
@@ -282,13 +449,19 @@ def get_bot_status():
             "reports_channel_id": current_reports_channel_id,
             "leaderboard_channel_id": current_leaderboard_channel_id,
             "update_interval": UPDATE_INTERVAL,
+            "bugs_board_mode": BUGS_BOARD_MODE,
             "reports_enabled": REPORTS_ENABLED,
             "leaderboard_enabled": LEADERBOARD_ENABLED,
             "report_time": f"{REPORT_HOUR}:{REPORT_MINUTE:02d}",
             "leaderboard_time": f"Dzień {LEADERBOARD_DAY} (0=pon), {LEADERBOARD_HOUR}:{LEADERBOARD_MINUTE:02d}",
             "jira_server": os.getenv('JIRA_SERVER', 'Nie skonfigurowano'),
             "jira_project": os.getenv('JIRA_PROJECT', 'Nie skonfigurowano'),
-            "timezone": os.getenv('TIMEZONE', 'Europe/Warsaw')
+            "timezone": os.getenv('TIMEZONE', 'Europe/Warsaw'),
+            "bug_message_ids": list(bug_message_ids),
+            "last_run": dict(get_state('last_run', {})),
+            "background_tasks": get_supervisor().status(),
+            "scheduled_jobs": get_scheduler().status(),
+            "event_loop": get_loop_monitor().summary() if is_loop_monitor_enabled() else None
         }
         return status
     except Exception as e:
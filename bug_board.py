@@ -0,0 +1,298 @@
+# bug_board.py
+import datetime
+import hashlib
+import logging
+import os
+import traceback
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import discord
+import pytz
+from jira.resources import Issue
+
+from embed_layout import EmbedLayout
+from jira_client import fetch_jira_bugs
+from render_model import RenderedEmbed, to_discord_embeds, COLOR_RED
+from renderers import format_bug_entry
+from state_store import get_state, set_state
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Domyślna liczba bugów na stronie tablicy stronicowanej (BUGS_PAGE_SIZE)
+DEFAULT_PAGE_SIZE = 15
+
+# Maksymalna liczba wyrenderowanych stron trzymanych w pamięci
+PAGE_CACHE_SIZE = 64
+
+# Filtr oznaczający wszystkie statusy
+ALL_STATUSES = "*"
+
+# Discord pozwala na najwyżej 25 opcji w liście wyboru (jedna jest zajęta przez "Wszystkie")
+MAX_STATUS_OPTIONS = 24
+
+
+def get_page_size() -> int:
+    """Zwraca liczbę bugów na stronie tablicy stronicowanej (BUGS_PAGE_SIZE)"""
+    return max(1, int(os.getenv('BUGS_PAGE_SIZE', str(DEFAULT_PAGE_SIZE))))
+
+
+def status_option_value(status: str) -> str:
+    """
+    Zwraca wartość opcji listy wyboru dla statusu. Discord ogranicza wartość do 100 znaków,
+    więc zamiast nazwy statusu używany jest jej skrót (stały między migawkami).
+    """
+    if status == ALL_STATUSES:
+        return ALL_STATUSES
+    return hashlib.sha1(status.encode('utf-8')).hexdigest()[:20]
+
+
+class BugSnapshot:
+    """
+    Niezmienna migawka tablicy bugów. Wersja zmienia się tylko wtedy,
+    gdy zmieniła się treść tablicy, więc może służyć jako klucz cache stron.
+    """
+
+    def __init__(self, version: int, rows: List[Tuple[str, str]], content_hash: str, taken_at: str):
+        self.version = version
+        self.rows = rows  # Lista (status, wpis) w kolejności wyświetlania
+        self.content_hash = content_hash
+        self.taken_at = taken_at
+        self.statuses = list(dict.fromkeys(status for status, _ in rows))
+        self._rows_by_status: Dict[str, List[Tuple[str, str]]] = {}
+
+    def filtered_rows(self, status_filter: str) -> List[Tuple[str, str]]:
+        """Zwraca wiersze dla danego statusu (lub wszystkie), zapamiętując wynik"""
+        if status_filter == ALL_STATUSES:
+            return self.rows
+        if status_filter not in self._rows_by_status:
+            self._rows_by_status[status_filter] = [row for row in self.rows if row[0] == status_filter]
+        return self._rows_by_status[status_filter]
+
+    def page_count(self, status_filter: str) -> int:
+        """Zwraca liczbę stron dla danego filtra (co najmniej 1)"""
+        return max(1, -(-len(self.filtered_rows(status_filter)) // get_page_size()))
+
+    def status_for_option(self, value: str) -> str:
+        """Zwraca status odpowiadający wartości opcji listy wyboru (ALL_STATUSES, jeśli go już nie ma)"""
+        for status in self.statuses:
+            if status_option_value(status) == value:
+                return status
+        return ALL_STATUSES
+
+
+# Zmienne globalne
+_snapshot = BugSnapshot(0, [], "", "")
+_page_cache: "OrderedDict[Tuple[int, str, int], List[RenderedEmbed]]" = OrderedDict()
+
+
+def update_snapshot(issues: List[Issue]) -> BugSnapshot:
+    """
+    Buduje migawkę tablicy z bugów pobranych z Jiry. Jeśli treść się nie zmieniła,
+    zwracana jest dotychczasowa migawka (z tą samą wersją).
+
+    Args:
+        issues (List[Issue]): Lista bugów z Jiry
+
+    Returns:
+        BugSnapshot: Aktualna migawka
+    """
+    global _snapshot
+
+    # Grupowanie według statusu z zachowaniem kolejności z zapytania JQL
+    status_groups: Dict[str, List[str]] = {}
+    for issue in issues:
+        try:
+            status_groups.setdefault(issue.fields.status.name, []).append(format_bug_entry(issue))
+        except AttributeError as ae:
+            logger.warning(
+                f"Pominięto buga z powodu braku atrybutu: {ae} (Issue key: {issue.key if hasattr(issue, 'key') else 'unknown'})")
+
+    rows = [(status, entry) for status, entries in status_groups.items() for entry in entries]
+    content_hash = hashlib.sha1("\x00".join(f"{status}\x01{entry}" for status, entry in rows).encode('utf-8')).hexdigest()
+
+    if content_hash != _snapshot.content_hash or not _snapshot.version:
+        timezone = pytz.timezone('Europe/Warsaw')
+        taken_at = datetime.datetime.now(timezone).strftime('%d.%m.%Y %H:%M:%S')
+        _snapshot = BugSnapshot(_snapshot.version + 1, rows, content_hash, taken_at)
+        logger.info(f"Nowa wersja tablicy bugów: {_snapshot.version} ({len(rows)} bugów)")
+
+    return _snapshot
+
+
+def get_snapshot() -> BugSnapshot:
+    """Zwraca bieżącą migawkę tablicy bugów"""
+    return _snapshot
+
+
+async def refresh_snapshot() -> BugSnapshot:
+    """
+    Pobiera bugi z Jiry i aktualizuje migawkę, np. gdy po restarcie ktoś użyje przycisków
+    tablicy przed pierwszym odpytaniem Jiry.
+
+    Returns:
+        BugSnapshot: Aktualna migawka
+    """
+    return update_snapshot(await fetch_jira_bugs())
+
+
+def get_view_state() -> Tuple[int, str]:
+    """
+    Zwraca zapamiętaną stronę i filtr statusu tablicy stronicowanej.
+    Stan jest wspólny dla całego serwera: tablica to jedna publiczna wiadomość,
+    więc zmiana strony lub filtra przez jedną osobę zmienia ją dla wszystkich.
+    """
+    view_state = get_state('bugs_board_view', {})
+    return view_state.get('page', 0), view_state.get('status', ALL_STATUSES)
+
+
+def set_view_state(page: int, status_filter: str):
+    """Zapamiętuje wspólną stronę i filtr statusu tablicy stronicowanej (przetrwają restart)"""
+    set_state('bugs_board_view', {'page': page, 'status': status_filter})
+
+
+def _render_page_data(snapshot: BugSnapshot, status_filter: str, page: int) -> List[RenderedEmbed]:
+    """Renderuje jedną stronę tablicy do postaci czystych danych"""
+    rows = snapshot.filtered_rows(status_filter)
+    pages = snapshot.page_count(status_filter)
+    page_size = get_page_size()
+    page_rows = rows[page * page_size:(page + 1) * page_size]
+
+    filter_label = "Wszystkie" if status_filter == ALL_STATUSES else status_filter
+    layout = EmbedLayout(
+        title="Aktualna lista bugów",
+        continuation_title="Aktualna lista bugów (kontynuacja)",
+        description=(
+            f"Ostatnia zmiana: {snapshot.taken_at}\n"
+            f"Status: **{filter_label}** • Strona {page + 1}/{pages} • Bugów: {len(rows)}"
+        ),
+        footer="Aby odświeżyć ręcznie użyj /refresh | Wielki Inkwizytor Filipa",
+        color=COLOR_RED
+    )
+
+    if not page_rows:
+        layout.add_field("Brak bugów", "Nie znaleziono żadnych bugów spełniających kryteria.")
+        return layout.finish()
+
+    # Sekcje według statusu, w obrębie strony
+    sections: Dict[str, List[str]] = {}
+    for status, entry in page_rows:
+        sections.setdefault(status, []).append(entry)
+    for status, entries in sections.items():
+        layout.add_section(status, entries)
+
+    return layout.finish()
+
+
+def render_page(page: int = 0, status_filter: str = ALL_STATUSES) -> Tuple[List[discord.Embed], int, int]:
+    """
+    Zwraca embedy żądanej strony z bieżącej migawki. Strony są renderowane
+    dopiero przy pierwszym żądaniu i trzymane w cache kluczowanym wersją migawki.
+
+    Args:
+        page (int): Numer strony (od 0), przycinany do dostępnego zakresu
+        status_filter (str): Status do wyświetlenia lub ALL_STATUSES
+
+    Returns:
+        Tuple[List[discord.Embed], int, int]: Embedy strony, faktyczny numer strony, liczba stron
+    """
+    snapshot = _snapshot
+    if status_filter != ALL_STATUSES and status_filter not in snapshot.statuses:
+        status_filter = ALL_STATUSES
+
+    pages = snapshot.page_count(status_filter)
+    page = min(max(page, 0), pages - 1)
+
+    key = (snapshot.version, status_filter, page)
+    page_data = _page_cache.get(key)
+    if page_data is None:
+        page_data = _render_page_data(snapshot, status_filter, page)
+        _page_cache[key] = page_data
+        if len(_page_cache) > PAGE_CACHE_SIZE:
+            _page_cache.popitem(last=False)
+    else:
+        _page_cache.move_to_end(key)
+
+    return to_discord_embeds(page_data), page, pages
+
+
+class BugBoardView(discord.ui.View):
+    """
+    Trwały widok tablicy stronicowanej: przyciski poprzednia/następna strona
+    i lista wyboru statusu. Stałe custom_id pozwalają obsługiwać przyciski
+    również po restarcie bota (widok jest rejestrowany przez client.add_view).
+    Przyciski zmieniają wspólną tablicę, a nie widok jednej osoby (patrz get_view_state).
+    """
+
+    def __init__(self, page: int = 0, pages: int = 1, status_filter: str = ALL_STATUSES,
+                 statuses: Optional[List[str]] = None):
+        super().__init__(timeout=None)
+        self.page = page
+        self.status_filter = status_filter
+
+        self.previous_page.disabled = page <= 0
+        self.next_page.disabled = page >= pages - 1
+
+        options = [discord.SelectOption(label="Wszystkie", value=ALL_STATUSES,
+                                        default=status_filter == ALL_STATUSES)]
+        for status in (statuses or [])[:MAX_STATUS_OPTIONS]:
+            options.append(discord.SelectOption(label=status[:100], value=status_option_value(status),
+                                                default=status == status_filter))
+        self.status_select.options = options
+
+    async def _show(self, interaction: discord.Interaction, page: int, status_filter: str):
+        """Renderuje żądaną stronę i podmienia treść wiadomości tablicy"""
+        try:
+            if not _snapshot.version:
+                # Po restarcie migawka jest pusta do pierwszego odpytania Jiry - pobieramy bugi teraz
+                # (po potwierdzeniu interakcji, bo zapytanie może przekroczyć 3 sekundy)
+                await interaction.response.defer()
+                await refresh_snapshot()
+
+            embeds, page, pages = render_page(page, status_filter)
+            if status_filter not in _snapshot.statuses:
+                status_filter = ALL_STATUSES
+            set_view_state(page, status_filter)
+            view = BugBoardView(page, pages, status_filter, _snapshot.statuses)
+            if interaction.response.is_done():
+                await interaction.edit_original_response(embeds=embeds, view=view)
+            else:
+                await interaction.response.edit_message(embeds=embeds, view=view)
+        except discord.errors.NotFound:
+            logger.warning("Interakcja wygasła, nie można zmienić strony tablicy bugów")
+        except Exception as e:
+            logger.error(f"Błąd podczas zmiany strony tablicy bugów: {e}")
+            logger.error(traceback.format_exc())
+
+    @discord.ui.button(label="◀ Poprzednia", style=discord.ButtonStyle.secondary, custom_id="bugboard:prev", row=0)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        page, status_filter = get_view_state()
+        await self._show(interaction, page - 1, status_filter)
+
+    @discord.ui.button(label="Następna ▶", style=discord.ButtonStyle.secondary, custom_id="bugboard:next", row=0)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        page, status_filter = get_view_state()
+        await self._show(interaction, page + 1, status_filter)
+
+    @discord.ui.select(placeholder="Filtruj według statusu", custom_id="bugboard:status", row=1,
+                       options=[discord.SelectOption(label="Wszystkie", value=ALL_STATUSES)])
+    async def status_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        if not _snapshot.version:
+            await interaction.response.defer()
+            await refresh_snapshot()
+        await self._show(interaction, 0, _snapshot.status_for_option(select.values[0]))
+
+
+def build_board_message() -> Tuple[List[discord.Embed], BugBoardView]:
+    """
+    Buduje treść wiadomości tablicy stronicowanej dla zapamiętanej strony i filtra.
+
+    Returns:
+        Tuple[List[discord.Embed], BugBoardView]: Embedy strony i widok z przyciskami
+    """
+    page, status_filter = get_view_state()
+    embeds, page, pages = render_page(page, status_filter)
+    if status_filter not in _snapshot.statuses:
+        status_filter = ALL_STATUSES
+    set_view_state(page, status_filter)
+    return embeds, BugBoardView(page, pages, status_filter, _snapshot.statuses)
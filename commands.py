@@ -1,18 +1,109 @@
 # commands.py
+import asyncio
+import io
 import logging
 import traceback
+from typing import Optional
 
 import discord
 from discord import app_commands
 
 from bot_config import get_channel_id, set_channel_id, set_update_interval, get_update_interval
 from discord_embeds import create_help_embed, create_error_embed
+from completion_counters import get_completion_counters
+from job_queue import QueueFullError, get_job_queue
+from leaderboard import build_leaderboard
 from message_updater import update_bugs_message
-from reports import generate_on_demand_report
+from render_model import RenderedEmbed, to_discord_embed, to_discord_embeds
+from renderers import render_bot_status, render_perf_summary
+from reports import ReportDateError, build_on_demand_report
+from response_cache import get_response_cache, make_key
+from tracing import get_trace_buffer
 
 logger = logging.getLogger('WielkiInkwizytorFilipa')
 
 
+def _completions_version():
+    """Wersja danych raportów i tablicy wyników - zmienia się po dopisaniu nowych ukończonych zadań"""
+    return get_completion_counters().version
+
+
+async def enqueue_command(interaction: discord.Interaction, key, work, ephemeral: bool = False,
+                          get_version=None):
+    """
+    Odracza odpowiedź na interakcję i zleca ciężkie zadanie kolejce. Obsługa interakcji
+    kończy się od razu, a postęp i wynik (tekst lub embed) trafiają do odroczonej odpowiedzi.
+
+    Args:
+        interaction (discord.Interaction): Interakcja komendy
+        key (tuple): Klucz zadania - komenda i znormalizowane argumenty (make_key; duplikaty są łączone)
+        work (Callable): Korutyna work(progress) zwracająca tekst, discord.Embed lub RenderedEmbed
+        ephemeral (bool): Czy odpowiedź ma być widoczna tylko dla wywołującego
+        get_version (Callable, optional): Zwraca wersję danych wyniku. Jeśli podano, wynik (RenderedEmbed)
+            jest zapamiętywany w cache odpowiedzi, a aktualny wpis z cache jest wysyłany od razu, bez kolejki
+    """
+    cache = get_response_cache()
+    if get_version is not None:
+        cached = cache.get(key, get_version())
+        if cached is not None:
+            try:
+                await interaction.response.send_message(embeds=to_discord_embeds(cached), ephemeral=ephemeral)
+                logger.info(f"Odpowiedź na {key[0]} wysłana z cache")
+            except discord.errors.NotFound:
+                logger.warning(f"Interakcja wygasła, nie można odpowiedzieć na {key[0]}")
+            return
+
+        uncached_work = work
+
+        async def work(progress):
+            result = await uncached_work(progress)
+            if isinstance(result, RenderedEmbed):
+                cache.put(key, get_version(), [result])
+            return result
+
+    try:
+        await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+    except discord.errors.NotFound:
+        logger.warning(f"Interakcja wygasła, nie można odroczyć odpowiedzi na {key[0]}")
+        return
+
+    # Edycje odpowiedzi idą po kolei, a spóźniona informacja o postępie nie nadpisze gotowego wyniku
+    edit_lock = asyncio.Lock()
+    finished = False
+
+    async def on_progress(text):
+        async with edit_lock:
+            if not finished:
+                await interaction.edit_original_response(content=text)
+
+    async def on_done(result, error):
+        nonlocal finished
+        async with edit_lock:
+            finished = True
+            try:
+                if error is not None:
+                    await interaction.edit_original_response(content=f"❌ Wystąpił błąd: {str(error)}")
+                elif isinstance(result, RenderedEmbed):
+                    await interaction.edit_original_response(content=None, embed=to_discord_embed(result))
+                elif isinstance(result, discord.Embed):
+                    await interaction.edit_original_response(content=None, embed=result)
+                else:
+                    await interaction.edit_original_response(content=result)
+            except discord.errors.NotFound:
+                logger.warning(f"Nie można przekazać wyniku {key[0]} - interakcja wygasła")
+
+    queue = get_job_queue()
+    try:
+        queue.submit(key, work, on_progress=on_progress, on_done=on_done)
+    except QueueFullError:
+        await interaction.edit_original_response(content="⏳ Bot jest teraz zajęty, spróbuj ponownie za chwilę.")
+        return
+
+    position = queue.position(key)
+    if position:
+        await on_progress(f"⏳ W kolejce (zadań przed Tobą: {position})")
+
+
 def register_commands(tree):
     """
     Rejestruje wszystkie komendy slash dla bota.
@@ -25,41 +116,65 @@ def register_commands(tree):
 
         @tree.command(name="refresh", description="Odśwież listę bugów z Jiry")
         async def refresh_bugs(interaction: discord.Interaction):
-            try:
-                logger.info(f"Komenda /refresh wywołana przez {interaction.user.name} (ID: {interaction.user.id})")
+            logger.info(f"Komenda /refresh wywołana przez {interaction.user.name} (ID: {interaction.user.id})")
+            client = interaction.client
 
-                try:
-                    # Natychmiastowa odpowiedź zamiast defer
-                    await interaction.response.send_message("⏳ Odświeżanie listy bugów...", ephemeral=True)
-                except discord.errors.NotFound:
-                    logger.warning("Interakcja wygasła, nie można odpowiedzieć na /refresh")
-                    return
+            async def work(progress):
+                await progress("⏳ Odświeżanie listy bugów...")
+                if await update_bugs_message(client, force=True):
+                    logger.info("Komenda /refresh wykonana pomyślnie")
+                    return "✅ Lista bugów została zaktualizowana!"
+                return "❌ Wystąpił błąd podczas aktualizacji listy bugów"
 
+            await enqueue_command(interaction, make_key("refresh"), work, ephemeral=True)
+
+        @tree.command(name="generate_report", description="Generuje raport ukończonych zadań na żądanie")
+        @app_commands.describe(
+            okres="Okres raportu",
+            od="Data początkowa dla własnego okresu (YYYY-MM-DD)",
+            do="Data końcowa dla własnego okresu (YYYY-MM-DD)"
+        )
+        @app_commands.choices(okres=[
+            app_commands.Choice(name="Od ostatniego raportu dziennego", value="day"),
+            app_commands.Choice(name="Ostatnie 7 dni", value="week"),
+            app_commands.Choice(name="Ostatnie 30 dni", value="month"),
+            app_commands.Choice(name="Własny zakres dat", value="custom"),
+        ])
+        async def generate_report_command(interaction: discord.Interaction, okres: str = "day",
+                                          od: Optional[str] = None, do: Optional[str] = None):
+            logger.info(
+                f"Komenda /generate_report ({okres}) wywołana przez {interaction.user.name} (ID: {interaction.user.id})")
+
+            if okres == "custom" and not (od and do):
+                await interaction.response.send_message(
+                    "❌ Dla własnego okresu podaj daty `od` i `do` (YYYY-MM-DD)", ephemeral=True)
+                return
+            if okres != "custom":
+                od = do = None
+
+            async def work(progress):
+                await progress("🔄 Pobieranie ukończonych zadań z Jiry...")
                 try:
-                    success = await update_bugs_message(interaction.client)
-                    if success:
-                        await interaction.edit_original_response(content="✅ Lista bugów została zaktualizowana!")
-                        logger.info("Komenda /refresh wykonana pomyślnie")
-                    else:
-                        await interaction.edit_original_response(
-                            content="❌ Wystąpił błąd podczas aktualizacji listy bugów")
-                except discord.errors.NotFound:
-                    logger.warning("Nie można zaktualizować odpowiedzi - webhook nie istnieje")
-                except Exception as edit_error:
-                    logger.error(f"Błąd podczas edycji odpowiedzi: {edit_error}")
-            except Exception as e:
-                logger.error(f"Błąd podczas odświeżania bugów: {e}")
-                logger.error(traceback.format_exc())
-                try:
-                    # Próba odpowiedzi w przypadku błędu
-                    if interaction.response.is_done():
-                        await interaction.edit_original_response(content=f"❌ Wystąpił błąd: {str(e)}")
-                    else:
-                        await interaction.response.send_message(f"❌ Wystąpił błąd: {str(e)}", ephemeral=True)
-                except discord.errors.NotFound:
-                    logger.warning("Nie można zaktualizować odpowiedzi po błędzie - interakcja wygasła")
-                except Exception as resp_error:
-                    logger.error(f"Błąd podczas wysyłania informacji o błędzie: {resp_error}")
+                    return await build_on_demand_report(okres, od, do)
+                except ReportDateError as date_error:
+                    return f"❌ {date_error}"
+
+            await enqueue_command(interaction, make_key("generate_report", okres=okres, od=od, do=do), work,
+                                  get_version=_completions_version)
+
+        @tree.command(name="leaderboard", description="Wyświetla tablicę wyników zespołu")
+        @app_commands.describe(dni="Liczba dni wstecz (domyślnie 30)")
+        async def leaderboard_command(interaction: discord.Interaction,
+                                      dni: app_commands.Range[int, 1, 365] = 30):
+            logger.info(
+                f"Komenda /leaderboard ({dni} dni) wywołana przez {interaction.user.name} (ID: {interaction.user.id})")
+
+            async def work(progress):
+                await progress("🔄 Liczenie tablicy wyników...")
+                return await build_leaderboard(dni)
+
+            await enqueue_command(interaction, make_key("leaderboard", dni=dni), work,
+                                  get_version=_completions_version)
 
         @tree.command(name="help", description="Wyświetla informacje o komendach bota")
         async def help_command(interaction: discord.Interaction):
@@ -106,74 +221,96 @@ def register_commands(tree):
                 logger.info(f"Komenda /stan wywołana przez {interaction.user.name} (ID: {interaction.user.id})")
 
                 from bot_config import get_bot_status
-                status = get_bot_status()
+                # Bez cache - stan (pętla zdarzeń, harmonogram) zmienia się co chwilę, a jego renderowanie jest tanie
+                embed = to_discord_embed(render_bot_status(get_bot_status()))
 
-                # Przygotowanie kolorów w zależności od stanu
-                color = discord.Color.green()
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                logger.info("Informacje o stanie bota wyświetlone pomyślnie")
 
-                # Jeśli jedna z głównych funkcji jest wyłączona, użyj żółtego koloru
-                if not status["reports_enabled"] or not status["leaderboard_enabled"]:
-                    color = discord.Color.yellow()
+            except Exception as e:
+                logger.error(f"Błąd podczas wyświetlania stanu bota: {e}")
+                logger.error(traceback.format_exc())
+                try:
+                    if not interaction.response.is_done():
+                        await interaction.response.send_message(
+                            f"❌ Wystąpił błąd podczas wyświetlania stanu bota: {str(e)}",
+                            ephemeral=True
+                        )
+                except discord.errors.NotFound:
+                    logger.warning("Nie można odpowiedzieć po błędzie - interakcja wygasła")
+                except Exception:
+                    pass
 
-                embed = discord.Embed(
-                    title="📊 Stan bota Wielki Inkwizytor Filipa",
-                    description="Szczegółowe informacje o konfiguracji i stanie bota",
-                    color=color
-                )
+        @tree.command(name="perf", description="Wyświetla czasy ostatnich cykli pracy bota (ślady)")
+        @app_commands.describe(eksport="Dołącz pełne ślady jako plik JSON")
+        @app_commands.default_permissions(administrator=True)
+        async def perf_command(interaction: discord.Interaction, eksport: bool = False):
+            try:
+                logger.info(f"Komenda /perf wywołana przez {interaction.user.name} (ID: {interaction.user.id})")
 
-                # Kanały
-                embed.add_field(
-                    name="🔧 Kanały",
-                    value=(
-                        f"🐞 **Bugi**: <#{status['bugs_channel_id']}>\n"
-                        f"📝 **Raporty**: <#{status['reports_channel_id']}>\n"
-                        f"🏆 **Leaderboard**: <#{status['leaderboard_channel_id']}>"
-                    ),
-                    inline=False
-                )
+                # Sprawdź uprawnienia
+                if not interaction.user.guild_permissions.administrator:
+                    await interaction.response.send_message("❌ Nie masz uprawnień administratora!", ephemeral=True)
+                    return
 
-                # Funkcje
-                embed.add_field(
-                    name="⚙️ Funkcje",
-                    value=(
-                        f"🔄 **Interwał aktualizacji bugów**: {status['update_interval']} sekund\n"
-                        f"📝 **Raporty**: {'✅ Włączone' if status['reports_enabled'] else '❌ Wyłączone'}\n"
-                        f"🏆 **Leaderboard**: {'✅ Włączone' if status['leaderboard_enabled'] else '❌ Wyłączone'}"
-                    ),
-                    inline=False
-                )
+                buffer = get_trace_buffer()
+                embed = to_discord_embed(render_perf_summary(buffer.summary()))
+                if eksport:
+                    export = discord.File(io.BytesIO(buffer.to_json().encode('utf-8')), filename="slady.json")
+                    await interaction.response.send_message(embed=embed, file=export, ephemeral=True)
+                else:
+                    await interaction.response.send_message(embed=embed, ephemeral=True)
 
-                # Harmonogram
-                embed.add_field(
-                    name="⏰ Harmonogram",
-                    value=(
-                        f"📝 **Czas raportów**: {status['report_time']}\n"
-                        f"🏆 **Czas leaderboardu**: {status['leaderboard_time']}"
-                    ),
-                    inline=False
-                )
+            except Exception as e:
+                logger.error(f"Błąd podczas wyświetlania śladów: {e}")
+                logger.error(traceback.format_exc())
+                try:
+                    if not interaction.response.is_done():
+                        await interaction.response.send_message(
+                            f"❌ Wystąpił błąd: {str(e)}",
+                            ephemeral=True
+                        )
+                except discord.errors.NotFound:
+                    logger.warning("Nie można odpowiedzieć po błędzie - interakcja wygasła")
+                except Exception:
+                    pass
 
-                # Jira
-                embed.add_field(
-                    name="🔗 Jira",
-                    value=(
-                        f"🌐 **Serwer**: {status['jira_server']}\n"
-                        f"📂 **Projekt**: {status['jira_project']}\n"
-                        f"🕒 **Strefa czasowa**: {status['timezone']}"
-                    ),
-                    inline=False
-                )
+        @tree.command(name="tryb_tablicy", description="Ustawia tryb wyświetlania tablicy bugów")
+        @app_commands.describe(tryb="Pełna lista w wielu wiadomościach lub jedna wiadomość ze stronami")
+        @app_commands.choices(tryb=[
+            app_commands.Choice(name="Pełna lista", value="full"),
+            app_commands.Choice(name="Stronicowana (jedna wiadomość)", value="paginated"),
+        ])
+        @app_commands.default_permissions(administrator=True)
+        async def board_mode_command(interaction: discord.Interaction, tryb: str):
+            try:
+                logger.info(
+                    f"Komenda /tryb_tablicy wywołana przez {interaction.user.name} (ID: {interaction.user.id})")
 
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-                logger.info("Informacje o stanie bota wyświetlone pomyślnie")
+                # Sprawdź uprawnienia
+                if not interaction.user.guild_permissions.administrator:
+                    await interaction.response.send_message("❌ Nie masz uprawnień administratora!", ephemeral=True)
+                    return
+
+                from bot_config import set_board_mode
+
+                if set_board_mode(tryb):
+                    mode_name = "stronicowana" if tryb == "paginated" else "pełna lista"
+                    await interaction.response.send_message(
+                        f"✅ Tryb tablicy bugów ustawiony na: {mode_name}. Tablica zostanie przebudowana "
+                        f"przy następnej aktualizacji (lub użyj /refresh).", ephemeral=True)
+                    logger.info(f"Tryb tablicy bugów zmieniony na {tryb}")
+                else:
+                    await interaction.response.send_message("❌ Wystąpił błąd podczas zmiany trybu tablicy.",
+                                                            ephemeral=True)
 
             except Exception as e:
-                logger.error(f"Błąd podczas wyświetlania stanu bota: {e}")
+                logger.error(f"Błąd podczas zmiany trybu tablicy: {e}")
                 logger.error(traceback.format_exc())
                 try:
                     if not interaction.response.is_done():
                         await interaction.response.send_message(
-                            f"❌ Wystąpił błąd podczas wyświetlania stanu bota: {str(e)}",
+                            f"❌ Wystąpił błąd: {str(e)}",
                             ephemeral=True
                         )
                 except discord.errors.NotFound:
@@ -0,0 +1,496 @@
+# completion_counters.py
+import asyncio
+import datetime
+import logging
+import os
+import threading
+import time
+import traceback
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+
+from completion_log import decode_user, encode_user, get_completion_log, issue_key_hash
+from name_mapping import get_name_mapping_index
+from stats_engine import CompletionColumns, compute_insights
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+UNASSIGNED_NAME = "Nieprzypisane zadania"
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def parse_resolution_time(value) -> Optional[datetime.datetime]:
+    """
+    Odczytuje resolutiondate z Jiry (np. "2024-05-07T14:03:11.000+0200").
+
+    Args:
+        value (str): Data rozwiązania z pola resolutiondate
+
+    Returns:
+        datetime.datetime: Moment rozwiązania lub None, jeśli nie da się odczytać daty
+    """
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        # fromisoformat (Python 3.11+) jest wielokrotnie szybsze od strptime
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            return datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f%z')
+        except ValueError:
+            return None
+
+
+class CompletionCounterTable:
+    """
+    Tablica liczników ukończonych zadań: dzień x użytkownik x typ zadania.
+
+    Każda para (użytkownik, typ) ma własną tablicę dziennych liczników (array('I')),
+    a sumy prefiksowe są przeliczane leniwie tylko dla zmienionych wierszy.
+    Dzięki temu statystyki dla dowolnego okna N dni to jedno odejmowanie na parę
+    (użytkownik, typ), niezależnie od liczby zadań i długości okna.
+
+    Równolegle zadania są dopisywane do kolumn (CompletionColumns), z których silnik
+    statystyk liczy rozszerzone widoki (zmiana tydzień do tygodnia, serie dni).
+    """
+
+    def __init__(self, origin: datetime.date):
+        self.origin = origin  # Dzień o indeksie 0
+        self.days = 0  # Liczba dni w tablicy
+
+        # Użytkownicy są zapisywani jako surowa tożsamość z Jiry (displayName, accountId),
+        # a mapowanie na skrócone imiona odbywa się dopiero przy odczycie
+        self._users: List[Tuple[Optional[str], Optional[str]]] = []
+        self._user_index: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+        self._types: List[str] = []
+        self._type_index: Dict[str, int] = {}
+
+        self._rows: Dict[Tuple[int, int], array] = {}
+        self._prefix: Dict[Tuple[int, int], array] = {}
+        self._seen_keys = set()  # Skróty kluczy zadań (issue_key_hash)
+        self.columns = CompletionColumns()
+
+        self.covered_from: Optional[datetime.date] = None  # Najwcześniejszy dzień w pełni zsynchronizowany z Jirą
+        self.synced_at: Optional[datetime.datetime] = None  # Moment ostatniej synchronizacji
+        self.version = 0  # Zwiększane przy każdej zmianie liczników
+
+    def __len__(self):
+        return len(self._seen_keys)
+
+    def _ensure_day(self, day_index: int):
+        """Poszerza tablice dzienne tak, aby mieściły podany indeks dnia"""
+        if day_index < self.days:
+            return
+        grow = day_index + 1 - self.days
+        for row in self._rows.values():
+            row.extend(array('I', bytes(4 * grow)))
+        self.days = day_index + 1
+
+    def _rebase(self, new_origin: datetime.date):
+        """Przesuwa początek tablicy wstecz, gdy pojawi się zadanie sprzed bieżącego początku"""
+        shift = (self.origin - new_origin).days
+        padding = bytes(4 * shift)
+        for key, row in self._rows.items():
+            self._rows[key] = array('I', padding) + row
+        self._prefix.clear()
+        self.origin = new_origin
+        self.days += shift
+
+    def user_index(self, display_name: Optional[str], account_id: Optional[str]) -> int:
+        """Zwraca indeks użytkownika w tablicy, dodając go przy pierwszym wystąpieniu"""
+        user = (display_name, account_id)
+        user_idx = self._user_index.get(user)
+        if user_idx is None:
+            user_idx = self._user_index[user] = len(self._users)
+            self._users.append(user)
+        return user_idx
+
+    def type_index(self, issue_type: str) -> int:
+        """Zwraca indeks typu zadania w tablicy, dodając go przy pierwszym wystąpieniu"""
+        type_idx = self._type_index.get(issue_type)
+        if type_idx is None:
+            type_idx = self._type_index[issue_type] = len(self._types)
+            self._types.append(issue_type)
+        return type_idx
+
+    def record(self, key_hash: int, day: datetime.date, display_name: Optional[str], account_id: Optional[str],
+               issue_type: str, timestamp: int = 0) -> bool:
+        """
+        Rejestruje ukończenie zadania. Każde zadanie jest liczone tylko raz,
+        więc nakładające się synchronizacje nie zawyżają wyników.
+
+        Args:
+            key_hash (int): Skrót klucza zadania (issue_key_hash)
+            day (datetime.date): Dzień ukończenia
+            display_name (str): Nazwa przypisanej osoby lub None dla zadań nieprzypisanych
+            account_id (str): accountId przypisanej osoby lub None
+            issue_type (str): Typ zadania
+            timestamp (int): Moment ukończenia w sekundach epoki
+
+        Returns:
+            bool: True, jeśli zadanie zostało dodane (nie było wcześniej zliczone)
+        """
+        if key_hash in self._seen_keys:
+            return False
+        self._seen_keys.add(key_hash)
+
+        if day < self.origin:
+            self._rebase(day)
+        day_index = (day - self.origin).days
+        self._ensure_day(day_index)
+
+        user_idx = self.user_index(display_name, account_id)
+        type_idx = self.type_index(issue_type)
+
+        row_key = (user_idx, type_idx)
+        row = self._rows.get(row_key)
+        if row is None:
+            row = self._rows[row_key] = array('I', bytes(4 * self.days))
+        row[day_index] += 1
+        self._prefix.pop(row_key, None)
+        self.columns.append(user_idx, type_idx, day, timestamp)
+        self.version += 1
+        return True
+
+    def record_many(self, key_hashes: List[int], ordinals: List[int], user_indices: List[int],
+                    type_indices: List[int], timestamps: List[int]) -> int:
+        """
+        Rejestruje wiele ukończonych zadań naraz (np. przy wczytywaniu dziennika).
+        Liczniki są zwiększane raz na (użytkownik, typ, dzień), a nie raz na zadanie.
+
+        Args:
+            key_hashes (List[int]): Skróty kluczy zadań
+            ordinals (List[int]): Dni ukończenia (date.toordinal())
+            user_indices (List[int]): Indeksy użytkowników (z user_index)
+            type_indices (List[int]): Indeksy typów zadań (z type_index)
+            timestamps (List[int]): Momenty ukończenia w sekundach epoki
+
+        Returns:
+            int: Liczba nowo dodanych zadań
+        """
+        if not key_hashes:
+            return 0
+        seen = self._seen_keys
+        unique = set(key_hashes)
+        if len(unique) == len(key_hashes) and seen.isdisjoint(unique):
+            # Szybka ścieżka: wszystkie zadania są nowe i unikalne (typowe przy wczytywaniu dziennika)
+            seen |= unique
+            fresh = None
+        else:
+            fresh = [i for i, key_hash in enumerate(key_hashes) if key_hash not in seen and not seen.add(key_hash)]
+        if fresh is not None and len(fresh) != len(key_hashes):
+            if not fresh:
+                return 0
+            ordinals = [ordinals[i] for i in fresh]
+            user_indices = [user_indices[i] for i in fresh]
+            type_indices = [type_indices[i] for i in fresh]
+            timestamps = [timestamps[i] for i in fresh]
+
+        first_day = datetime.date.fromordinal(min(ordinals))
+        if first_day < self.origin:
+            self._rebase(first_day)
+        origin = self.origin.toordinal()
+        self._ensure_day(max(ordinals) - origin)
+
+        for (user_idx, type_idx, ordinal), count in Counter(zip(user_indices, type_indices, ordinals)).items():
+            row_key = (user_idx, type_idx)
+            row = self._rows.get(row_key)
+            if row is None:
+                row = self._rows[row_key] = array('I', bytes(4 * self.days))
+            row[ordinal - origin] += count
+
+        self._prefix.clear()
+        self.columns.extend(user_indices, type_indices, ordinals, timestamps)
+        self.version += 1
+        return len(key_hashes) if fresh is None else len(fresh)
+
+    def _prefix_row(self, row_key: Tuple[int, int]) -> array:
+        """Zwraca sumy prefiksowe wiersza (prefix[i] = suma dni 0..i-1)"""
+        prefix = self._prefix.get(row_key)
+        if prefix is None or len(prefix) != self.days + 1:
+            prefix = array('I', [0])
+            total = 0
+            for count in self._rows[row_key]:
+                total += count
+                prefix.append(total)
+            self._prefix[row_key] = prefix
+        return prefix
+
+    def covers(self, start_day: datetime.date) -> bool:
+        """Sprawdza, czy tablica ma pełne dane od podanego dnia"""
+        return self.covered_from is not None and self.covered_from <= start_day
+
+    def window_counts(self, start_day: datetime.date, end_day: datetime.date) -> Dict[Tuple[int, int], int]:
+        """
+        Zwraca liczby ukończonych zadań w oknie [start_day, end_day] dla każdej pary (użytkownik, typ).
+
+        Args:
+            start_day (datetime.date): Pierwszy dzień okna (włącznie)
+            end_day (datetime.date): Ostatni dzień okna (włącznie)
+
+        Returns:
+            Dict[Tuple[int, int], int]: Liczniki niezerowe według (indeks użytkownika, indeks typu)
+        """
+        lo = min(max((start_day - self.origin).days, 0), self.days)
+        hi = min(max((end_day - self.origin).days + 1, 0), self.days)
+        counts = {}
+        if lo >= hi:
+            return counts
+        for row_key in self._rows:
+            prefix = self._prefix_row(row_key)
+            count = prefix[hi] - prefix[lo]
+            if count:
+                counts[row_key] = count
+        return counts
+
+    def _collect_stats(self, counts) -> Tuple[Dict[str, Dict], Dict[int, str]]:
+        """
+        Składa liczniki (indeks użytkownika, indeks typu) -> liczba w statystyki użytkowników.
+        Tożsamość z Jiry jest mapowana na skrócone imiona raz na użytkownika, a nie na zadanie.
+
+        Returns:
+            Tuple[Dict[str, Dict], Dict[int, str]]: Statystyki według user_id i user_id dla indeksów użytkowników
+        """
+        name_index = get_name_mapping_index()
+
+        user_stats = {"unassigned": {"name": UNASSIGNED_NAME, "tasks_total": 0, "task_types": {}}}
+        for short_name in list(name_index.by_name.values()) + list(name_index.by_account_id.values()):
+            user_stats[f"mapped_{short_name}"] = {"name": short_name, "tasks_total": 0, "task_types": {}}
+
+        user_ids = {}
+        for user_idx, (display_name, account_id) in enumerate(self._users):
+            if display_name is None and account_id is None:
+                user_id, name = "unassigned", UNASSIGNED_NAME
+            else:
+                short_name = name_index.resolve(display_name, account_id)
+                if short_name is not None:
+                    user_id, name = f"mapped_{short_name}", short_name
+                else:
+                    user_id, name = f"original_{display_name}", display_name
+            user_ids[user_idx] = user_id
+            user_stats.setdefault(user_id, {"name": name, "tasks_total": 0, "task_types": {}})
+
+        for (user_idx, type_idx), count in counts:
+            stats = user_stats[user_ids[user_idx]]
+            issue_type = self._types[type_idx]
+            stats["tasks_total"] += count
+            stats["task_types"][issue_type] = stats["task_types"].get(issue_type, 0) + count
+
+        return user_stats, user_ids
+
+    @staticmethod
+    def _stats_list(user_stats: Dict[str, Dict]) -> List[Dict]:
+        """Zwraca użytkowników z zadaniami (i wszystkich zmapowanych), posortowanych malejąco po liczbie zadań"""
+        stats_list = []
+        for user_id, stats in user_stats.items():
+            if stats["tasks_total"] > 0 or user_id.startswith("mapped_"):
+                stats["user_id"] = user_id
+                stats_list.append(stats)
+        stats_list.sort(key=lambda x: x["tasks_total"], reverse=True)
+        return stats_list
+
+    def window_stats(self, start_day: datetime.date, end_day: datetime.date) -> List[Dict]:
+        """
+        Zwraca statystyki użytkowników dla okna w tym samym formacie co aggregate_user_statistics
+        (name, tasks_total, task_types, user_id), łącznie z pustymi wpisami dla zmapowanych osób.
+
+        Args:
+            start_day (datetime.date): Pierwszy dzień okna (włącznie)
+            end_day (datetime.date): Ostatni dzień okna (włącznie)
+
+        Returns:
+            List[Dict]: Statystyki posortowane malejąco po liczbie zadań
+        """
+        user_stats, _ = self._collect_stats(self.window_counts(start_day, end_day).items())
+        return self._stats_list(user_stats)
+
+    def insight_stats(self, days: int, end_day: datetime.date) -> List[Dict]:
+        """
+        Zwraca statystyki okna `days` dni rozszerzone o udziały typów zadań (type_shares),
+        zmianę liczby zadań tydzień do tygodnia (week_delta) i serię dni roboczych (streak).
+
+        Args:
+            days (int): Długość okna w dniach
+            end_day (datetime.date): Ostatni dzień okna (włącznie)
+
+        Returns:
+            List[Dict]: Statystyki posortowane malejąco po liczbie zadań
+        """
+        insights = compute_insights(self.columns, end_day, days, len(self._users), len(self._types))
+        counts = (
+            ((user_idx, type_idx), count)
+            for user_idx, info in insights.items()
+            for type_idx, count in enumerate(info["window"]) if count
+        )
+        user_stats, user_ids = self._collect_stats(counts)
+
+        for stats in user_stats.values():
+            stats["week_delta"] = 0
+            stats["streak"] = 0
+        for user_idx, info in insights.items():
+            # Kilka tożsamości z Jiry może wskazywać tę samą osobę - delty się sumują, seria to najdłuższa z nich
+            stats = user_stats[user_ids[user_idx]]
+            stats["week_delta"] += info["week_delta"]
+            stats["streak"] = max(stats["streak"], info["streak"])
+        for stats in user_stats.values():
+            total = stats["tasks_total"]
+            stats["type_shares"] = {t: count / total for t, count in stats["task_types"].items()} if total else {}
+
+        return self._stats_list(user_stats)
+
+
+def record_completions(table: "CompletionCounterTable", tasks: List, timezone) -> int:
+    """
+    Dopisuje ukończone zadania do tablicy liczników i do trwałego dziennika.
+    Epiki i zadania bez daty rozwiązania są pomijane, a zadania już zliczone - ignorowane.
+
+    Args:
+        table (CompletionCounterTable): Tablica liczników
+        tasks (List[Issue]): Zadania z polami assignee, issuetype i resolutiondate
+        timezone (pytz.timezone): Strefa czasowa, w której liczone są dni
+
+    Returns:
+        int: Liczba nowo dodanych zadań
+    """
+    events = []
+    for task in tasks:
+        try:
+            issue_type = task.fields.issuetype.name
+            if issue_type.lower() == "epic":
+                continue
+
+            resolved = parse_resolution_time(getattr(task.fields, 'resolutiondate', None))
+            if resolved is None:
+                logger.debug(f"Zadanie {task.key} nie ma daty rozwiązania, pomijanie")
+                continue
+            if resolved.tzinfo is not None:
+                resolved = resolved.astimezone(timezone)
+
+            assignee = getattr(task.fields, 'assignee', None)
+            display_name = assignee.displayName if assignee else None
+            account_id = getattr(assignee, 'accountId', None) if assignee else None
+
+            key_hash = issue_key_hash(task.key)
+            timestamp = int(resolved.timestamp())
+            if table.record(key_hash, resolved.date(), display_name, account_id, issue_type, timestamp):
+                events.append((timestamp, encode_user(display_name, account_id), issue_type, key_hash))
+
+        except Exception as task_error:
+            logger.error(f"Błąd podczas zliczania zadania {getattr(task, 'key', 'unknown')}: {task_error}")
+            logger.error(traceback.format_exc())
+
+    if events:
+        log = get_completion_log()
+        if log is not None:
+            try:
+                log.append(events)
+            except Exception as e:
+                logger.error(f"Błąd podczas zapisu do dziennika ukończonych zadań: {e}")
+                logger.error(traceback.format_exc())
+
+    return len(events)
+
+
+def save_sync_state(table: "CompletionCounterTable"):
+    """Zapisuje w dzienniku zakres, dla którego tablica liczników jest kompletna"""
+    log = get_completion_log()
+    if log is None:
+        return
+    try:
+        log.set_sync_state(table.covered_from, int(table.synced_at.timestamp()) if table.synced_at else None)
+    except Exception as e:
+        logger.error(f"Błąd podczas zapisu stanu synchronizacji dziennika: {e}")
+        logger.error(traceback.format_exc())
+
+
+def _load_history(table: "CompletionCounterTable"):
+    """Wczytuje do tablicy liczników historię ukończonych zadań z trwałego dziennika"""
+    log = get_completion_log()
+    if log is None:
+        return
+    try:
+        started = time.perf_counter()
+        timezone = pytz.timezone(os.getenv('TIMEZONE', 'Europe/Warsaw'))
+        strings = log.strings
+        records = log.read_records()
+        # Transpozycja rekordów na kolumny odbywa się w C (zip), bez pętli Pythona
+        timestamps, user_ids, type_ids, key_hashes = zip(*records) if records else ((), (), (), ())
+        if records and max(max(user_ids), max(type_ids)) >= len(strings):
+            valid = [r for r in records if r[1] < len(strings) and r[2] < len(strings)]
+            logger.warning(f"Pominięto {len(records) - len(valid)} rekordów dziennika z nieznanymi napisami")
+            timestamps, user_ids, type_ids, key_hashes = zip(*valid) if valid else ((), (), (), ())
+
+        # Id napisów z dziennika zamieniane na indeksy tablicy raz na napis, a nie na rekord
+        user_indices = {user_id: table.user_index(*decode_user(strings[user_id])) for user_id in set(user_ids)}
+        type_indices = {type_id: table.type_index(strings[type_id]) for type_id in set(type_ids)}
+
+        # Przesunięcie strefy jest liczone raz na dobę UTC; tylko w dni zmiany czasu dzień liczony jest dla każdego rekordu
+        offsets = {}
+        for utc_day in {timestamp // 86400 for timestamp in timestamps}:
+            first = datetime.datetime.fromtimestamp(utc_day * 86400, timezone).utcoffset()
+            last = datetime.datetime.fromtimestamp(utc_day * 86400 + 86399, timezone).utcoffset()
+            offsets[utc_day] = int(first.total_seconds()) if first == last else None
+
+        def day_ordinal(timestamp):
+            offset = offsets[timestamp // 86400]
+            if offset is None:
+                return datetime.datetime.fromtimestamp(timestamp, timezone).date().toordinal()
+            return (timestamp + offset) // 86400 + EPOCH_ORDINAL
+
+        table.record_many(
+            list(key_hashes),
+            list(map(day_ordinal, timestamps)),
+            list(map(user_indices.__getitem__, user_ids)),
+            list(map(type_indices.__getitem__, type_ids)),
+            list(timestamps),
+        )
+
+        table.covered_from = log.covered_from
+        table.synced_at = datetime.datetime.fromtimestamp(log.synced_at, timezone) if log.synced_at else None
+        logger.info(f"Wczytano {len(table)} ukończonych zadań z dziennika {log.path} "
+                    f"w {(time.perf_counter() - started) * 1000:.0f} ms")
+    except Exception as e:
+        logger.error(f"Błąd podczas wczytywania dziennika ukończonych zadań: {e}")
+        logger.error(traceback.format_exc())
+
+
+# Zmienne globalne
+_table: Optional[CompletionCounterTable] = None
+_table_lock = threading.Lock()
+
+
+def get_completion_counters(today: Optional[datetime.date] = None) -> CompletionCounterTable:
+    """
+    Zwraca współdzieloną tablicę liczników ukończonych zadań. Przy pierwszym użyciu
+    tablica jest tworzona i wypełniana historią z trwałego dziennika (w działającym bocie
+    robi to wcześniej preload_completion_counters, poza pętlą zdarzeń).
+
+    Args:
+        today (datetime.date, optional): Dzień bazowy dla nowej tablicy
+
+    Returns:
+        CompletionCounterTable: Tablica liczników
+    """
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                table = CompletionCounterTable(today or datetime.date.today())
+                _load_history(table)
+                _table = table
+    return _table
+
+
+async def preload_completion_counters() -> CompletionCounterTable:
+    """
+    Wczytuje historię ukończonych zadań w osobnym wątku, żeby pierwszy raport, tablica wyników
+    lub komenda nie czytały dziennika w pętli zdarzeń.
+
+    Returns:
+        CompletionCounterTable: Tablica liczników
+    """
+    return await asyncio.to_thread(get_completion_counters)
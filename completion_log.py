@@ -0,0 +1,267 @@
+# completion_log.py
+"""
+Trwały dziennik ukończonych zadań.
+
+Dziennik składa się z dwóch plików:
+- pliku binarnego z nagłówkiem i rekordami o stałej szerokości
+  (moment ukończenia, id użytkownika, id typu zadania, skrót klucza zadania),
+- tablicy napisów (jeden napis JSON w linii, numer linii to id napisu).
+
+Oba pliki są tylko dopisywane, więc przerwany zapis może najwyżej urwać ostatni
+rekord lub linię - takie końcówki są odrzucane przy otwarciu. Przy starcie plik
+binarny jest mapowany w pamięci (mmap) i odczytywany jednym przebiegiem struct.iter_unpack.
+
+Kompaktowanie (usunięcie zduplikowanych zadań i sortowanie według czasu):
+    python completion_log.py compact [ścieżka]
+"""
+import datetime
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import traceback
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Domyślna lokalizacja dziennika - obok plików bota
+DEFAULT_LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'completion_log.bin')
+
+MAGIC = b'CLOG'
+VERSION = 1
+
+# Nagłówek: magia, wersja, rozmiar rekordu, pierwszy w pełni zsynchronizowany dzień (ordinal, 0 = brak),
+# moment ostatniej synchronizacji (sekundy epoki, 0 = brak)
+HEADER = struct.Struct('<4sHHiq')
+
+# Rekord: moment ukończenia (sekundy epoki), id użytkownika, id typu zadania, skrót klucza zadania
+RECORD = struct.Struct('<qIIQ')
+
+# Separator nazwy i accountId w napisie identyfikującym użytkownika
+USER_SEPARATOR = '\x1f'
+
+
+def issue_key_hash(key: str) -> int:
+    """Zwraca 64-bitowy skrót klucza zadania (np. PROJ-123)"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def encode_user(display_name: Optional[str], account_id: Optional[str]) -> str:
+    """Zamienia tożsamość użytkownika z Jiry na napis tablicy napisów (pusty napis = nieprzypisane)"""
+    if display_name is None and account_id is None:
+        return ""
+    return f"{display_name or ''}{USER_SEPARATOR}{account_id or ''}"
+
+
+def decode_user(value: str) -> Tuple[Optional[str], Optional[str]]:
+    """Odwraca encode_user"""
+    if not value:
+        return None, None
+    display_name, _, account_id = value.partition(USER_SEPARATOR)
+    return display_name or None, account_id or None
+
+
+class CompletionLog:
+    """Dziennik ukończonych zadań (plik rekordów i tablica napisów)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.strings_path = path + '.strings'
+        self.strings: List[str] = []
+        self._string_ids = {}
+        self.covered_from: Optional[datetime.date] = None
+        self.synced_at: Optional[int] = None
+        self.record_count = 0
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self):
+        """Wczytuje tablicę napisów i nagłówek, tworząc pliki, jeśli nie istnieją"""
+        if os.path.exists(self.strings_path):
+            with open(self.strings_path, 'rb') as f:
+                data = f.read()
+            complete = data[:data.rfind(b'\n') + 1]
+            if len(complete) != len(data):
+                logger.warning(f"Odrzucono niepełną linię na końcu {self.strings_path}")
+                with open(self.strings_path, 'r+b') as f:
+                    f.truncate(len(complete))
+            for line in complete.decode('utf-8').splitlines():
+                value = json.loads(line)
+                self._string_ids[value] = len(self.strings)
+                self.strings.append(value)
+
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+            with open(self.path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, 0))
+            return
+
+        with open(self.path, 'r+b') as f:
+            magic, version, record_size, covered_from, synced_at = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError(f"Nieobsługiwany format dziennika {self.path}")
+            self.covered_from = datetime.date.fromordinal(covered_from) if covered_from else None
+            self.synced_at = synced_at or None
+
+            size = os.fstat(f.fileno()).st_size
+            self.record_count = (size - HEADER.size) // RECORD.size
+            if HEADER.size + self.record_count * RECORD.size != size:
+                logger.warning(f"Odrzucono niepełny rekord na końcu {self.path}")
+                f.truncate(HEADER.size + self.record_count * RECORD.size)
+
+    def read_records(self) -> List[Tuple[int, int, int, int]]:
+        """
+        Zwraca rekordy dziennika (timestamp, id użytkownika, id typu, skrót klucza),
+        odczytane z pliku zmapowanego w pamięci jednym przebiegiem struct.iter_unpack.
+        Rekordy są rozpakowywane bezpośrednio z mapy (memoryview), bez kopiowania obszaru rekordów.
+        """
+        if not self.record_count:
+            return []
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # Widok musi zostać zwolniony przed zamknięciem mapy
+            with memoryview(mapped) as view:
+                with view[HEADER.size:HEADER.size + self.record_count * RECORD.size] as region:
+                    return list(RECORD.iter_unpack(region))
+
+    def _intern(self, value: str, new_strings: List[str]) -> int:
+        """Zwraca id napisu, dodając go do tablicy (zapis następuje w append)"""
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+            new_strings.append(value)
+        return string_id
+
+    def append(self, events: Iterable[Tuple[int, str, str, int]]) -> int:
+        """
+        Dopisuje zdarzenia ukończenia zadań. Najpierw zapisywane są nowe napisy,
+        dopiero potem rekordy, które się do nich odwołują.
+
+        Args:
+            events (Iterable[Tuple[int, str, str, int]]): Krotki (timestamp, napis użytkownika, typ zadania, skrót klucza)
+
+        Returns:
+            int: Liczba dopisanych rekordów
+        """
+        with self._lock:
+            new_strings: List[str] = []
+            payload = bytearray()
+            for timestamp, user, issue_type, key_hash in events:
+                payload += RECORD.pack(timestamp, self._intern(user, new_strings),
+                                       self._intern(issue_type, new_strings), key_hash)
+            if not payload:
+                return 0
+
+            if new_strings:
+                with open(self.strings_path, 'ab') as f:
+                    f.write("".join(json.dumps(s, ensure_ascii=False) + "\n" for s in new_strings).encode('utf-8'))
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            with open(self.path, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+            added = len(payload) // RECORD.size
+            self.record_count += added
+            return added
+
+    def set_sync_state(self, covered_from: Optional[datetime.date], synced_at: Optional[int]):
+        """Zapisuje w nagłówku zakres, dla którego dziennik jest kompletny"""
+        with self._lock:
+            self.covered_from = covered_from
+            self.synced_at = synced_at
+            with open(self.path, 'r+b') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size,
+                                    covered_from.toordinal() if covered_from else 0, synced_at or 0))
+                f.flush()
+                os.fsync(f.fileno())
+
+
+# Zmienne globalne
+_log: Optional[CompletionLog] = None
+
+
+def get_log_path() -> str:
+    """Zwraca ścieżkę dziennika (COMPLETION_LOG_FILE lub domyślna)"""
+    return os.getenv('COMPLETION_LOG_FILE', DEFAULT_LOG_FILE)
+
+
+def get_completion_log() -> Optional[CompletionLog]:
+    """
+    Zwraca współdzielony dziennik ukończonych zadań (otwiera go przy pierwszym użyciu).
+
+    Returns:
+        CompletionLog: Dziennik lub None, jeśli nie udało się go otworzyć
+    """
+    global _log
+    if _log is None:
+        try:
+            _log = CompletionLog(get_log_path())
+        except Exception as e:
+            logger.error(f"Błąd podczas otwierania dziennika ukończonych zadań: {e}")
+            logger.error(traceback.format_exc())
+    return _log
+
+
+def compact(path: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Kompaktuje dziennik: usuwa zduplikowane zadania (zostaje ostatni wpis)
+    i sortuje rekordy według czasu. Tablica napisów (kilkadziesiąt nazw i typów)
+    zostaje bez zmian, więc id napisów są stabilne, a plik rekordów jest podmieniany atomowo.
+    Nie należy uruchamiać go równolegle z działającym botem.
+
+    Args:
+        path (str, optional): Ścieżka dziennika
+
+    Returns:
+        Tuple[int, int]: Liczba rekordów przed i po kompaktowaniu
+    """
+    log = CompletionLog(path or get_log_path())
+    latest = {}
+    for timestamp, user_id, type_id, key_hash in log.read_records():
+        latest[key_hash] = (timestamp, user_id, type_id)
+
+    payload = bytearray(HEADER.pack(MAGIC, VERSION, RECORD.size,
+                                    log.covered_from.toordinal() if log.covered_from else 0, log.synced_at or 0))
+    for key_hash, (timestamp, user_id, type_id) in sorted(latest.items(), key=lambda item: item[1][0]):
+        payload += RECORD.pack(timestamp, user_id, type_id, key_hash)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(log.path)), prefix='.completion_log_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, log.path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+    return log.record_count, len(latest)
+
+
+def main(argv: List[str]) -> int:
+    """Narzędzie wiersza poleceń: compact [ścieżka] lub stats [ścieżka]"""
+    if not argv or argv[0] not in ('compact', 'stats'):
+        print("Użycie: python completion_log.py compact|stats [ścieżka]")
+        return 2
+
+    path = argv[1] if len(argv) > 1 else get_log_path()
+    if argv[0] == 'compact':
+        before, after = compact(path)
+        print(f"Skompaktowano {path}: {before} -> {after} rekordów")
+    else:
+        log = CompletionLog(path)
+        print(f"{path}: {log.record_count} rekordów, {len(log.strings)} napisów, "
+              f"pełne dane od {log.covered_from or '-'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,374 @@
+# dry_run.py
+"""
+Przebiegi próbne cykli bota bez połączenia z Discordem.
+
+Wiadomości trafiają do sztucznego klienta Discorda (fake_discord), a trwały stan bota
+jest tylko odczytywany - przebieg próbny nie nadpisze ID wiadomości prawdziwej tablicy.
+Dziennik ukończonych zadań jest kopiowany do katalogu tymczasowego, więc zadania pobrane
+w przebiegu próbnym (np. ze sztucznej Jiry lub kasety) nie trafiają do prawdziwego dziennika.
+Jira jest prawdziwa albo zastępcza (JIRA_SERVER wskazujący sztuczną Jirę lub kaseta Jiry).
+
+Renderowanie tablicy bugów, raportu dziennego i tablicy wyników do plików JSON (bez logowania do Discorda):
+    python main.py --dry-run [--dry-run-dir dry_run] [--dry-run-cycles bugs report leaderboard]
+
+Profilowanie jednego cyklu (cProfile i raport alokacji tracemalloc):
+    python main.py --profile-cycle bugs|report|leaderboard [--profile-dir profile] [--profile-top 25]
+"""
+import asyncio
+import atexit
+import contextlib
+import cProfile
+import datetime
+import io
+import json
+import logging
+import os
+import pstats
+import shutil
+import tempfile
+import time
+import traceback
+import tracemalloc
+from typing import Dict, List, Sequence
+
+from bot_config import get_bug_message_ids, get_channel_id, set_channel_id, setup_bot_and_config
+from completion_log import get_log_path
+from embed_layout import (
+    DESCRIPTION_LIMIT, EMBED_TOTAL_LIMIT, EMBEDS_PER_MESSAGE, FIELD_NAME_LIMIT, FIELD_VALUE_LIMIT, FIELDS_PER_EMBED,
+    FOOTER_LIMIT, TITLE_LIMIT
+)
+from fake_discord import FakeDiscordClient
+from leaderboard import send_leaderboard_to_channel
+from message_updater import update_bugs_message
+from reports import send_daily_report
+from state_store import set_read_only
+from tracing import start_trace
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+CYCLES = ('bugs', 'report', 'leaderboard')
+
+# Kanały sztucznego klienta, gdy w konfiguracji nie ustawiono kanału
+DEFAULT_DRY_RUN_CHANNELS = {'bugs': 1, 'reports': 2, 'leaderboard': 3}
+
+# Liczba ramek stosu zapisywanych przez tracemalloc dla każdej alokacji
+TRACEMALLOC_FRAMES = 10
+
+
+def _isolate_completion_log():
+    """
+    Kieruje dziennik ukończonych zadań (COMPLETION_LOG_FILE) na kopię w katalogu tymczasowym.
+    Cykle raportu i tablicy wyników dopisują do dziennika zadania pobrane z Jiry, a przebieg
+    próbny może używać sztucznej Jiry lub kasety. Kopia zachowuje dotychczasową historię,
+    więc synchronizacja z Jirą pozostaje przyrostowa. Musi być wywołana przed pierwszym
+    otwarciem dziennika.
+    """
+    source = get_log_path()
+    workdir = tempfile.mkdtemp(prefix="dry_run_")
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+    target = os.path.join(workdir, os.path.basename(source))
+    for suffix in ('', '.strings'):
+        if os.path.exists(source + suffix):
+            shutil.copyfile(source + suffix, target + suffix)
+    os.environ['COMPLETION_LOG_FILE'] = target
+    logger.info(f"Przebieg próbny używa kopii dziennika ukończonych zadań: {target}")
+
+
+def prepare_dry_run() -> FakeDiscordClient:
+    """
+    Wczytuje konfigurację bota (bez logowania do Discorda), wyłącza zapis stanu, przekierowuje
+    dziennik ukończonych zadań na kopię i tworzy sztuczny klient Discorda z kanałami z konfiguracji.
+
+    Returns:
+        FakeDiscordClient: Klient, do którego trafiają wiadomości
+    """
+    setup_bot_and_config()
+    set_read_only(True)
+    _isolate_completion_log()
+
+    client = FakeDiscordClient()
+    for channel_type, default_id in DEFAULT_DRY_RUN_CHANNELS.items():
+        if not get_channel_id(channel_type):
+            set_channel_id(channel_type, default_id)
+        client.add_channel(get_channel_id(channel_type), f"{channel_type} (przebieg próbny)")
+
+    # Zapamiętane wiadomości tablicy istnieją na sztucznym kanale, więc cykl bugów
+    # przechodzi ścieżką edycji jak w działającym bocie (bez zapamiętanych - pierwsze wysłanie)
+    bugs_channel = client.get_channel(get_channel_id('bugs'))
+    for message_id in get_bug_message_ids():
+        bugs_channel.add_message(message_id=message_id)
+    return client
+
+
+async def run_cycle(name: str, client: FakeDiscordClient) -> bool:
+    """
+    Wykonuje jeden cykl bota na sztucznym kliencie Discorda.
+
+    Args:
+        name (str): Cykl - 'bugs', 'report' lub 'leaderboard'
+        client (FakeDiscordClient): Sztuczny klient Discorda
+
+    Returns:
+        bool: Wynik cyklu
+
+    Raises:
+        ValueError: Dla nieznanego cyklu
+    """
+    if name == 'bugs':
+        return await update_bugs_message(client, force=True)
+    if name == 'report':
+        return await send_daily_report(client)
+    if name == 'leaderboard':
+        return await send_leaderboard_to_channel(client, get_channel_id('leaderboard'))
+    raise ValueError(f"Nieznany cykl: {name} (dostępne: {', '.join(CYCLES)})")
+
+
+def message_violations(embeds: List[Dict]) -> List[str]:
+    """
+    Sprawdza limity Discorda dla jednej wiadomości.
+
+    Args:
+        embeds (List[Dict]): Embedy wiadomości (discord.Embed.to_dict())
+
+    Returns:
+        List[str]: Opisy przekroczonych limitów (pusta lista - wiadomość poprawna)
+    """
+    violations = []
+    if len(embeds) > EMBEDS_PER_MESSAGE:
+        violations.append(f"{len(embeds)} embedów w wiadomości (limit {EMBEDS_PER_MESSAGE})")
+
+    total = 0
+    for number, embed in enumerate(embeds, 1):
+        fields = embed.get("fields", [])
+        if len(fields) > FIELDS_PER_EMBED:
+            violations.append(f"embed {number}: {len(fields)} pól (limit {FIELDS_PER_EMBED})")
+        # Każdy rodzaj tekstu zgłaszany raz na embed (najdłuższy i liczba przekroczeń)
+        checks = [("tytuł", [embed.get("title", "")], TITLE_LIMIT),
+                  ("opis", [embed.get("description", "")], DESCRIPTION_LIMIT),
+                  ("stopka", [embed.get("footer", {}).get("text", "")], FOOTER_LIMIT),
+                  ("nazwa pola", [field.get("name", "") for field in fields], FIELD_NAME_LIMIT),
+                  ("wartość pola", [field.get("value", "") for field in fields], FIELD_VALUE_LIMIT)]
+        for label, texts, limit in checks:
+            too_long = [len(text) for text in texts if len(text) > limit]
+            if too_long:
+                count = f" (×{len(too_long)})" if len(too_long) > 1 else ""
+                violations.append(f"embed {number}: {label} ma {max(too_long)} znaków{count} (limit {limit})")
+            total += sum(len(text) for text in texts)
+        total += len(embed.get("author", {}).get("name", ""))
+
+    if total > EMBED_TOTAL_LIMIT:
+        violations.append(f"{total} znaków w embedach wiadomości (limit {EMBED_TOTAL_LIMIT})")
+    return violations
+
+
+def _sent_messages(client: FakeDiscordClient) -> List[Dict]:
+    """Zwraca ostateczną treść wiadomości wysłanych lub edytowanych w cyklu (w kolejności wywołań)"""
+    messages = []
+    seen = set()
+    for call in client.calls:
+        if call.operation not in ('send', 'edit') or call.message_id in seen:
+            continue
+        seen.add(call.message_id)
+        message = client.get_channel(call.channel_id).messages.get(call.message_id)
+        if message is None:
+            continue
+        embeds = [embed.to_dict() for embed in message.embeds]
+        messages.append({
+            "channel_id": call.channel_id,
+            "message_id": call.message_id,
+            "content": message.content,
+            "embeds": embeds,
+            "chars": sum(len(embed) for embed in message.embeds) + len(message.content or ""),
+            "violations": message_violations(embeds),
+        })
+    return messages
+
+
+async def render_cycle(name: str, client: FakeDiscordClient) -> Dict:
+    """
+    Wykonuje cykl na sztucznym kliencie Discorda i zwraca wyrenderowane wiadomości ze statystykami.
+
+    Args:
+        name (str): Cykl - 'bugs', 'report' lub 'leaderboard'
+        client (FakeDiscordClient): Sztuczny klient Discorda
+
+    Returns:
+        Dict: Wynik cyklu, wiadomości (embedy jak w API Discorda), statystyki rozmiaru i czasy etapów
+    """
+    client.reset_calls()
+    started = time.perf_counter()
+    result, trace = await _traced_cycle(name, client)
+    duration = time.perf_counter() - started
+
+    messages = _sent_messages(client)
+    embeds = [embed for message in messages for embed in message["embeds"]]
+    return {
+        "cycle": name,
+        "success": bool(result),
+        "duration_ms": round(duration * 1000, 2),
+        "stages": {stage: {"ms": round(totals["seconds"] * 1000, 2), "calls": totals["calls"],
+                           "bytes": totals["bytes"]}
+                   for stage, totals in trace.stage_totals().items()},
+        "stats": {
+            "messages": len(messages),
+            "embeds": len(embeds),
+            "fields": sum(len(embed.get("fields", [])) for embed in embeds),
+            "chars": sum(message["chars"] for message in messages),
+            "max_message_chars": max((message["chars"] for message in messages), default=0),
+            "json_bytes": len(json.dumps(embeds, ensure_ascii=False).encode('utf-8')),
+            "violations": sum(len(message["violations"]) for message in messages),
+        },
+        "discord": client.summary(),
+        "messages": messages,
+    }
+
+
+def render_dry_run(output_dir: str = "dry_run", cycles: Sequence[str] = CYCLES) -> int:
+    """
+    Renderuje wybrane cykle bez logowania do Discorda i zapisuje wyniki jako JSON:
+    plik <cykl>.json z wiadomościami i statystykami oraz summary.json ze statystykami wszystkich cykli.
+
+    Args:
+        output_dir (str): Katalog wyników
+        cycles (Sequence[str]): Cykle do wykonania
+
+    Returns:
+        int: Kod wyjścia (0 - wszystkie cykle udane i w limitach Discorda, 1 - w przeciwnym razie)
+    """
+    unknown = [name for name in cycles if name not in CYCLES]
+    if unknown:
+        logger.error(f"Nieznane cykle: {', '.join(unknown)} (dostępne: {', '.join(CYCLES)})")
+        return 2
+
+    try:
+        client = prepare_dry_run()
+        os.makedirs(output_dir, exist_ok=True)
+
+        async def render_all():
+            return [await render_cycle(name, client) for name in cycles]
+
+        results = asyncio.run(render_all())
+
+        summary = {"generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(), "cycles": {}}
+        for result in results:
+            with open(os.path.join(output_dir, f"{result['cycle']}.json"), 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            summary["cycles"][result["cycle"]] = {key: result[key] for key in ("success", "duration_ms", "stages", "stats")}
+            stats = result["stats"]
+            log = logger.info if result["success"] and not stats["violations"] else logger.error
+            log(f"Przebieg próbny {result['cycle']}: {'ok' if result['success'] else 'niepowodzenie'}, "
+                f"{result['duration_ms']:.0f} ms, {stats['messages']} wiadomości, {stats['embeds']} embedów, "
+                f"{stats['chars']} znaków, przekroczenia limitów: {stats['violations']}")
+            for message in result["messages"]:
+                for violation in message["violations"]:
+                    logger.error(f"Przekroczony limit Discorda ({result['cycle']}): {violation}")
+
+        with open(os.path.join(output_dir, "summary.json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        logger.info(f"Wyniki przebiegu próbnego zapisane w {output_dir}")
+
+        failed = any(not result["success"] or result["stats"]["violations"] for result in results)
+        return 1 if failed else 0
+    except Exception as e:
+        logger.error(f"Błąd podczas przebiegu próbnego: {e}")
+        logger.error(traceback.format_exc())
+        return 1
+
+
+@contextlib.contextmanager
+def _inline_threads():
+    """
+    Wykonuje asyncio.to_thread w wątku pętli zdarzeń. cProfile mierzy tylko wątek, w którym
+    go włączono, a bez tego zapytania do Jiry i parsowanie odpowiedzi byłyby niewidoczne.
+    """
+    original = asyncio.to_thread
+
+    async def to_thread(func, /, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    asyncio.to_thread = to_thread
+    try:
+        yield
+    finally:
+        asyncio.to_thread = original
+
+
+async def _traced_cycle(name: str, client: FakeDiscordClient):
+    with start_trace(f"dry_run:{name}") as trace:
+        result = await run_cycle(name, client)
+        trace.set(success=bool(result))
+    return result, trace
+
+
+def profile_cycle(name: str, output_dir: str = "profile", top: int = 25) -> int:
+    """
+    Profiluje jeden cykl: zapisuje statystyki cProfile (.prof, do pstats/snakeviz) oraz raport
+    tekstowy z najdroższymi funkcjami, największymi miejscami alokacji (tracemalloc),
+    wywołaniami Discorda i podsumowaniem śladu cyklu.
+
+    Args:
+        name (str): Cykl - 'bugs', 'report' lub 'leaderboard'
+        output_dir (str): Katalog wyników
+        top (int): Liczba pozycji w zestawieniach
+
+    Returns:
+        int: Kod wyjścia (0 - cykl zakończony powodzeniem)
+    """
+    if name not in CYCLES:
+        logger.error(f"Nieznany cykl: {name} (dostępne: {', '.join(CYCLES)})")
+        return 2
+
+    try:
+        client = prepare_dry_run()
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(output_dir, f"{name}-{stamp}")
+
+        profiler = cProfile.Profile()
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        started = time.perf_counter()
+        with _inline_threads():
+            profiler.enable()
+            try:
+                result, trace = asyncio.run(_traced_cycle(name, client))
+            finally:
+                profiler.disable()
+        elapsed = time.perf_counter() - started
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        profiler.dump_stats(f"{base}.prof")
+
+        report = io.StringIO()
+        report.write(f"Cykl: {name}, wynik: {result}, czas: {elapsed:.3f}s, szczyt pamięci: {peak / 1024:.1f} KiB\n")
+        report.write(f"Ślad: {trace.summary_line()}\n")
+        report.write(f"Discord (przebieg próbny): {client.summary()}\n")
+
+        report.write(f"\n=== cProfile: {top} funkcji o największym czasie łącznym ===\n")
+        stats = pstats.Stats(profiler, stream=report).strip_dirs()
+        stats.sort_stats('cumulative').print_stats(top)
+        report.write(f"\n=== cProfile: {top} funkcji o największym czasie własnym ===\n")
+        stats.sort_stats('tottime').print_stats(top)
+
+        # tracemalloc działa tylko w czasie cyklu, więc zrzut zawiera pamięć zaalokowaną w cyklu i nadal zajętą
+        # (np. cache, migawki); chwilowe alokacje widać w szczycie pamięci
+        report.write(f"\n=== tracemalloc: {top} miejsc z największą pamięcią zaalokowaną w cyklu i zajętą po nim ===\n")
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        for index, stat in enumerate(snapshot.statistics('lineno')[:top], 1):
+            frame = stat.traceback[0]
+            report.write(f"{index:>3}. {frame.filename}:{frame.lineno} - {stat.size / 1024:.1f} KiB "
+                         f"w {stat.count} blokach\n")
+
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+
+        logger.info(f"Profil cyklu {name} zapisany: {base}.prof, {base}.txt ({elapsed:.3f}s)")
+        return 0 if result else 1
+    except Exception as e:
+        logger.error(f"Błąd podczas profilowania cyklu {name}: {e}")
+        logger.error(traceback.format_exc())
+        return 1
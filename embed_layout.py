@@ -0,0 +1,174 @@
+# embed_layout.py
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional
+
+from render_model import RenderedEmbed, RenderedField
+
+# Limity Discord dla embedów
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+FOOTER_LIMIT = 2048
+FIELDS_PER_EMBED = 25
+EMBED_TOTAL_LIMIT = 6000  # Suma wszystkich tekstów embeda (i wszystkich embedów w jednej wiadomości)
+EMBEDS_PER_MESSAGE = 10
+
+
+def truncate(text: str, limit: int) -> str:
+    """
+    Skraca tekst do podanej długości, dodając wielokropek.
+
+    Args:
+        text (str): Tekst do skrócenia
+        limit (int): Maksymalna długość wyniku
+
+    Returns:
+        str: Tekst o długości najwyżej `limit` znaków
+    """
+    if len(text) <= limit:
+        return text
+    return text[:max(limit - 1, 0)] + "…"
+
+
+def section_fields(name: str, entries: Iterable[str], inline: bool = False) -> List[RenderedField]:
+    """
+    Dzieli wpisy sekcji na pola mieszczące się w limicie 1024 znaków.
+    Jeśli sekcja zajmuje kilka pól, są one oznaczane jako "(część N)".
+
+    Args:
+        name (str): Nazwa sekcji
+        entries (Iterable[str]): Wpisy sekcji, każdy zakończony znakiem nowej linii
+        inline (bool): Czy pola mają być wyświetlane w linii
+
+    Returns:
+        List[RenderedField]: Pola sekcji (żadne, jeśli nie ma wpisów)
+    """
+    chunks = []
+    parts: List[str] = []
+    parts_len = 0
+
+    for entry in entries:
+        entry = truncate(entry, FIELD_VALUE_LIMIT)
+        if parts and parts_len + len(entry) > FIELD_VALUE_LIMIT:
+            chunks.append("".join(parts))
+            parts = []
+            parts_len = 0
+        parts.append(entry)
+        parts_len += len(entry)
+
+    if parts:
+        chunks.append("".join(parts))
+
+    return [RenderedField(name if len(chunks) == 1 else f"{name} (część {i + 1})", chunk, inline)
+            for i, chunk in enumerate(chunks)]
+
+
+class EmbedLayout:
+    """
+    Układa sekcje (listy wpisów) w pola i embedy w jednym przebiegu.
+
+    Rozmiary pól i embedów są liczone przyrostowo, a treść pola jest sklejana
+    jednym join-em, więc koszt budowy jest liniowy względem liczby wpisów.
+    Wynikiem są obiekty RenderedEmbed, zamieniane na discord.Embed dopiero w momencie wysyłki.
+    """
+
+    def __init__(self, title: str, description: str = "", footer: str = "", color: Optional[int] = None,
+                 continuation_title: Optional[str] = None):
+        self.title = truncate(title, TITLE_LIMIT)
+        self.continuation_title = truncate(continuation_title or title, TITLE_LIMIT)
+        self.description = truncate(description, DESCRIPTION_LIMIT)
+        self.footer = truncate(footer, FOOTER_LIMIT)
+        self.color = color
+
+        self._embeds: List[Dict] = []
+        self._current: Optional[Dict] = None
+        self._start_embed(self.title)
+
+    def _start_embed(self, title: str):
+        """Zamyka bieżący embed i rozpoczyna nowy"""
+        if self._current is not None:
+            self._embeds.append(self._current)
+        self._current = {
+            "title": title,
+            "description": self.description,
+            "color": self.color,
+            "footer": self.footer,
+            "fields": [],
+            # Stopka jest liczona od razu, bo trafia do każdego embeda
+            "size": len(title) + len(self.description) + len(self.footer),
+        }
+
+    def add_field(self, name: str, value: str, inline: bool = False):
+        """
+        Dodaje pole, w razie potrzeby przechodząc do nowego embeda
+        (limit 25 pól lub 6000 znaków na embed).
+        """
+        name = truncate(name, FIELD_NAME_LIMIT)
+        value = truncate(value, FIELD_VALUE_LIMIT)
+        field_size = len(name) + len(value)
+
+        current = self._current
+        if current["fields"] and (len(current["fields"]) >= FIELDS_PER_EMBED
+                                  or current["size"] + field_size > EMBED_TOTAL_LIMIT):
+            self._start_embed(self.continuation_title)
+            current = self._current
+
+        current["fields"].append(RenderedField(name, value, inline))
+        current["size"] += field_size
+
+    def add_section(self, name: str, entries: Iterable[str], inline: bool = False):
+        """
+        Dodaje sekcję podzieloną na pola przez section_fields.
+
+        Args:
+            name (str): Nazwa sekcji (np. status buga)
+            entries (Iterable[str]): Wpisy sekcji, każdy zakończony znakiem nowej linii
+            inline (bool): Czy pola mają być wyświetlane w linii
+        """
+        for field in section_fields(name, entries, inline):
+            self.add_field(field.name, field.value, inline=field.inline)
+
+    def finish(self) -> List[RenderedEmbed]:
+        """
+        Zwraca ułożone embedy.
+
+        Returns:
+            List[RenderedEmbed]: Wyrenderowane embedy (rozmiar jest już policzony)
+        """
+        return [
+            RenderedEmbed(data["title"], data["description"], data["color"], tuple(data["fields"]), data["footer"],
+                          size=data["size"])
+            for data in self._embeds + [self._current]
+        ]
+
+
+def paginate_embeds(embeds: List, size_of=attrgetter('size')) -> List[List]:
+    """
+    Grupuje kolejne embedy w wiadomości zgodnie z limitami Discord:
+    najwyżej 10 embedów i 6000 znaków łącznie na wiadomość.
+
+    Args:
+        embeds (List): Embedy (RenderedEmbed lub discord.Embed z size_of=len)
+        size_of (callable): Funkcja zwracająca rozmiar embeda
+
+    Returns:
+        List[List]: Lista wiadomości, każda jako lista embedów
+    """
+    messages = []
+    current = []
+    current_size = 0
+
+    for embed in embeds:
+        size = size_of(embed)
+        if current and (len(current) >= EMBEDS_PER_MESSAGE or current_size + size > EMBED_TOTAL_LIMIT):
+            messages.append(current)
+            current = []
+            current_size = 0
+        current.append(embed)
+        current_size += size
+
+    if current:
+        messages.append(current)
+
+    return messages
@@ -0,0 +1,305 @@
+# fake_discord.py
+"""
+Sztuczny klient i kanały Discorda działające w pamięci.
+
+Implementują część API discord.py używaną przez bota (get_channel, send, fetch_message,
+get_partial_message, edit, delete, history) i zapisują każde wywołanie wraz z rozmiarem
+wysłanych embedów. Limity zapytań Discorda są symulowane osobno dla każdej trasy i kanału
+(kubełki jak w nagłówkach X-RateLimit-*) oraz globalnie. Czas jest domyślnie wirtualny:
+opóźnienie i oczekiwanie na limit przesuwają zegar klienta zamiast usypiać, więc pomiar
+"wywołań Discorda na cykl" trwa tyle, co samo renderowanie.
+
+Przykład:
+    client = FakeDiscordClient()
+    client.add_channel(123, "bugi")
+    set_channel_id('bugs', 123)
+    await update_bugs_message(client)
+    print(client.summary())
+"""
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+from tracing import record_span
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Limity tras Discorda: operacja -> (liczba zapytań, okno w sekundach), osobno dla każdego kanału
+DEFAULT_RATE_LIMITS = {
+    'send': (5, 5.0),
+    'edit': (5, 5.0),
+    'delete': (5, 1.0),
+    'fetch': (5, 5.0),
+    'history': (5, 5.0),
+}
+# Globalny limit zapytań bota
+GLOBAL_RATE_LIMIT = (50, 1.0)
+
+# Identyfikatory w stylu snowflake (kolejne wartości, żeby kolejność odpowiadała czasowi wysłania)
+_FIRST_SNOWFLAKE = 1_100_000_000_000_000_000
+
+
+@dataclass
+class DiscordCall:
+    """Zapis jednego wywołania API"""
+    operation: str
+    channel_id: int
+    message_id: Optional[int]
+    at: float
+    waited: float = 0.0
+    embeds: int = 0
+    chars: int = 0
+    status: int = 200
+
+
+class RouteBucket:
+    """Kubełek limitu zapytań: `limit` zapytań na okno `per` sekund, liczone od pierwszego zapytania w oknie"""
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.remaining = limit
+        self.reset_at = 0.0
+
+    def acquire(self, now: float) -> float:
+        """
+        Zużywa jedno zapytanie.
+
+        Args:
+            now (float): Bieżący czas zegara klienta
+
+        Returns:
+            float: Ile sekund trzeba było czekać na odnowienie limitu
+        """
+        waited = 0.0
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        elif self.remaining <= 0:
+            waited = self.reset_at - now
+            self.remaining = self.limit
+            self.reset_at += self.per
+        self.remaining -= 1
+        return waited
+
+
+def _not_found(what: str) -> discord.NotFound:
+    """Tworzy wyjątek discord.NotFound taki jak przy odpowiedzi 404"""
+    return discord.NotFound(SimpleNamespace(status=404, reason="Not Found"),
+                            {"code": 10008, "message": f"Unknown {what}"})
+
+
+def _embeds_size(embeds: List[discord.Embed]) -> int:
+    return sum(len(embed) for embed in embeds)
+
+
+class FakeMessage:
+    """Wiadomość zapisana na sztucznym kanale"""
+
+    def __init__(self, channel: "FakeChannel", message_id: int, author, content: Optional[str],
+                 embeds: List[discord.Embed], view=None, attachments: Optional[List] = None):
+        self.channel = channel
+        self.id = message_id
+        self.author = author
+        self.content = content
+        self.embeds = embeds
+        self.view = view
+        self.attachments = attachments or []
+        self.edits = 0
+
+    async def edit(self, **kwargs) -> "FakeMessage":
+        return await self.channel.get_partial_message(self.id).edit(**kwargs)
+
+    async def delete(self, **kwargs):
+        await self.channel.get_partial_message(self.id).delete()
+
+
+class FakePartialMessage:
+    """Odpowiednik discord.PartialMessage - edycja i usuwanie bez pobierania wiadomości"""
+
+    def __init__(self, channel: "FakeChannel", message_id: int):
+        self.channel = channel
+        self.id = message_id
+
+    async def edit(self, content=discord.utils.MISSING, embed=discord.utils.MISSING,
+                   embeds=discord.utils.MISSING, view=discord.utils.MISSING, **kwargs) -> FakeMessage:
+        if embed is not discord.utils.MISSING:
+            embeds = [] if embed is None else [embed]
+        sent = [] if embeds is discord.utils.MISSING else list(embeds or [])
+        message = self.channel.messages.get(self.id)
+        await self.channel.client.call('edit', self.channel.id, self.id, embeds=len(sent), chars=_embeds_size(sent),
+                                       status=200 if message else 404)
+        if message is None:
+            raise _not_found("Message")
+        if content is not discord.utils.MISSING:
+            message.content = content
+        if embeds is not discord.utils.MISSING:
+            message.embeds = sent
+        if view is not discord.utils.MISSING:
+            message.view = view
+        message.edits += 1
+        return message
+
+    async def delete(self, **kwargs):
+        message = self.channel.messages.pop(self.id, None)
+        await self.channel.client.call('delete', self.channel.id, self.id, status=200 if message else 404)
+        if message is None:
+            raise _not_found("Message")
+
+    async def fetch(self) -> FakeMessage:
+        return await self.channel.fetch_message(self.id)
+
+
+class FakeChannel:
+    """Kanał tekstowy trzymający wiadomości w pamięci"""
+
+    def __init__(self, client: "FakeDiscordClient", channel_id: int, name: str):
+        self.client = client
+        self.id = channel_id
+        self.name = name
+        self.messages: Dict[int, FakeMessage] = {}
+
+    @property
+    def mention(self) -> str:
+        return f"<#{self.id}>"
+
+    async def send(self, content: Optional[str] = None, *, embed: Optional[discord.Embed] = None,
+                   embeds: Optional[List[discord.Embed]] = None, view=None, file=None, files=None,
+                   **kwargs) -> FakeMessage:
+        all_embeds = ([embed] if embed is not None else []) + list(embeds or [])
+        attachments = ([file] if file is not None else []) + list(files or [])
+        message_id = self.client.next_id()
+        await self.client.call('send', self.id, message_id, embeds=len(all_embeds),
+                               chars=_embeds_size(all_embeds) + len(content or ""))
+        message = FakeMessage(self, message_id, self.client.user, content, all_embeds, view, attachments)
+        self.messages[message_id] = message
+        return message
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        message = self.messages.get(message_id)
+        await self.client.call('fetch', self.id, message_id, status=200 if message else 404)
+        if message is None:
+            raise _not_found("Message")
+        return message
+
+    def get_partial_message(self, message_id: int) -> FakePartialMessage:
+        return FakePartialMessage(self, message_id)
+
+    async def history(self, limit: Optional[int] = 100, **kwargs):
+        """Wiadomości od najnowszej; jedno zapytanie na każde 100 wiadomości (jak w API)"""
+        newest_first = sorted(self.messages.values(), key=lambda message: message.id, reverse=True)
+        if limit is not None:
+            newest_first = newest_first[:limit]
+        for page_start in range(0, max(len(newest_first), 1), 100):
+            await self.client.call('history', self.id, None)
+            for message in newest_first[page_start:page_start + 100]:
+                yield message
+
+    def add_message(self, content: Optional[str] = None, embeds: Optional[List[discord.Embed]] = None,
+                    author=None, message_id: Optional[int] = None) -> FakeMessage:
+        """Dodaje wiadomość bez zapisywania wywołania (np. stare wiadomości przed testem)"""
+        message = FakeMessage(self, message_id or self.client.next_id(), author or self.client.user, content,
+                              list(embeds or []))
+        self.messages[message.id] = message
+        return message
+
+
+class FakeDiscordClient:
+    """
+    Sztuczny klient Discorda zapisujący wywołania API.
+
+    Args:
+        latency (float): Czas odpowiedzi jednego zapytania w sekundach
+        rate_limits (Dict[str, Tuple[int, float]]): Limity tras (domyślnie DEFAULT_RATE_LIMITS)
+        global_rate_limit (Tuple[int, float]): Globalny limit zapytań
+        realtime (bool): Czy naprawdę czekać (asyncio.sleep) zamiast przesuwać wirtualny zegar
+        user_id (int): ID bota
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limits: Optional[Dict[str, Tuple[int, float]]] = None,
+                 global_rate_limit: Tuple[int, float] = GLOBAL_RATE_LIMIT, realtime: bool = False,
+                 user_id: int = 1):
+        self.latency = latency
+        self.rate_limits = rate_limits if rate_limits is not None else DEFAULT_RATE_LIMITS
+        self.global_rate_limit = global_rate_limit
+        self.realtime = realtime
+        self.user = SimpleNamespace(id=user_id, name="WielkiInkwizytorFilipa", bot=True, display_name="Bot")
+        self.channels: Dict[int, FakeChannel] = {}
+        self.calls: List[DiscordCall] = []
+        self.clock = 0.0
+        self._ids = itertools.count(_FIRST_SNOWFLAKE)
+        self._buckets: Dict[Tuple[str, int], RouteBucket] = {}
+        self._global_bucket = RouteBucket(*global_rate_limit)
+
+    def add_channel(self, channel_id: int, name: Optional[str] = None) -> FakeChannel:
+        """Tworzy kanał (lub zwraca istniejący)"""
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            channel = self.channels[channel_id] = FakeChannel(self, channel_id, name or f"kanal-{channel_id}")
+        return channel
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return self.channels.get(channel_id)
+
+    def is_closed(self) -> bool:
+        return False
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    async def call(self, operation: str, channel_id: int, message_id: Optional[int], embeds: int = 0,
+                   chars: int = 0, status: int = 200):
+        """Zapisuje wywołanie API, uwzględniając limity zapytań i opóźnienie"""
+        waited = self._global_bucket.acquire(self.clock)
+        limit = self.rate_limits.get(operation)
+        if limit is not None:
+            bucket = self._buckets.get((operation, channel_id))
+            if bucket is None:
+                bucket = self._buckets[(operation, channel_id)] = RouteBucket(*limit)
+            waited += bucket.acquire(self.clock + waited)
+        if waited:
+            logger.debug(f"Symulowany limit zapytań Discorda ({operation}, kanał {channel_id}): "
+                         f"oczekiwanie {waited:.2f}s")
+
+        self.calls.append(DiscordCall(operation, channel_id, message_id, self.clock, waited, embeds, chars, status))
+        delay = waited + self.latency
+        # Wywołanie widoczne w śladzie cyklu tak jak prawdziwe zapytanie do Discorda (czas symulowany)
+        record_span(f"discord.{operation}", delay, channel=channel_id, bytes=chars)
+        self.clock += delay
+        if self.realtime and delay:
+            await asyncio.sleep(delay)
+
+    def advance(self, seconds: float):
+        """Przesuwa wirtualny zegar (np. o odstęp między cyklami, żeby limity się odnowiły)"""
+        self.clock += seconds
+
+    def reset_calls(self):
+        """Czyści zapis wywołań (np. między cyklami); wiadomości na kanałach zostają"""
+        self.calls = []
+
+    def summary(self) -> Dict:
+        """
+        Podsumowuje zapisane wywołania.
+
+        Returns:
+            Dict: Liczba wywołań (łącznie i według operacji), liczba wywołań wstrzymanych przez
+                limit, łączny czas oczekiwania, czas wirtualny, liczba embedów i znaków w treści
+        """
+        operations = {}
+        for call in self.calls:
+            operations[call.operation] = operations.get(call.operation, 0) + 1
+        return {
+            "calls": len(self.calls),
+            "operations": operations,
+            "rate_limited": sum(1 for call in self.calls if call.waited > 0),
+            "waited_seconds": round(sum(call.waited for call in self.calls), 3),
+            "elapsed_seconds": round(self.clock - self.calls[0].at, 3) if self.calls else 0.0,
+            "embeds": sum(call.embeds for call in self.calls),
+            "chars": sum(call.chars for call in self.calls),
+            "not_found": sum(1 for call in self.calls if call.status == 404),
+        }
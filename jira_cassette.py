@@ -0,0 +1,331 @@
+# jira_cassette.py
+"""
+Nagrywanie i odtwarzanie odpowiedzi Jiry ("kasety") do powtarzalnych pomiarów wydajności.
+
+Tryb ustawia zmienna JIRA_CASSETTE_MODE:
+- record - odpowiedzi Jiry (wyszukiwanie, tablice, sprinty, pola, myself) są zapisywane do pliku
+  JIRA_CASSETTE_FILE (linie JSON skompresowane gzipem). Nagłówki, w tym Authorization, nie są
+  zapisywane, adres serwera jest zastępowany adresem zastępczym, a dane osób (nazwy, e-maile,
+  accountId, awatary) pseudonimami - spójnie w całej kasecie, więc grupowanie po osobach zostaje.
+- replay - zapytania klienta Jiry są obsługiwane z kasety, bez sieci. Przy JIRA_CASSETTE_TIMING=original
+  (domyślnie) odpowiedź przychodzi po nagranym czasie, przy JIRA_CASSETTE_TIMING=none natychmiast.
+- off (domyślnie) - kaseta nie jest używana.
+
+Zapytania są dopasowywane po metodzie, ścieżce, parametrach i treści. Jeśli nagrania nie ma,
+daty w cudzysłowie w JQL są pomijane (raport z innego dnia trafi w tę samą odpowiedź).
+Kolejne takie same zapytania dostają kolejne nagrane odpowiedzi, a po ich wyczerpaniu ostatnią.
+"""
+import datetime
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from http import HTTPStatus
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+CASSETTE_MODES = ('off', 'record', 'replay')
+DEFAULT_CASSETTE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cassettes', 'jira.jsonl.gz')
+
+# Adres wstawiany w miejsce prawdziwego serwera Jiry (w nagraniach i przy odtwarzaniu bez JIRA_SERVER)
+PLACEHOLDER_SERVER = "https://jira.example.invalid"
+
+# Pola obiektów użytkownika w odpowiedziach Jiry, po których rozpoznawane są dane osobowe
+_USER_MARKERS = ('accountId', 'emailAddress')
+_JQL_DATE = re.compile(r'"\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2})?"')
+
+
+def get_cassette_mode() -> str:
+    """Zwraca tryb kasety z JIRA_CASSETTE_MODE (off, record, replay)"""
+    mode = os.getenv('JIRA_CASSETTE_MODE', 'off').lower()
+    if mode not in CASSETTE_MODES:
+        logger.warning(f"Nieznany tryb kasety Jiry: {mode}, używam 'off'")
+        return 'off'
+    return mode
+
+
+def get_cassette_path() -> str:
+    """Zwraca ścieżkę pliku kasety (JIRA_CASSETTE_FILE lub domyślna)"""
+    return os.getenv('JIRA_CASSETTE_FILE', DEFAULT_CASSETTE_FILE)
+
+
+def request_key(method: str, url: str, body=None, ignore_dates: bool = False) -> str:
+    """
+    Buduje klucz dopasowania zapytania (bez adresu serwera).
+
+    Args:
+        method (str): Metoda HTTP
+        url (str): Pełny adres zapytania
+        body (str | bytes, optional): Treść zapytania
+        ignore_dates (bool): Czy zastąpić daty w JQL znacznikiem
+
+    Returns:
+        str: Klucz w postaci "METODA ścieżka?posortowane_parametry treść"
+    """
+    parts = urlsplit(url)
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    key = f"{method.upper()} {parts.path}?{'&'.join(f'{name}={value}' for name, value in query)}"
+    if body:
+        key += f" {body}"
+    return _JQL_DATE.sub('"<data>"', key) if ignore_dates else key
+
+
+class Pseudonymizer:
+    """Zastępuje dane osób pseudonimami - ta sama osoba zawsze dostaje ten sam pseudonim"""
+
+    def __init__(self):
+        self._people: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _number(self, identity: str) -> int:
+        with self._lock:
+            if identity not in self._people:
+                self._people[identity] = len(self._people) + 1
+            return self._people[identity]
+
+    def scrub(self, value):
+        """Zwraca kopię danych JSON z pseudonimami w miejscu obiektów użytkowników"""
+        if isinstance(value, list):
+            return [self.scrub(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if any(marker in value for marker in _USER_MARKERS):
+            return self._scrub_user(value)
+        return {key: self.scrub(item) for key, item in value.items()}
+
+    def _scrub_user(self, user: Dict) -> Dict:
+        identity = user.get('accountId') or user.get('key') or user.get('name') or user.get('emailAddress') or ""
+        number = self._number(str(identity))
+        scrubbed = {key: self.scrub(item) for key, item in user.items() if key != 'avatarUrls'}
+        replacements = {
+            'accountId': f"cassette-user-{number}",
+            'displayName': f"Osoba {number}",
+            'emailAddress': f"osoba{number}@example.invalid",
+            'name': f"osoba{number}",
+            'key': f"osoba{number}",
+        }
+        for key, replacement in replacements.items():
+            if key in scrubbed:
+                scrubbed[key] = replacement
+        return scrubbed
+
+
+class CassetteRecorder:
+    """Dopisuje zeskrobane odpowiedzi do pliku kasety (bezpieczne dla wielu wątków)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.recorded = 0
+        self._pseudonymizer = Pseudonymizer()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def record(self, response: requests.Response, server: str, elapsed: float):
+        """
+        Zapisuje odpowiedź do kasety.
+
+        Args:
+            response (requests.Response): Odpowiedź Jiry
+            server (str): Adres serwera do zastąpienia adresem zastępczym
+            elapsed (float): Czas od wysłania zapytania do odebrania całej odpowiedzi (sekundy)
+        """
+        request = response.request
+        text = response.text
+        if 'json' in response.headers.get('Content-Type', ''):
+            try:
+                text = json.dumps(self._pseudonymizer.scrub(response.json()), ensure_ascii=False)
+            except ValueError:
+                pass
+        if server:
+            text = text.replace(server.rstrip('/'), PLACEHOLDER_SERVER)
+
+        body = request.body.decode('utf-8', errors='replace') if isinstance(request.body, bytes) else request.body
+        entry = {
+            "key": request_key(request.method, request.url, body),
+            "status": response.status_code,
+            "content_type": response.headers.get('Content-Type', 'application/json'),
+            "elapsed": round(elapsed, 4),
+            "body": text,
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+
+        with self._lock:
+            # Nowe nagranie zastępuje poprzednią kasetę; kolejne wpisy są dopisywane jako osobne człony gzip
+            if not self._started:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                mode = 'wb'
+                self._started = True
+            else:
+                mode = 'ab'
+            with gzip.open(self.path, mode) as f:
+                f.write(line)
+            self.recorded += 1
+
+
+class Cassette:
+    """Nagrane odpowiedzi pogrupowane według klucza zapytania"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, List[Dict]] = {}
+        self._fuzzy: Dict[str, List[Dict]] = {}
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.served = 0
+        self.missed = 0
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._entries.setdefault(entry["key"], []).append(entry)
+                self._fuzzy.setdefault(_JQL_DATE.sub('"<data>"', entry["key"]), []).append(entry)
+        logger.info(f"Wczytano kasetę Jiry {path}: {sum(len(v) for v in self._entries.values())} odpowiedzi")
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def find(self, method: str, url: str, body=None) -> Optional[Dict]:
+        """
+        Zwraca kolejną nagraną odpowiedź dla zapytania.
+
+        Returns:
+            Dict | None: Wpis kasety lub None, jeśli zapytania nie nagrano
+        """
+        with self._lock:
+            for entries, key in ((self._entries, request_key(method, url, body)),
+                                 (self._fuzzy, request_key(method, url, body, ignore_dates=True))):
+                recorded = entries.get(key)
+                if recorded:
+                    position = self._positions.get(key, 0)
+                    self._positions[key] = position + 1
+                    self.served += 1
+                    return recorded[min(position, len(recorded) - 1)]
+            self.missed += 1
+            return None
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Adapter requests wysyłający zapytania do Jiry i nagrywający odpowiedzi"""
+
+    def __init__(self, recorder: CassetteRecorder, server: str):
+        super().__init__()
+        self.recorder = recorder
+        self.server = server
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        try:
+            # Treść musi zostać odczytana przed nagraniem; requests zachowa ją w response.content
+            response.content
+            self.recorder.record(response, self.server, time.perf_counter() - start)
+        except Exception as e:
+            logger.error(f"Błąd podczas nagrywania odpowiedzi Jiry: {e}")
+            logger.error(traceback.format_exc())
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter requests odpowiadający z kasety zamiast z sieci"""
+
+    def __init__(self, cassette: Cassette, realtime: bool = True):
+        super().__init__()
+        self.cassette = cassette
+        self.realtime = realtime
+
+    def send(self, request, **kwargs):
+        entry = self.cassette.find(request.method, request.url, request.body)
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        if entry is None:
+            logger.warning(f"Brak nagrania w kasecie Jiry dla {request.method} {urlsplit(request.url).path}")
+            response.status_code = 404
+            response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+            response._content = json.dumps({
+                "errorMessages": [f"Brak nagrania w kasecie: {request_key(request.method, request.url, request.body)}"],
+                "errors": {}
+            }, ensure_ascii=False).encode('utf-8')
+        else:
+            if self.realtime and entry["elapsed"] > 0:
+                time.sleep(entry["elapsed"])
+            response.status_code = entry["status"]
+            response.headers = CaseInsensitiveDict({'Content-Type': entry["content_type"]})
+            response._content = entry["body"].encode('utf-8')
+        response.reason = HTTPStatus(response.status_code).phrase
+        response.elapsed = datetime.timedelta(seconds=entry["elapsed"] if entry else 0)
+        return response
+
+    def close(self):
+        pass
+
+
+# Zmienne globalne
+_recorder: Optional[CassetteRecorder] = None
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_recorder() -> CassetteRecorder:
+    """Zwraca (tworząc przy pierwszym użyciu) wspólny rejestrator kasety"""
+    global _recorder
+    with _cassette_lock:
+        if _recorder is None or _recorder.path != get_cassette_path():
+            _recorder = CassetteRecorder(get_cassette_path())
+            logger.info(f"Nagrywanie odpowiedzi Jiry do kasety {_recorder.path}")
+        return _recorder
+
+
+def get_cassette() -> Cassette:
+    """
+    Zwraca (wczytując przy pierwszym użyciu) kasetę do odtwarzania.
+
+    Raises:
+        FileNotFoundError: Jeśli plik kasety nie istnieje
+    """
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None or _cassette.path != get_cassette_path():
+            _cassette = Cassette(get_cassette_path())
+        return _cassette
+
+
+def attach_cassette(jira, server: Optional[str] = None):
+    """
+    Podłącza kasetę do sesji HTTP klienta Jira zgodnie z JIRA_CASSETTE_MODE.
+
+    Args:
+        jira (JIRA): Klient Jira
+        server (str, optional): Adres serwera (zastępowany w nagraniach)
+
+    Returns:
+        JIRA: Ten sam klient
+    """
+    mode = get_cassette_mode()
+    session = getattr(jira, '_session', None)
+    if mode == 'off' or session is None:
+        return jira
+
+    if mode == 'record':
+        adapter = RecordingAdapter(get_recorder(), server or "")
+    else:
+        realtime = os.getenv('JIRA_CASSETTE_TIMING', 'original').lower() != 'none'
+        adapter = ReplayAdapter(get_cassette(), realtime=realtime)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return jira
@@ -1,12 +1,18 @@
 # jira_client.py
+import asyncio
 import logging
 import os
 import traceback
 from typing import List
 
+import pytz
 from jira import JIRA
 from jira.resources import Issue
 
+from completion_counters import get_completion_counters, record_completions
+from jira_cassette import PLACEHOLDER_SERVER, attach_cassette, get_cassette_mode
+from metrics import ISSUES_PROCESSED, instrument_jira_client, jira_query
+
 logger = logging.getLogger('WielkiInkwizytorFilipa')
 
 
@@ -27,7 +33,14 @@ def get_jira_client() -> JIRA:
         jira_api_token = os.environ.get('JIRA_API_TOKEN')
 
         # Wypisz zmienne dla diagnostyki
-        logger.info(f"Zmienne w get_jira_client: SERVER={jira_server}, USERNAME={jira_username}")
+        logger.debug(f"Zmienne w get_jira_client: SERVER={jira_server}, USERNAME={jira_username}")
+
+        # Odtwarzanie z kasety nie wymaga serwera ani danych logowania
+        replay = get_cassette_mode() == 'replay'
+        if replay:
+            jira_server = jira_server or PLACEHOLDER_SERVER
+            jira_username = jira_username or "cassette"
+            jira_api_token = jira_api_token or "cassette"
 
         missing_vars = []
         if not jira_server:
@@ -42,8 +55,10 @@ def get_jira_client() -> JIRA:
             logger.error(error_msg)
             raise ValueError(error_msg)
 
-        client = JIRA(jira_server, basic_auth=(jira_username, jira_api_token))
-        return client
+        # Przy odtwarzaniu nie pytamy serwera o wersję - kaseta jest podłączana dopiero po utworzeniu klienta
+        client = JIRA(jira_server, basic_auth=(jira_username, jira_api_token), get_server_info=not replay)
+        attach_cassette(client, jira_server)
+        return instrument_jira_client(client)
     except Exception as e:
         logger.error(f"Błąd podczas inicjalizacji klienta Jira: {e}")
         logger.error(traceback.format_exc())
@@ -62,13 +77,15 @@ async def fetch_jira_bugs() -> List[Issue]:
         jira_project = os.environ.get('JIRA_PROJECT')
         jira_bug_query = os.environ.get('JIRA_BUG_QUERY')
 
-        jira = get_jira_client()
+        # Wywołania Jiry są blokujące - wykonujemy je w wątku, żeby nie wstrzymywać pętli zdarzeń
+        jira = await asyncio.to_thread(get_jira_client)
 
         # Jeśli zdefiniowano własne zapytanie JQL w .env, użyj go
         if jira_bug_query:
-            logger.info(f"Używanie niestandardowego zapytania JQL z pliku .env: {jira_bug_query}")
-            issues = jira.search_issues(jira_bug_query, maxResults=100)
-            logger.info(f"Pobrano {len(issues)} bugów używając niestandardowego zapytania")
+            logger.debug(f"Używanie niestandardowego zapytania JQL z pliku .env: {jira_bug_query}")
+            with jira_query('bugs'):
+                issues = await asyncio.to_thread(jira.search_issues, jira_bug_query, maxResults=100)
+            logger.debug(f"Pobrano {len(issues)} bugów używając niestandardowego zapytania")
             return issues
 
         # Sprawdź czy zdefiniowano JIRA_PROJECT
@@ -79,10 +96,11 @@ async def fetch_jira_bugs() -> List[Issue]:
         # W przeciwnym razie pobierz tylko aktywne bugi (niezakończone)
         active_bugs_jql = f'project = "{jira_project}" AND issuetype = Bug AND status NOT IN ("Done", "Resolved", "Closed") ORDER BY status ASC, priority DESC'
 
-        logger.info(f"Pobieranie aktywnych bugów dla projektu {jira_project}")
+        logger.debug(f"Pobieranie aktywnych bugów dla projektu {jira_project}")
         try:
-            active_bugs = jira.search_issues(active_bugs_jql, maxResults=100)
-            logger.info(f"Pobrano {len(active_bugs)} aktywnych bugów")
+            with jira_query('bugs'):
+                active_bugs = await asyncio.to_thread(jira.search_issues, active_bugs_jql, maxResults=100)
+            logger.debug(f"Pobrano {len(active_bugs)} aktywnych bugów")
             return active_bugs
         except Exception as search_error:
             logger.error(f"Błąd podczas wyszukiwania bugów: {search_error}")
@@ -90,7 +108,8 @@ async def fetch_jira_bugs() -> List[Issue]:
             # Próba wykonania prostszego zapytania w przypadku błędu
             fallback_jql = f'project = "{jira_project}" AND issuetype = Bug'
             logger.info(f"Próba wykonania zapytania awaryjnego: {fallback_jql}")
-            return jira.search_issues(fallback_jql, maxResults=50)
+            with jira_query('bugs_fallback'):
+                return await asyncio.to_thread(jira.search_issues, fallback_jql, maxResults=50)
 
     except Exception as e:
         logger.error(f"Błąd podczas pobierania bugów z Jiry: {e}")
@@ -107,13 +126,15 @@ async def get_active_sprints() -> List[dict]:
     """
     try:
         jira_project = os.environ.get('JIRA_PROJECT')
-        jira = get_jira_client()
-        boards = jira.boards(projectKeyOrID=jira_project)
+        jira = await asyncio.to_thread(get_jira_client)
+        with jira_query('sprints'):
+            boards = await asyncio.to_thread(jira.boards, projectKeyOrID=jira_project)
 
         active_sprints = []
         for board in boards:
             try:
-                sprints = jira.sprints(board.id, state='active')
+                with jira_query('sprints'):
+                    sprints = await asyncio.to_thread(jira.sprints, board.id, state='active')
                 for sprint in sprints:
                     active_sprints.append({
                         'id': sprint.id,
@@ -132,20 +153,22 @@ async def get_active_sprints() -> List[dict]:
         return []
 
 
-async def get_completed_tasks_for_report(start_date: str, end_date: str) -> List[Issue]:
+async def get_completed_tasks_for_report(start_date: str, end_date: str, raise_errors: bool = False) -> List[Issue]:
     """
     Pobiera zadania zakończone w określonym przedziale czasowym.
 
     Args:
         start_date (str): Data początkowa w formacie "YYYY-MM-DD HH:MM"
         end_date (str): Data końcowa w formacie "YYYY-MM-DD HH:MM"
+        raise_errors (bool): Przekaż błąd dalej zamiast zwracać pustą listę
+            (np. żeby nie zapamiętać pustego raportu w cache odpowiedzi)
 
     Returns:
         List[Issue]: Lista zakończonych zadań
     """
     try:
         jira_project = os.environ.get('JIRA_PROJECT')
-        jira = get_jira_client()
+        jira = await asyncio.to_thread(get_jira_client)
 
         # Formatowanie dat dla zapytania JQL
         jql_query = (
@@ -155,12 +178,20 @@ async def get_completed_tasks_for_report(start_date: str, end_date: str) -> List
             f'AND status changed to Done BEFORE "{end_date}"'
         )
 
-        logger.info(f"Pobieranie zadań zakończonych w okresie: {start_date} - {end_date}")
-        tasks = jira.search_issues(jql_query, maxResults=1000)
-        logger.info(f"Pobrano {len(tasks)} zakończonych zadań")
+        logger.debug(f"Pobieranie zadań zakończonych w okresie: {start_date} - {end_date}")
+        with jira_query('completed_tasks'):
+            tasks = await asyncio.to_thread(jira.search_issues, jql_query, maxResults=1000)
+        logger.debug(f"Pobrano {len(tasks)} zakończonych zadań")
+        ISSUES_PROCESSED.inc(len(tasks), source='completed_tasks')
+
+        # Zadania z raportu zasilają też liczniki i trwały dziennik ukończonych zadań
+        timezone = pytz.timezone(os.getenv('TIMEZONE', 'Europe/Warsaw'))
+        record_completions(get_completion_counters(), tasks, timezone)
 
         return tasks
     except Exception as e:
         logger.error(f"Błąd podczas pobierania zakończonych zadań: {e}")
         logger.error(traceback.format_exc())
+        if raise_errors:
+            raise
         return []
@@ -0,0 +1,173 @@
+# job_queue.py
+import asyncio
+import logging
+import os
+import time
+import traceback
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from metrics import CYCLE_SECONDS
+from tracing import start_trace
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Liczba równolegle wykonywanych zadań i maksymalna liczba zadań oczekujących w kolejce
+DEFAULT_JOB_QUEUE_WORKERS = 2
+DEFAULT_JOB_QUEUE_SIZE = 20
+
+# Funkcja przekazująca postęp (np. edycja odpowiedzi na interakcję)
+ProgressCallback = Callable[[str], Awaitable]
+# Funkcja wywoływana z wynikiem zadania (lub None i wyjątkiem w razie błędu)
+DoneCallback = Callable[[Any, Optional[BaseException]], Awaitable]
+
+
+class QueueFullError(Exception):
+    """Kolejka zadań jest pełna"""
+
+
+class QueuedJob:
+    """Zadanie w kolejce wraz ze wszystkimi oczekującymi na jego wynik"""
+
+    def __init__(self, key: Hashable, work: Callable[[ProgressCallback], Awaitable]):
+        self.key = key
+        self.work = work  # Korutyna wykonująca zadanie, dostaje funkcję raportowania postępu
+        self.progress_callbacks: List[ProgressCallback] = []
+        self.done_callbacks: List[DoneCallback] = []
+        self.started = False
+
+    async def report_progress(self, text: str):
+        """Przekazuje postęp wszystkim oczekującym"""
+        for callback in list(self.progress_callbacks):
+            try:
+                await callback(text)
+            except Exception as e:
+                logger.warning(f"Nie udało się przekazać postępu zadania {self.key}: {e}")
+
+    async def finish(self, result: Any, error: Optional[BaseException]):
+        """Przekazuje wynik wszystkim oczekującym"""
+        for callback in list(self.done_callbacks):
+            try:
+                await callback(result, error)
+            except Exception as e:
+                logger.error(f"Błąd podczas przekazywania wyniku zadania {self.key}: {e}")
+                logger.error(traceback.format_exc())
+
+
+class JobQueue:
+    """
+    Ograniczona kolejka ciężkich zadań uruchamianych komendami (raporty, tablica wyników, odświeżanie).
+
+    Komenda odracza odpowiedź, dodaje zadanie do kolejki i od razu kończy obsługę interakcji.
+    Zadania wykonuje stała pula workerów; ponowne zlecenie zadania o tym samym kluczu,
+    które jeszcze czeka lub trwa, dołącza do niego zamiast uruchamiać je drugi raz.
+    """
+
+    def __init__(self, workers: int = DEFAULT_JOB_QUEUE_WORKERS, maxsize: int = DEFAULT_JOB_QUEUE_SIZE):
+        self.workers = max(1, workers)
+        self.maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._jobs: Dict[Hashable, QueuedJob] = {}
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        return self._queue
+
+    def pending(self) -> int:
+        """Zwraca liczbę zadań oczekujących lub wykonywanych"""
+        return len(self._jobs)
+
+    def submit(self, key: Hashable, work: Callable[[ProgressCallback], Awaitable],
+               on_progress: Optional[ProgressCallback] = None, on_done: Optional[DoneCallback] = None) -> bool:
+        """
+        Zleca zadanie. Jeśli zadanie o tym kluczu już czeka lub trwa, dołącza do niego.
+
+        Args:
+            key (Hashable): Klucz zadania (np. komenda i znormalizowane argumenty)
+            work (Callable[[ProgressCallback], Awaitable]): Korutyna wykonująca zadanie
+            on_progress (ProgressCallback, optional): Wywoływana przy zmianie postępu
+            on_done (DoneCallback, optional): Wywoływana z wynikiem lub błędem
+
+        Returns:
+            bool: True, jeśli utworzono nowe zadanie; False, jeśli dołączono do istniejącego
+
+        Raises:
+            QueueFullError: Gdy kolejka jest pełna
+        """
+        job = self._jobs.get(key)
+        created = job is None
+        if created:
+            job = QueuedJob(key, work)
+            try:
+                self._get_queue().put_nowait(job)
+            except asyncio.QueueFull:
+                raise QueueFullError(f"Kolejka zadań jest pełna ({self.maxsize})")
+            self._jobs[key] = job
+            logger.info(f"Dodano zadanie {key} do kolejki (oczekujących: {self._get_queue().qsize()})")
+        else:
+            logger.info(f"Zadanie {key} już jest w kolejce - dołączono do niego")
+
+        if on_progress is not None:
+            job.progress_callbacks.append(on_progress)
+        if on_done is not None:
+            job.done_callbacks.append(on_done)
+        return created
+
+    def position(self, key: Hashable) -> int:
+        """Zwraca liczbę zadań przed zadaniem o tym kluczu (0 - trwa lub jest następne)"""
+        job = self._jobs.get(key)
+        if job is None or job.started:
+            return 0
+        waiting = [queued for queued in self._jobs.values() if not queued.started]
+        return waiting.index(job) if job in waiting else 0
+
+    async def _worker(self, number: int):
+        """Pobiera zadania z kolejki i wykonuje je jedno po drugim"""
+        queue = self._get_queue()
+        while True:
+            job = await queue.get()
+            job.started = True
+            result, error = None, None
+            started = time.perf_counter()
+            # Ślad obejmuje także wysłanie wyniku (edycję odroczonej odpowiedzi)
+            with start_trace(f"command:{job.key[0]}", key=repr(job.key)) as trace:
+                try:
+                    result = await job.work(job.report_progress)
+                except asyncio.CancelledError:
+                    self._jobs.pop(job.key, None)
+                    raise
+                except Exception as e:
+                    error = e
+                    trace.mark_error(str(e))
+                    logger.error(f"Błąd w zadaniu {job.key} (worker {number}): {e}")
+                    logger.error(traceback.format_exc())
+                finally:
+                    queue.task_done()
+                    CYCLE_SECONDS.observe(time.perf_counter() - started, cycle=f"command:{job.key[0]}")
+                # Zadanie znika z rejestru przed powiadomieniem - kolejne zlecenie uruchomi je od nowa
+                self._jobs.pop(job.key, None)
+                await job.finish(result, error)
+
+    async def run(self):
+        """Uruchamia pulę workerów (do uruchomienia przez supervisor)"""
+        logger.info(f"Uruchomiono kolejkę zadań ({self.workers} workerów, limit {self.maxsize})")
+        await asyncio.gather(*(self._worker(number) for number in range(self.workers)))
+
+
+# Zmienne globalne
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Zwraca współdzieloną kolejkę zadań. Przy pierwszym wywołaniu tworzy ją
+    z ustawieniami JOB_QUEUE_WORKERS i JOB_QUEUE_SIZE.
+
+    Returns:
+        JobQueue: Kolejka zadań
+    """
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(int(os.getenv('JOB_QUEUE_WORKERS', str(DEFAULT_JOB_QUEUE_WORKERS))),
+                              int(os.getenv('JOB_QUEUE_SIZE', str(DEFAULT_JOB_QUEUE_SIZE))))
+    return _job_queue
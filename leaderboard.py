@@ -1,54 +1,85 @@
 # leaderboard.py
+import asyncio
 import logging
 import os
 import traceback
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 import discord
 import pytz
 
-from discord_embeds import _get_name_mapping
+from completion_counters import get_completion_counters, record_completions, save_sync_state
 from jira_client import get_jira_client
+from metrics import ISSUES_PROCESSED, RENDER_SECONDS, jira_query
+from name_mapping import get_name_mapping_index
+from render_model import RenderedEmbed, to_discord_embed
+from renderers import render_leaderboard
+from tracing import span
 
 logger = logging.getLogger('WielkiInkwizytorFilipa')
 
+# Domyślnie jak często (w sekundach) liczniki ukończonych zadań są douzupełniane z Jiry
+DEFAULT_COUNTERS_SYNC_INTERVAL = 60
 
-def debug_name_mapping():
-    """
-    Funkcja diagnostyczna do wypisania mapowania imion.
-    Pomoże zrozumieć jakie mapowania są faktycznie wczytywane.
+# Maksymalna liczba zadań pobieranych przy jednej synchronizacji liczników
+COUNTERS_MAX_TASKS = 20000
+
+# Zakładka synchronizacji przyrostowej - duplikaty są odrzucane po kluczu zadania. Jira interpretuje
+# daty w JQL w strefie czasowej profilu użytkownika API, a nie w TIMEZONE bota, więc zakładka
+# obejmuje cały dzień (różnica stref nie może wtedy przesunąć początku okna za ostatnią synchronizację)
+COUNTERS_SYNC_OVERLAP = timedelta(days=1)
+
+
+def get_counters_sync_interval() -> int:
+    """Zwraca minimalny odstęp (w sekundach) między synchronizacjami liczników z Jirą (COUNTERS_SYNC_INTERVAL)"""
+    return int(os.getenv('COUNTERS_SYNC_INTERVAL', str(DEFAULT_COUNTERS_SYNC_INTERVAL)))
+
+
+def _search_all(jira, jql_query: str, fields: str, max_total: int = 1000) -> Tuple[List, bool]:
     """
-    logger.info("---- DIAGNOSTYKA MAPOWANIA IMION ----")
+    Pobiera wszystkie zadania spełniające zapytanie JQL, strona po stronie.
 
-    try:
-        name_mapping_str = os.getenv('NAME_MAPPING', '')
-        logger.info(f"Zawartość zmiennej NAME_MAPPING: '{name_mapping_str}'")
+    Args:
+        jira (JIRA): Klient Jira
+        jql_query (str): Zapytanie JQL
+        fields (str): Lista pól do pobrania, oddzielonych przecinkami
+        max_total (int): Maksymalna liczba zadań do pobrania (zabezpieczenie)
 
-        if not name_mapping_str:
-            logger.warning("Zmienna NAME_MAPPING jest pusta!")
-            return
+    Returns:
+        Tuple[List, bool]: Pobrane zadania i informacja, czy pobrano komplet wyników
+    """
+    all_tasks = []
+    start_at = 0
+    max_results = 100  # Pobieraj po 100 zadań na raz (typowy limit Jira API)
 
-        pairs = name_mapping_str.split(';')
-        logger.info(f"Znaleziono {len(pairs)} par w mapowaniu")
+    while True:
+        logger.debug(f"Pobieranie strony zadań: startAt={start_at}, maxResults={max_results}")
+        tasks_batch = jira.search_issues(jql_query, startAt=start_at, maxResults=max_results, fields=fields)
 
-        for i, pair in enumerate(pairs):
-            logger.info(f"Para {i + 1}: '{pair}'")
+        if not tasks_batch:
+            logger.debug("Otrzymano pustą partię zadań, kończenie pobierania")
+            return all_tasks, True
 
-            if ':' in pair:
-                full_name, short_name = pair.split(':', 1)
-                logger.info(f"  -> Mapowanie: '{full_name.strip()}' na '{short_name.strip()}'")
-            else:
-                logger.warning(f"  -> Nieprawidłowy format pary (brak znaku ':'): '{pair}'")
+        batch_size = len(tasks_batch)
+        logger.debug(f"Pobrano partię {batch_size} zadań")
+        all_tasks.extend(tasks_batch)
 
-    except Exception as e:
-        logger.error(f"Błąd podczas analizy mapowania imion: {e}")
-        logger.error(traceback.format_exc())
+        # Jeśli liczba pobranych zadań jest mniejsza niż max_results, to znaczy że pobrano wszystkie
+        if batch_size < max_results:
+            logger.debug(f"Pobrano mniej zadań niż maxResults ({batch_size} < {max_results}), kończenie pobierania")
+            return all_tasks, True
 
-    logger.info("---- KONIEC DIAGNOSTYKI MAPOWANIA ----")
+        # Przechodzimy do następnej strony
+        start_at += batch_size
 
+        # Zabezpieczenie przed nieskończoną pętlą
+        if len(all_tasks) >= max_total:
+            logger.warning(f"Osiągnięto maksymalną liczbę zadań do pobrania ({max_total}), przerywanie")
+            return all_tasks, False
 
-async def fetch_user_statistics(days: int = 30) -> List[Dict]:
+
+async def fetch_user_statistics(days: int = 30, include_tasks: bool = False) -> List[Dict]:
     """
     Pobiera statystyki zadań ukończonych przez użytkowników w określonym okresie.
     Uwzględnia również zadania nieprzypisane i przypisane do innych użytkowników.
@@ -56,16 +87,15 @@ async def fetch_user_statistics(days: int = 30) -> List[Dict]:
 
     Args:
         days (int): Liczba dni wstecz do analizy (domyślnie 30)
+        include_tasks (bool): Czy dołączyć listę zadań każdego użytkownika (np. do eksportu).
+            Domyślnie zbierane są tylko liczniki, a z Jiry pobierane są tylko potrzebne pola.
 
     Returns:
         List[Dict]: Lista słowników ze statystykami użytkowników
     """
     try:
-        # Diagnostyka mapowania imion
-        debug_name_mapping()
-
         jira_project = os.environ.get('JIRA_PROJECT')
-        jira = get_jira_client()
+        jira = await asyncio.to_thread(get_jira_client)
 
         # Pobierz strefę czasową z konfiguracji
         timezone_str = os.getenv('TIMEZONE', 'Europe/Warsaw')
@@ -89,295 +119,240 @@ async def fetch_user_statistics(days: int = 30) -> List[Dict]:
             f'ORDER BY assignee ASC'
         )
 
-        logger.info(f"Pobieranie zadań dla leaderboard z okresu: {start_date} - {end_date}")
-        logger.info(f"Zapytanie JQL: {jql_query}")
-
-        # Zwiększamy maksymalną liczbę wyników, aby pobrać wszystkie zadania
-        all_tasks = []
-        start_at = 0
-        max_results = 100  # Pobieraj po 100 zadań na raz (typowy limit Jira API)
-        max_total = 1000  # Maksymalna liczba zadań do pobrania (zabezpieczenie)
-        total_loaded = 0
-
-        # Ulepszony kod paginacji
-        while True:
-            logger.info(f"Pobieranie strony zadań: startAt={start_at}, maxResults={max_results}")
-            tasks_batch = jira.search_issues(jql_query, startAt=start_at, maxResults=max_results)
-
-            if not tasks_batch:
-                logger.info("Otrzymano pustą partię zadań, kończenie pobierania")
-                break
-
-            batch_size = len(tasks_batch)
-            logger.info(f"Pobrano partię {batch_size} zadań")
-
-            all_tasks.extend(tasks_batch)
-            total_loaded += batch_size
-
-            # Jeśli liczba pobranych zadań jest mniejsza niż max_results, to znaczy że pobrano wszystkie
-            if batch_size < max_results:
-                logger.info(f"Pobrano mniej zadań niż maxResults ({batch_size} < {max_results}), kończenie pobierania")
-                break
-
-            # Przechodzimy do następnej strony
-            start_at += batch_size
-
-            # Zabezpieczenie przed nieskończoną pętlą
-            if total_loaded >= max_total:
-                logger.warning(f"Osiągnięto maksymalną liczbę zadań do pobrania ({max_total}), przerywanie")
-                break
-
-        logger.info(f"Pobrano łącznie {len(all_tasks)} zadań do analizy")
-
-        # Pobierz mapowanie nazw użytkowników
-        name_mapping = _get_name_mapping()
-        logger.info(f"Wczytano {len(name_mapping)} mapowań imion")
-
-        # Debug - wypisz wszystkie odwrotne mapowania dla lepszej diagnostyki
-        inverted_mapping = {v: k for k, v in name_mapping.items()}
-        logger.info(f"Odwrotne mapowanie imion: {inverted_mapping}")
-
-        # Zbieranie statystyk według użytkowników
-        user_stats = {}
-        skipped_epics = 0
-        skipped_unassigned = 0
-
-        # Dodaj wartość do mapowania dla zadań nieprzypisanych
-        unassigned_name = "Nieprzypisane zadania"
-        unassigned_id = "unassigned"
-
-        # Utwórz pustą statystykę dla unassigned, żeby zawsze się pojawiało
-        user_stats[unassigned_id] = {
-            "name": unassigned_name,
-            "tasks_total": 0,
-            "task_types": {},
-            "tasks": []
-        }
-
-        # Dodaj puste statystyki dla wszystkich użytkowników w mapowaniu
-        # To zapewni, że każdy z zespołu będzie widoczny nawet bez zadań
-        for full_name, short_name in name_mapping.items():
-            user_id = f"mapped_{full_name}"  # Unikalny identyfikator
-            user_stats[user_id] = {
-                "name": short_name,
-                "tasks_total": 0,
-                "task_types": {},
-                "tasks": []
-            }
-            logger.info(f"Dodano pustą statystykę dla użytkownika {short_name} ({full_name})")
-
-        for task in all_tasks:
-            try:
-                # Sprawdź czy to nie jest epik
-                issue_type = task.fields.issuetype.name
-                if issue_type.lower() == "epic":
-                    skipped_epics += 1
-                    logger.info(f"Pomijam epik: {task.key} - {task.fields.summary}")
-                    continue
-
-                # Pobieranie informacji o przypisanym użytkowniku
-                assignee = None
+        logger.debug(f"Pobieranie zadań dla leaderboard z okresu: {start_date} - {end_date}")
+        logger.debug(f"Zapytanie JQL: {jql_query}")
+
+        # Do liczników wystarczy osoba, typ i data rozwiązania - tytuł tylko na żądanie
+        fields = "assignee,issuetype,resolutiondate,summary" if include_tasks else "assignee,issuetype,resolutiondate"
+
+        # Stronicowanie wykonuje blokujące zapytania HTTP - w wątku, poza pętlą zdarzeń
+        with jira_query('leaderboard'):
+            all_tasks, _ = await asyncio.to_thread(_search_all, jira, jql_query, fields)
+        ISSUES_PROCESSED.inc(len(all_tasks), source='leaderboard')
+
+        logger.debug(f"Pobrano łącznie {len(all_tasks)} zadań do analizy")
+
+        # Pobrane zadania zasilają też liczniki i trwały dziennik ukończonych zadań
+        record_completions(get_completion_counters(end_time.date()), all_tasks, timezone)
+
+        return aggregate_user_statistics(all_tasks, include_tasks=include_tasks)
+
+    except Exception as e:
+        logger.error(f"Błąd podczas pobierania statystyk użytkowników: {e}")
+        logger.error(traceback.format_exc())
+        return []
+
+
+def aggregate_user_statistics(tasks: List, include_tasks: bool = False) -> List[Dict]:
+    """
+    Zlicza ukończone zadania według użytkowników i typów zadań.
+    Domyślnie przechowywane są wyłącznie liczniki - lista zadań jest zbierana
+    tylko przy include_tasks=True.
+
+    Args:
+        tasks (List[Issue]): Zadania ukończone w analizowanym okresie
+        include_tasks (bool): Czy dołączyć listę zadań (klucz, tytuł, typ, data rozwiązania)
+
+    Returns:
+        List[Dict]: Lista słowników ze statystykami użytkowników, posortowana malejąco po liczbie zadań
+    """
+    # Pobierz skompilowany indeks mapowania nazw użytkowników
+    name_index = get_name_mapping_index()
+
+    # Zbieranie statystyk według użytkowników
+    user_stats = {}
+    skipped_epics = 0
+    skipped_unassigned = 0
+
+    def new_stats(name):
+        stats = {"name": name, "tasks_total": 0, "task_types": {}}
+        if include_tasks:
+            stats["tasks"] = []
+        return stats
+
+    # Utwórz pustą statystykę dla unassigned, żeby zawsze się pojawiało
+    unassigned_id = "unassigned"
+    user_stats[unassigned_id] = new_stats("Nieprzypisane zadania")
+
+    # Dodaj puste statystyki dla wszystkich użytkowników w mapowaniu
+    # To zapewni, że każdy z zespołu będzie widoczny nawet bez zadań.
+    # Identyfikatorem jest skrócone imię, więc mapowanie po nazwie i po accountId trafia do tego samego wpisu
+    for short_name in list(name_index.by_name.values()) + list(name_index.by_account_id.values()):
+        user_stats[f"mapped_{short_name}"] = new_stats(short_name)
+
+    for task in tasks:
+        try:
+            # Sprawdź czy to nie jest epik
+            issue_type = task.fields.issuetype.name
+            if issue_type.lower() == "epic":
+                skipped_epics += 1
+                continue
+
+            # Pobieranie informacji o przypisanym użytkowniku
+            assignee = getattr(task.fields, 'assignee', None)
+            if assignee:
+                assignee_name = assignee.displayName
+
+                # Sprawdź czy istnieje mapowanie nazwy; jeśli nie, używamy oryginalnej nazwy
+                short_name = name_index.resolve(assignee_name, getattr(assignee, 'accountId', None))
+                if short_name is not None:
+                    assignee_name = short_name
+                    assignee_id = f"mapped_{short_name}"
+                else:
+                    assignee_id = f"original_{assignee.displayName}"
+            else:
+                # Zadania nieprzypisane również są liczone
                 assignee_name = "Nieprzypisany"
                 assignee_id = unassigned_id
+                skipped_unassigned += 1
 
-                if hasattr(task.fields, 'assignee') and task.fields.assignee:
-                    assignee = task.fields.assignee
-                    assignee_name = assignee.displayName
-
-                    logger.info(f"Przetwarzanie zadania {task.key} przypisanego do '{assignee_name}'")
-
-                    # Sprawdź czy istnieje mapowanie nazwy
-                    if assignee_name in name_mapping:
-                        logger.info(f"Znaleziono mapowanie dla '{assignee_name}' -> '{name_mapping[assignee_name]}'")
-                        assignee_name = name_mapping[assignee_name]
-                        assignee_id = f"mapped_{assignee.displayName}"  # Używamy oryginalnej nazwy jako ID
-                    else:
-                        logger.warning(f"Brak mapowania dla '{assignee_name}'. Dostępne mapowania: {name_mapping}")
-                        # Jeśli nie ma mapowania, używamy oryginalnej nazwy
-                        assignee_id = f"original_{assignee.displayName}"
-                else:
-                    # Dla nieprzypisanych zadań używamy unassigned_id
-                    logger.info(f"Zadanie {task.key} nie ma przypisanego użytkownika")
-                    skipped_unassigned += 1
-                    # Tym razem NIE pomijamy zadań nieprzypisanych
-                    # continue
-
-                # Inicjalizacja statystyk dla nowego użytkownika
-                if assignee_id not in user_stats:
-                    user_stats[assignee_id] = {
-                        "name": assignee_name,
-                        "tasks_total": 0,
-                        "task_types": {},
-                        "tasks": []
-                    }
-                    logger.info(f"Utworzono nową statystykę dla użytkownika {assignee_name} (ID: {assignee_id})")
-
-                # Zwiększenie liczby ukończonych zadań
-                user_stats[assignee_id]["tasks_total"] += 1
-
-                # Zliczanie typów zadań
-                if issue_type not in user_stats[assignee_id]["task_types"]:
-                    user_stats[assignee_id]["task_types"][issue_type] = 0
-                user_stats[assignee_id]["task_types"][issue_type] += 1
-
-                # Dodanie zadania do listy
-                user_stats[assignee_id]["tasks"].append({
+            stats = user_stats.get(assignee_id)
+            if stats is None:
+                stats = user_stats[assignee_id] = new_stats(assignee_name)
+
+            # Zwiększenie liczników: łącznie i według typu zadania
+            stats["tasks_total"] += 1
+            stats["task_types"][issue_type] = stats["task_types"].get(issue_type, 0) + 1
+
+            if include_tasks:
+                stats["tasks"].append({
                     "key": task.key,
                     "summary": task.fields.summary,
                     "type": issue_type,
                     "resolved": getattr(task.fields, 'resolutiondate', 'unknown')
                 })
 
-            except Exception as task_error:
-                logger.error(f"Błąd podczas przetwarzania zadania {task.key}: {task_error}")
-                logger.error(traceback.format_exc())
-                continue
+        except Exception as task_error:
+            logger.error(f"Błąd podczas przetwarzania zadania {getattr(task, 'key', 'unknown')}: {task_error}")
+            logger.error(traceback.format_exc())
+            continue
 
-        # Konwersja statystyk na listę i sortowanie według liczby zadań
-        stats_list = []
-        for user_id, stats in user_stats.items():
-            # Dodaj tylko użytkowników, którzy mają zadania (chyba że to ID z mapowania)
-            if stats["tasks_total"] > 0 or user_id.startswith("mapped_"):
-                stats["user_id"] = user_id
-                stats_list.append(stats)
-                logger.info(f"Dodano do rankingu: {stats['name']} (zadania: {stats['tasks_total']})")
-            else:
-                logger.info(f"Pominięto w rankingu: {stats['name']} (brak zadań)")
+    # Konwersja statystyk na listę - tylko użytkownicy z zadaniami (chyba że to ID z mapowania)
+    stats_list = []
+    for user_id, stats in user_stats.items():
+        if stats["tasks_total"] > 0 or user_id.startswith("mapped_"):
+            stats["user_id"] = user_id
+            stats_list.append(stats)
 
-        stats_list.sort(key=lambda x: x["tasks_total"], reverse=True)
+    stats_list.sort(key=lambda x: x["tasks_total"], reverse=True)
 
-        logger.info(f"Znaleziono statystyki dla {len(stats_list)} użytkowników")
-        logger.info(f"Pominięto epików: {skipped_epics}, nieprzypisanych zadań: {skipped_unassigned}")
+    logger.info(
+        f"Statystyki dla {len(stats_list)} użytkowników z {len(tasks)} zadań "
+        f"(pominięto epików: {skipped_epics}, nieprzypisanych zadań: {skipped_unassigned})")
 
-        # Wypisz statystyki dla debugowania
+    # Wypisz statystyki dla debugowania
+    if logger.isEnabledFor(logging.DEBUG):
         for user in stats_list:
-            logger.debug(f"Użytkownik: {user['name']}, Liczba zadań: {user['tasks_total']}")
-            for task_type, count in user['task_types'].items():
-                logger.debug(f"  - {task_type}: {count}")
+            logger.debug(f"Użytkownik: {user['name']}, Liczba zadań: {user['tasks_total']}, typy: {user['task_types']}")
+
+    return stats_list
+
 
-        return stats_list
+async def sync_completion_counters(days: int) -> bool:
+    """
+    Uzupełnia tablicę liczników tak, aby obejmowała ostatnie `days` dni.
+    Jeśli tablica już pokrywa to okno, z Jiry pobierane są tylko zadania
+    rozwiązane od ostatniej synchronizacji (i to nie częściej niż co COUNTERS_SYNC_INTERVAL sekund).
+
+    Args:
+        days (int): Liczba dni wstecz, które muszą być pokryte
+
+    Returns:
+        bool: True, jeśli tablica pokrywa żądane okno i można z niej odczytywać statystyki
+    """
+    try:
+        timezone = pytz.timezone(os.getenv('TIMEZONE', 'Europe/Warsaw'))
+        now = datetime.now(timezone)
+        start_day = (now - timedelta(days=days)).date()
+        table = get_completion_counters(now.date())
+
+        full_sync = not table.covers(start_day)
+        if not full_sync:
+            if table.synced_at and (now - table.synced_at).total_seconds() < get_counters_sync_interval():
+                return True
+            since = (table.synced_at.astimezone(timezone) - COUNTERS_SYNC_OVERLAP).strftime('%Y-%m-%d')
+        else:
+            since = start_day.strftime('%Y-%m-%d')
+
+        jql_query = (
+            f'project = "{os.environ.get("JIRA_PROJECT")}" '
+            f'AND status = Done '
+            f'AND resolved >= "{since}" '
+            f'ORDER BY resolved ASC'
+        )
+        logger.debug(f"Synchronizacja liczników ukończonych zadań, zapytanie JQL: {jql_query}")
+
+        jira = await asyncio.to_thread(get_jira_client)
+        with jira_query('counters_sync'):
+            tasks, complete = await asyncio.to_thread(_search_all, jira, jql_query, "assignee,issuetype,resolutiondate",
+                                                      max_total=COUNTERS_MAX_TASKS)
+        ISSUES_PROCESSED.inc(len(tasks), source='counters_sync')
+        added = record_completions(table, tasks, timezone)
+
+        # Bez kompletu wyników czas synchronizacji nie jest przesuwany - inaczej brakujące
+        # zadania nie zostałyby już pobrane (pobrane rekordy zostają, duplikaty są odrzucane)
+        if not complete:
+            logger.warning(f"Nie pobrano kompletu zadań od {since}, liczniki nie pokrywają okna {days} dni")
+            return False
+        if full_sync and (table.covered_from is None or start_day < table.covered_from):
+            table.covered_from = start_day
+        table.synced_at = now
+        save_sync_state(table)
+
+        logger.info(
+            f"Synchronizacja liczników ({'pełna' if full_sync else 'przyrostowa'} od {since}): "
+            f"pobrano {len(tasks)} zadań, nowych {added}, łącznie w tablicy {len(table)}")
+        return True
 
     except Exception as e:
-        logger.error(f"Błąd podczas pobierania statystyk użytkowników: {e}")
+        logger.error(f"Błąd podczas synchronizacji liczników ukończonych zadań: {e}")
         logger.error(traceback.format_exc())
-        return []
+        return False
 
 
-def get_roast_for_inactive_member(name: str) -> str:
+async def fetch_window_statistics(windows: List[int]) -> Dict[int, List[Dict]]:
     """
-    Zwraca humorystyczny "roast" dla nieaktywnego członka zespołu.
+    Zwraca statystyki użytkowników dla kilku okien czasowych naraz (np. 7, 30, 90 dni).
+    Jira jest odpytywana co najwyżej raz (dla najdłuższego okna), a każde okno
+    to odczyt sum prefiksowych z tablicy liczników. Jeśli tablicy nie udało się
+    uzupełnić, statystyki są liczone klasycznie z zadań pobranych z Jiry.
 
     Args:
-        name (str): Imię członka zespołu
+        windows (List[int]): Długości okien w dniach
 
     Returns:
-        str: Humorystyczny tekst
+        Dict[int, List[Dict]]: Statystyki użytkowników dla każdego okna
     """
-    roasts = [
-        f"{name} - widziani ostatnio: nigdy. Może są na wakacjach... które trwają cały rok?",
-        f"{name} wykonał tyle zadań, ile jest jednorożców na świecie.",
-        f"{name} - legenda głosi, że kiedyś coś zrobił, ale nikt tego nie widział.",
-        f"{name} osiągnął idealne zero. Brawo za konsekwencję!",
-        f"{name} ma ciekawą strategię: \"nie można zrobić błędu w zadaniu, jeśli się go nie podejmie\".",
-        f"{name} prawdopodobnie myśli, że Jira to gatunek kawy.",
-        f"{name} - ekspert od delegowania zadań... sobie samemu w przyszłości.",
-        f"{name} traktuje deadline'y jak wskazówki, a nie zobowiązania.",
-        f"{name} - mistrz prokrastynacji roku!",
-        f"{name} ma tyle samo zadań co smutny Excel bez danych.",
-        f"{name} występuje w projekcie na takiej samej zasadzie jak John Cena - nikt go nie widzi.",
-        f"{name} to ekspert w sztuce niedotrzymywania terminów.",
-        f"{name} pobiera pensję za mistrzowskie udawanie, że pracuje.",
-        f"{name} podobno wciąż poszukuje przycisku \"Start\" w Jirze.",
-        f"{name} ma na koncie więcej wymówek niż zadań.",
-        f"{name} - dział HR wciąż sprawdza, czy faktycznie istnieje.",
-        f"{name} traktuje zadania jak UFO - wierzy, że istnieją, ale nigdy ich nie widział.",
-        f"{name} myśli, że \"sprint\" to konkurencja lekkoatletyczna, a nie termin na zadania.",
-        f"{name} będzie dostępny kiedy skończy oglądać \"jeszcze jeden odcinek\".",
-        f"{name} osiągnął stan nirwany produkcyjnej - pełna pustka.",
-        f"{name} - status projektów: dane wrażliwe, nikt nie może ich zobaczyć.",
-        f"{name} - według naukowców, jego produktywność jest mniejsza niż u kamienia.",
-        f"{name} - gdyby lenistwo było olimpijską dyscypliną, miałby złoty medal.",
-        f"{name} spędza więcej czasu na pisaniu wymówek niż na faktycznej pracy.",
-        f"{name} myśli, że \"deadline\" to nazwa nowego filmu akcji.",
-        f"{name} - nawet Bot spędza więcej czasu przy komputerze.",
-        f"{name} jest jak WiFi w tunelu - straciliśmy połączenie.",
-        f"{name} - Wielki Inkwizytor Filipa wysyła mu już trzecie wezwanie do pracy.",
-        f"{name} używa projektu jak statusu na LinkedIn - jest tam, ale nic nie robi.",
-        f"{name} uważa, że \"backlog\" to nowa restauracja w mieście.",
-        f"{name} myśli, że \"pull request\" to prośba o wyciągnięcie go z łóżka.",
-        f"{name} - jedyne co ciągnie, to wagary od projektu.",
-        f"{name} mógłby wystąpić w \"Gdzie jest Waldo?\" projektu.",
-        f"{name} jest jak yeti projektu - wszyscy o nim słyszeli, ale nikt go nie widział.",
-        f"{name} ma więcej nieukończonych zadań niż Tolkien niedokończonych historii.",
-        f"{name} - uśpiony agent, wciąż czeka na kod aktywacyjny.",
-        f"{name} uczestniczy w projekcie jak duch - wszyscy wiedzą, że gdzieś jest, ale nikt go nie widzi.",
-        f"{name} wnosi do zespołu tyle samo, co pusty kubek do kolekcji kawy.",
-        f"{name} ma więcej wykrętów niż szwajcarski scyzoryk funkcji.",
-        f"{name} - jego ulubiony film to \"Zniknięcie\" a ulubiona piosenka \"Sound of Silence\".",
-        f"{name} to jedyna osoba, która traktuje pracę jak starą znajomą - odwiedza ją raz na rok.",
-        f"{name} - odkrył sposób na pracę bez pracy. Naukowcy są zaskoczeni!",
-        f"{name} myśli, że GitHub to serwis społecznościowy dla kotów.",
-        f"{name} - gdyby prokrastynacja była walutą, byłby miliarderem.",
-        f"{name} nie wierzy w żadną religię, ale święcie wierzy, że zadania rozwiążą się same.",
-        f"{name} podchodzi do terminów jak pirat do kodeksu - traktuje je bardziej jak wytyczne.",
-        f"{name} ma na koncie mniej commitów niż przeciętny kamień.",
-        f"{name} używa \"zajęty\" jako statusu permanentnego, mimo braku dowodów na to zajęcie.",
-        f"{name} - nawet BOT ma wyższy wskaźnik aktywności.",
-        f"{name} pomaga projektowi przez niezabieranie czasu innym.",
-        f"{name} myśli, że \"klient\" to postać z bajki, a \"deadline\" to miejsce, gdzie umierają marzenia.",
-        f"{name} istnieje w projekcie na zasadzie placebo - niby jest, ale efektów brak.",
-        f"{name} uważa commita za rodzaj zobowiązania którego powinien unikać.",
-        f"{name} przeżywa obecnie najdłuższy urlop w historii korporacji.",
-        f"{name} pojawia się w projekcie rzadziej niż zaćmienie słońca.",
-        f"{name} - w konkurencji na najrzadziej widzianego członka zespołu, zajmuje pierwsze miejsce.",
-        f"{name} ma tyle samo ukończonych zadań co pingwin lotów transatlantyckich.",
-        f"{name} myśli, że \"dokumentacja\" to nowy horror na Netflixie.",
-        f"{name} został oficjalnie dodany do słownika jako synonim słowa \"nieobecny\".",
-        f"{name} - jedyne, co push'uje, to przycisk \"snooze\" w budziku.",
-        f"{name} jest jak ofiara w horrorze - wszyscy wiedzą, że nie przetrwa do końca projektu.",
-        f"{name} ma najczystszą historię commitów - idealnie pustą.",
-        f"{name} - jego wkład w projekt jest jak wkład homeopatyczny - teoretycznie istnieje.",
-        f"{name} przechodzi przez całe życie używając jednego wymówienia: \"Zaraz do tego wrócę\".",
-        f"{name} to mistrz w znajdowaniu wymówek, dlaczego nie może wykonać zadania.",
-        f"{name} buduje swoje portfolio składające się głównie z pustych obietnic.",
-        f"{name} jest tak zajęty \"planowaniem pracy\", że nie ma czasu na jej wykonanie.",
-        f"{name} traktuje zadania jak dobre chęci - ma je, ale nic z nimi nie robi.",
-        f"{name} - specjalista od deadlinów... pośmiertnych.",
-        f"{name} - gdyby prokrastynacja była pracą, byłby prezesem firmy.",
-        f"{name} ma więcej pustych obietnic niż pusty automat z przekąskami.",
-        f"{name} prawdopodobnie myśli, że \"bug\" to tylko nieprzyjemne stworzenie.",
-        f"{name} wykorzystuje system zarządzania projektem jak Facebooka - tylko podgląda.",
-        f"{name} - już dwa stanowiska zajęte przez jego ghosting.",
-        f"{name} ciągle pracuje zdalnie... od pracy.",
-        f"{name} czeka na idealny moment, który nigdy nie nadejdzie.",
-        f"{name} pojawia się w projekcie rzadziej niż kometa Halleya.",
-        f"{name} opracował nową metodologię: NADA (Never Actually Do Anything).",
-        f"{name} udowadnia, że można być częścią zespołu bez bycia częścią pracy zespołowej.",
-        f"{name} prawdopodobnie myśli, że \"sprint\" to tylko sposób na szybkie bieganie.",
-        f"{name} jest ekspertem w sztuce bycia niewidocznym w projekcie.",
-        f"{name} został oficjalnie uznany za legendę miejską projektu.",
-        f"{name} - badacze wciąż szukają dowodów na jego wkład w projekt.",
-        f"{name} myśli, że \"milestone\" to nazwa zespołu rockowego.",
-        f"{name} traktuje zadania jak swoje urodziny - pamięta o nich raz w roku.",
-        f"{name} ma w grafiku więcej wolnego niż nauczyciel w wakacje.",
-        f"{name} ma więcej nieobecności niż obecności.",
-        f"{name} myśli, że \"feedback\" to nazwa nowego fast foodu.",
-        f"{name} jest jak Schrödinger's Dev - teoretycznie pracuje i nie pracuje jednocześnie.",
-        f"{name} osiągnął perfekcję w sztuce unikania odpowiedzialności.",
-        f"{name} jest tak dobry w ukrywaniu się, że nawet satelity go nie widzą.",
-        f"{name} - ostatni raz widziany podczas rekrutacji.",
-        f"{name} jest niczym ninja - nigdy nie wiesz, czy jest, czy go nie ma. Zazwyczaj go nie ma.",
-        f"{name} myśli, że Jira to egzotyczne danie kuchni tajskiej.",
-        f"{name} - jego ostatni commit jest już zabytkiem archeologicznym.",
-        f"{name} ma mniej aktywności w projekcie niż średniowieczny mnich w internecie.",
-        f"{name} pojawia się w pracy rzadziej niż deszcz na Saharze.",
-        f"{name} wykonał imponującą liczbę zadań: 0. Tylko nieliczni potrafią utrzymać taką konsekwencję!",
-        f"{name} stosuje metodologię pracy: \"Zostawię to dla przyszłego mnie, który i tak tego nie zrobi.\"",
-        f"{name} - prawdopodobnie myśli, że \"deployment\" to rodzaj dekoracji.",
-        f"{name} osiągnął zen poprzez całkowity brak jakiejkolwiek produkcji."
-    ]
-    import random
-    return random.choice(roasts)
+    if not windows:
+        return {}
+
+    if not await sync_completion_counters(max(windows)):
+        return {days: await fetch_user_statistics(days) for days in windows}
+
+    timezone = pytz.timezone(os.getenv('TIMEZONE', 'Europe/Warsaw'))
+    today = datetime.now(timezone).date()
+    table = get_completion_counters()
+    return {days: table.window_stats(today - timedelta(days=days), today) for days in windows}
+
+
+async def fetch_leaderboard_statistics(days: int) -> List[Dict]:
+    """
+    Zwraca statystyki tablicy wyników z silnika kolumnowego, rozszerzone o udziały typów,
+    zmianę tydzień do tygodnia i serie dni. Jeśli tablicy liczników nie udało się uzupełnić,
+    zwracane są podstawowe statystyki liczone z zadań pobranych z Jiry.
+
+    Args:
+        days (int): Liczba dni wstecz do analizy
+
+    Returns:
+        List[Dict]: Lista słowników ze statystykami użytkowników
+    """
+    # Zmiana tydzień do tygodnia potrzebuje co najmniej dwóch pełnych tygodni danych
+    if not await sync_completion_counters(max(days, 13)):
+        return await fetch_user_statistics(days)
+
+    timezone = pytz.timezone(os.getenv('TIMEZONE', 'Europe/Warsaw'))
+    return get_completion_counters().insight_stats(days, datetime.now(timezone).date())
 
 
 def create_leaderboard_embed(stats_list: List[Dict], days: int) -> discord.Embed:
@@ -391,104 +366,35 @@ def create_leaderboard_embed(stats_list: List[Dict], days: int) -> discord.Embed
     Returns:
         discord.Embed: Embed z tablicą wyników
     """
-    try:
-        # Pobierz strefę czasową z konfiguracji
-        timezone_str = os.getenv('TIMEZONE', 'Europe/Warsaw')
-        timezone = pytz.timezone(timezone_str)
+    return to_discord_embed(render_leaderboard(stats_list, days))
 
-        # Aktualna data i czas
-        now = datetime.now(timezone)
 
-        # Usuwamy "Nieprzypisane zadania" z rankingu
-        stats_list = [user for user in stats_list if user["name"] != "Nieprzypisane zadania"]
+async def build_leaderboard(days: int = 30) -> RenderedEmbed:
+    """
+    Buduje tablicę wyników w postaci czystych danych.
 
-        # Znajdź aktywnych i nieaktywnych użytkowników
-        active_users = [user for user in stats_list if user["tasks_total"] > 0]
-        inactive_users = [user for user in stats_list if user["tasks_total"] == 0]
+    Args:
+        days (int): Liczba dni wstecz do analizy (domyślnie 30)
 
-        # Sortujemy aktywnych użytkowników według liczby zadań
-        active_users.sort(key=lambda x: x["tasks_total"], reverse=True)
+    Returns:
+        RenderedEmbed: Wyrenderowana tablica wyników
 
-        # Tworzenie embeda
-        embed = discord.Embed(
-            title=f"🏆 Tablica wyników - ostatnie {days} dni",
-            description=f"Ranking zaangażowania członków zespołu od {(now - timedelta(days=days)).strftime('%d.%m.%Y')} do {now.strftime('%d.%m.%Y')}",
-            color=0x00AAFF  # Niebieski kolor
-        )
+    Raises:
+        RuntimeError: Gdy nie udało się pobrać statystyk (poprawne statystyki zawsze zawierają
+            co najmniej wpis zadań nieprzypisanych)
+    """
+    logger.info(f"Generowanie tablicy wyników za ostatnie {days} dni")
 
-        if not active_users:
-            embed.add_field(
-                name="Brak danych",
-                value="Nie znaleziono ukończonych zadań w analizowanym okresie.",
-                inline=False
-            )
-            return embed
-
-        # Generowanie rankingu aktywnych użytkowników
-        leaderboard_text = ""
-        for index, user in enumerate(active_users):
-            # Emoji dla top 3
-            position_emoji = "🥇" if index == 0 else "🥈" if index == 1 else "🥉" if index == 2 else f"{index + 1}."
-
-            # Tekst z liczbą zadań
-            task_text = f"{user['tasks_total']} zadań"
-
-            # Dodanie wpisu dla użytkownika
-            leaderboard_text += f"{position_emoji} **{user['name']}**: {task_text}\n"
-
-        embed.add_field(
-            name="Ranking ukończonych zadań",
-            value=leaderboard_text,
-            inline=False
-        )
+    # Statystyki użytkowników z tablicy liczników (z przyrostową synchronizacją z Jirą)
+    stats = await fetch_leaderboard_statistics(days)
+    if not stats:
+        raise RuntimeError("Nie udało się pobrać statystyk z Jiry")
 
-        # Dodanie informacji o typach zadań dla top 3 (maksymalnie)
-        for index, user in enumerate(active_users[:3]):
-            if index >= len(active_users):
-                break
-
-            # Przygotowanie tekstu o typach zadań
-            task_types_text = ""
-            for task_type, count in user["task_types"].items():
-                # Pomijamy epiki
-                if task_type.lower() != "epic":
-                    task_types_text += f"{task_type}: {count}\n"
-
-            medal = "🥇" if index == 0 else "🥈" if index == 1 else "🥉"
-            embed.add_field(
-                name=f"{medal} {user['name']} - szczegóły",
-                value=task_types_text if task_types_text else "Brak zadań",
-                inline=True
-            )
-
-        # Dodaj roasty dla nieaktywnych użytkowników
-        if inactive_users:
-            inactive_text = ""
-            for user in inactive_users:
-                inactive_text += f"• {get_roast_for_inactive_member(user['name'])}\n"
-
-            embed.add_field(
-                name="⚠️ Ściana wstydu ⚠️",
-                value=inactive_text,
-                inline=False
-            )
-
-        # Dodanie stopki
-        embed.set_footer(text=f"Wygenerowano {now.strftime('%d.%m.%Y %H:%M:%S')} • Wielki Inkwizytor Filipa")
-
-        return embed
-
-    except Exception as e:
-        logger.error(f"Błąd podczas tworzenia embeda z tablicą wyników: {e}")
-        logger.error(traceback.format_exc())
-
-        # Utworzenie embeda błędu
-        error_embed = discord.Embed(
-            title="⚠️ Błąd tablicy wyników",
-            description=f"Wystąpił błąd podczas generowania tablicy wyników: {str(e)}",
-            color=discord.Color.orange()
-        )
-        return error_embed
+    with RENDER_SECONDS.time(renderer='leaderboard'), span('render.leaderboard', users=len(stats)) as render:
+        rendered = render_leaderboard(stats, days)
+        render.set(chars=rendered.size)
+    logger.info(f"Tablica wyników wygenerowana pomyślnie dla {len(stats)} użytkowników")
+    return rendered
 
 
 async def generate_leaderboard(days: int = 30) -> discord.Embed:
@@ -502,16 +408,7 @@ async def generate_leaderboard(days: int = 30) -> discord.Embed:
         discord.Embed: Wygenerowana tablica wyników
     """
     try:
-        logger.info(f"Generowanie tablicy wyników za ostatnie {days} dni")
-
-        # Pobierz statystyki użytkowników
-        stats = await fetch_user_statistics(days)
-
-        # Utwórz embed z tablicą wyników
-        embed = create_leaderboard_embed(stats, days)
-
-        logger.info(f"Tablica wyników wygenerowana pomyślnie dla {len(stats)} użytkowników")
-        return embed
+        return to_discord_embed(await build_leaderboard(days))
 
     except Exception as e:
         logger.error(f"Błąd podczas generowania tablicy wyników: {e}")
@@ -539,7 +436,7 @@ async def send_leaderboard_to_channel(client, channel_id=None):
         bool: True jeśli wysłanie się powiodło, False w przeciwnym razie
     """
     try:
-        from bot_config import get_channel_id
+        from bot_config import get_channel_id, set_last_run
 
         # Jeśli nie podano ID kanału, użyj kanału raportów
         if not channel_id:
@@ -561,6 +458,7 @@ async def send_leaderboard_to_channel(client, channel_id=None):
         # Wysłanie tablicy
         await channel.send(embed=leaderboard_embed)
         logger.info(f"Wysłano tablicę wyników na kanał {channel.name}")
+        set_last_run('leaderboard')
         return True
 
     except Exception as e:
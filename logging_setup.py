@@ -0,0 +1,118 @@
+# logging_setup.py
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Tuple
+
+# Domyślny plik logu i jego rotacja (rozmiar jednego pliku w bajtach i liczba plików archiwalnych)
+DEFAULT_LOG_FILE = 'WielkiInkwizytorFilipa.log'
+DEFAULT_LOG_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+
+# Domyślnie ile wpisów z jednego miejsca w kodzie (poniżej ERROR) przepuszczać w oknie (w sekundach)
+DEFAULT_LOG_RATE_LIMIT = 20
+DEFAULT_LOG_RATE_WINDOW = 60
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ogranicza liczbę wpisów z jednego miejsca w kodzie (plik i linia) w oknie czasu,
+    np. ostrzeżeń powtarzanych dla każdego zadania z Jiry. Błędy przechodzą zawsze.
+    Pierwszy wpis po oknie z pominięciami podaje, ile wpisów pominięto.
+    """
+
+    def __init__(self, limit: Optional[int] = None, window: Optional[int] = None):
+        super().__init__()
+        self.limit = limit if limit is not None else int(os.getenv('LOG_RATE_LIMIT', str(DEFAULT_LOG_RATE_LIMIT)))
+        self.window = window if window is not None else int(os.getenv('LOG_RATE_WINDOW', str(DEFAULT_LOG_RATE_WINDOW)))
+        # (plik, linia) -> [początek okna, przepuszczone, pominięte]
+        self._sites: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.ERROR:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.window:
+                suppressed = site[2] if site is not None else 0
+                self._sites[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.getMessage()} (pominięto {suppressed} podobnych wpisów)"
+                    record.args = None
+                return True
+            if site[1] < self.limit:
+                site[1] += 1
+                return True
+            site[2] += 1
+            return False
+
+
+# Zmienne globalne
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(log_file: Optional[str] = None, level: Optional[str] = None) -> QueueListener:
+    """
+    Konfiguruje logowanie bez blokowania pętli zdarzeń: wpisy trafiają do kolejki,
+    a zapis do pliku (z rotacją według rozmiaru) i na konsolę wykonuje osobny wątek.
+    Ustawienia są czytane ze zmiennych środowiskowych przy każdym wywołaniu - ponowne
+    wywołanie (np. po wczytaniu pliku .env) zastępuje poprzednią konfigurację.
+
+    Args:
+        log_file (str): Ścieżka pliku logu (domyślnie LOG_FILE)
+        level (str): Poziom logowania, np. INFO lub DEBUG (domyślnie LOG_LEVEL)
+
+    Returns:
+        QueueListener: Wątek zapisujący wpisy (zatrzymywany przez stop_logging)
+    """
+    global _listener
+    log_file = log_file or os.getenv('LOG_FILE', DEFAULT_LOG_FILE)
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingFileHandler(
+        log_file, maxBytes=int(os.getenv('LOG_MAX_BYTES', str(DEFAULT_LOG_MAX_BYTES))),
+        backupCount=int(os.getenv('LOG_BACKUP_COUNT', str(DEFAULT_LOG_BACKUP_COUNT))), encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level, logging.INFO))
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    # Poprzedni wątek zapisuje swoje oczekujące wpisy dopiero po przełączeniu na nową kolejkę
+    if _listener is None:
+        atexit.register(stop_logging)
+    else:
+        stop_logging()
+    _listener = listener
+    return _listener
+
+
+def stop_logging():
+    """Zapisuje oczekujące wpisy i zatrzymuje wątek logowania"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,201 @@
+# loop_monitor.py
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from metrics import LOOP_LAG_SECONDS, LOOP_SLOW_CALLBACKS
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Domyślnie: co ile sekund mierzyć opóźnienie pętli (LOOP_LAG_SAMPLE_INTERVAL)
+DEFAULT_LOOP_LAG_SAMPLE_INTERVAL = 0.5
+
+# Domyślnie: od ilu milisekund wywołanie w pętli zdarzeń uznawane jest za blokujące (LOOP_SLOW_CALLBACK_MS)
+DEFAULT_LOOP_SLOW_CALLBACK_MS = 100
+
+# Liczba ostatnich pomiarów opóźnienia (przy 0.5 s - ostatnie 10 minut)
+LAG_WINDOW = 1200
+
+# Liczba najgorszych wywołań pokazywanych w /stan
+TOP_OFFENDERS = 5
+
+# Oryginalna metoda uruchamiająca wywołania w pętli (przywracana po zatrzymaniu monitora)
+_original_handle_run = asyncio.events.Handle._run
+
+
+def describe_callback(handle: asyncio.Handle) -> str:
+    """
+    Zwraca czytelną nazwę wywołania z pętli zdarzeń - dla kroków zadań nazwę korutyny.
+
+    Args:
+        handle (asyncio.Handle): Wywołanie z pętli zdarzeń
+
+    Returns:
+        str: Nazwa korutyny lub funkcji
+    """
+    callback = getattr(handle, '_callback', None)
+    if callback is None:
+        return "<anulowane>"
+    owner = getattr(callback, '__self__', None)
+    if isinstance(owner, asyncio.Task):
+        name = getattr(owner.get_coro(), '__qualname__', None) or owner.get_name()
+        # Nazwy nadane zadaniom (np. przez discord.py) pomagają odróżnić instancje tej samej korutyny
+        if not owner.get_name().startswith('Task-'):
+            name = f"{name} [{owner.get_name()}]"
+        return name
+    return getattr(callback, '__qualname__', None) or repr(callback)
+
+
+class SlowCallbackStats:
+    """Statystyki wolnych wywołań jednej korutyny lub funkcji"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+
+class LoopMonitor:
+    """
+    Monitor pętli zdarzeń.
+
+    Co `sample_interval` sekund mierzy, o ile później niż zaplanowano pętla wznawia
+    uśpioną korutynę (opóźnienie pętli). Dodatkowo mierzy czas każdego wywołania
+    uruchamianego przez pętlę i zapamiętuje te, które przekroczyły próg, z nazwą
+    korutyny - tak jak robi to asyncio w trybie debug (slow_callback_duration).
+    """
+
+    def __init__(self, sample_interval: Optional[float] = None, slow_callback_ms: Optional[int] = None,
+                 window: int = LAG_WINDOW):
+        if sample_interval is None:
+            sample_interval = float(os.getenv('LOOP_LAG_SAMPLE_INTERVAL', str(DEFAULT_LOOP_LAG_SAMPLE_INTERVAL)))
+        if slow_callback_ms is None:
+            slow_callback_ms = int(os.getenv('LOOP_SLOW_CALLBACK_MS', str(DEFAULT_LOOP_SLOW_CALLBACK_MS)))
+        self.sample_interval = sample_interval
+        self.slow_threshold = slow_callback_ms / 1000
+        self._lags: deque = deque(maxlen=window)
+        self._offenders: Dict[str, SlowCallbackStats] = {}
+        self.slow_callbacks = 0
+        self._installed = False
+
+    def install(self):
+        """Włącza pomiar czasu wywołań w pętli zdarzeń"""
+        if self._installed:
+            return
+        monitor = self
+
+        def _timed_run(handle):
+            started = time.perf_counter()
+            try:
+                _original_handle_run(handle)
+            finally:
+                duration = time.perf_counter() - started
+                if duration >= monitor.slow_threshold:
+                    monitor.record_slow_callback(describe_callback(handle), duration)
+
+        asyncio.events.Handle._run = _timed_run
+        self._installed = True
+
+    def uninstall(self):
+        """Wyłącza pomiar czasu wywołań"""
+        if self._installed:
+            asyncio.events.Handle._run = _original_handle_run
+            self._installed = False
+
+    def record_slow_callback(self, name: str, duration: float):
+        """Zapamiętuje wywołanie, które zablokowało pętlę dłużej niż próg"""
+        stats = self._offenders.get(name)
+        if stats is None:
+            stats = self._offenders[name] = SlowCallbackStats(name)
+        stats.add(duration)
+        self.slow_callbacks += 1
+        LOOP_SLOW_CALLBACKS.inc(callback=name)
+        logger.warning(f"Wywołanie {name} zablokowało pętlę zdarzeń na {duration * 1000:.0f} ms")
+
+    def record_lag(self, lag: float):
+        """Zapamiętuje pomiar opóźnienia pętli"""
+        self._lags.append(lag)
+        LOOP_LAG_SECONDS.observe(lag)
+
+    def lag_percentile(self, percent: float) -> Optional[float]:
+        """
+        Zwraca percentyl opóźnienia pętli z ostatnich pomiarów.
+
+        Args:
+            percent (float): Percentyl (0-100)
+
+        Returns:
+            float: Opóźnienie w sekundach lub None, jeśli nie ma jeszcze pomiarów
+        """
+        if not self._lags:
+            return None
+        samples = sorted(self._lags)
+        index = min(len(samples) - 1, max(0, int(round(percent / 100 * len(samples))) - 1))
+        return samples[index]
+
+    def worst_offenders(self, limit: int = TOP_OFFENDERS) -> List[SlowCallbackStats]:
+        """Zwraca wywołania o najdłuższym pojedynczym czasie blokady"""
+        return sorted(self._offenders.values(), key=lambda stats: stats.max, reverse=True)[:limit]
+
+    def summary(self) -> Dict:
+        """Zwraca podsumowanie do /stan (czasy w milisekundach)"""
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 1)
+
+        return {
+            "samples": len(self._lags),
+            "lag_p50_ms": ms(self.lag_percentile(50)),
+            "lag_p99_ms": ms(self.lag_percentile(99)),
+            "lag_max_ms": ms(max(self._lags) if self._lags else None),
+            "slow_threshold_ms": ms(self.slow_threshold),
+            "slow_callbacks": self.slow_callbacks,
+            "worst": [
+                {"name": stats.name, "count": stats.count, "max_ms": ms(stats.max)}
+                for stats in self.worst_offenders()
+            ]
+        }
+
+    async def run(self):
+        """Mierzy opóźnienie pętli w nieskończonej pętli (do uruchomienia przez supervisor)"""
+        self.install()
+        logger.info(f"Uruchomiono monitor pętli zdarzeń (pomiar co {self.sample_interval} s, "
+                    f"próg wolnego wywołania {self.slow_threshold * 1000:.0f} ms)")
+        try:
+            while True:
+                started = time.monotonic()
+                await asyncio.sleep(self.sample_interval)
+                self.record_lag(max(0.0, time.monotonic() - started - self.sample_interval))
+        finally:
+            self.uninstall()
+
+
+# Zmienne globalne
+_loop_monitor: Optional[LoopMonitor] = None
+
+
+def is_loop_monitor_enabled() -> bool:
+    """Sprawdza, czy włączono monitor pętli zdarzeń (LOOP_MONITOR_ENABLED)"""
+    return os.getenv('LOOP_MONITOR_ENABLED', 'true').lower() == 'true'
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """
+    Zwraca współdzielony monitor pętli zdarzeń. Przy pierwszym wywołaniu tworzy go
+    z ustawieniami LOOP_LAG_SAMPLE_INTERVAL i LOOP_SLOW_CALLBACK_MS.
+
+    Returns:
+        LoopMonitor: Monitor pętli zdarzeń
+    """
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopMonitor()
+    return _loop_monitor
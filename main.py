@@ -1,4 +1,5 @@
 # main.py
+import argparse
 import asyncio
 import logging
 import os
@@ -9,19 +10,20 @@ import discord
 from dotenv import load_dotenv, find_dotenv
 
 from bot_config import setup_bot_and_config
+from bug_board import BugBoardView
 from commands import register_commands
+from completion_counters import preload_completion_counters
 from jira_client import get_jira_client
-from tasks import bugs_update_loop, schedule_daily_report
-
-# Konfiguracja logowania
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("WielkiInkwizytorFilipa.log"),
-        logging.StreamHandler()
-    ]
-)
+from job_queue import get_job_queue
+from logging_setup import setup_logging, stop_logging
+from loop_monitor import get_loop_monitor, is_loop_monitor_enabled
+from metrics import get_metrics_port, instrument_discord_client, serve_metrics
+from supervisor import get_supervisor
+from tasks import run_scheduler
+
+# Konfiguracja logowania - zapis do pliku (z rotacją) i na konsolę w osobnym wątku
+# (ponownie po wczytaniu .env w load_environment_variables)
+setup_logging()
 logger = logging.getLogger('WielkiInkwizytorFilipa')
 
 
@@ -69,6 +71,8 @@ def load_environment_variables():
         # Załaduj zmienne środowiskowe
         loaded = load_dotenv(override=True)
         if loaded:
+            # Logowanie było skonfigurowane przed wczytaniem .env - zastosuj ustawienia LOG_* z pliku
+            setup_logging()
             logger.info("Zmienne środowiskowe załadowane pomyślnie")
 
             # Sprawdź czy kluczowe zmienne zostały faktycznie załadowane
@@ -165,9 +169,15 @@ async def main():
             logger.error(traceback.format_exc())
             logger.warning("Bot uruchomi się, ale funkcje Jiry mogą nie działać poprawnie")
 
+        # Pomiary wywołań API Discorda (metryki)
+        instrument_discord_client(client)
+
         # Rejestracja komend
         register_commands(tree)
 
+        # Historia ukończonych zadań wczytywana przed startem, w osobnym wątku (nie w pierwszej komendzie)
+        await preload_completion_counters()
+
         # Event handler dla on_ready
         @client.event
         async def on_ready():
@@ -185,36 +195,79 @@ async def main():
                     await tree.sync(guild=guild)
                     logger.info(f"Komendy slash zostały zsynchronizowane dla serwera {guild_id}")
 
-                # Uruchomienie pętli aktualizacji bugów
-                client.loop.create_task(bugs_update_loop(client))
+                # Rejestracja trwałego widoku tablicy stronicowanej (przyciski działają także po restarcie)
+                client.add_view(BugBoardView())
+
+                # Uruchomienie harmonogramu zadań (aktualizacja bugów, raport dzienny, tablica wyników).
+                # on_ready jest wywoływane ponownie po każdym wznowieniu połączenia - supervisor
+                # uruchamia zadanie tylko raz i restartuje je po awarii
+                get_supervisor().start('scheduler', lambda: run_scheduler(client))
+
+                # Pula workerów wykonujących ciężkie komendy (raporty, tablica wyników, odświeżanie)
+                get_supervisor().start('job_queue', get_job_queue().run)
 
-                # Uruchomienie planowania raportów dziennych
-                client.loop.create_task(schedule_daily_report(client))
+                # Opcjonalny serwer metryk w formacie Prometheusa (METRICS_PORT)
+                if get_metrics_port():
+                    get_supervisor().start('metrics_server', serve_metrics)
 
-                # Uruchomienie planowania tygodniowej tablicy wyników
-                from tasks import schedule_weekly_leaderboard
-                client.loop.create_task(schedule_weekly_leaderboard(client))
-                logger.info("Uruchomiono planowanie tygodniowej tablicy wyników")
+                # Monitor opóźnienia pętli zdarzeń i wywołań blokujących (wynik w /stan i metrykach)
+                if is_loop_monitor_enabled():
+                    get_supervisor().start('loop_monitor', get_loop_monitor().run)
 
             except Exception as e:
                 logger.error(f"Błąd podczas inicjalizacji bota: {e}")
                 logger.error(traceback.format_exc())
 
         # Uruchomienie bota
-        await client.start(DISCORD_TOKEN)
+        try:
+            await client.start(DISCORD_TOKEN)
+        finally:
+            # Zatrzymaj zadania w tle przed zamknięciem połączenia
+            await get_supervisor().shutdown()
+            if not client.is_closed():
+                await client.close()
 
     except Exception as e:
         logger.critical(f"Krytyczny błąd podczas uruchamiania bota: {e}")
         logger.critical(traceback.format_exc())
 
 
+def parse_arguments():
+    """Parsuje argumenty wiersza poleceń (domyślnie uruchamiany jest bot)"""
+    parser = argparse.ArgumentParser(description="Bot Jira-Discord")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Wyrenderuj tablicę bugów, raport i tablicę wyników do plików JSON bez logowania do Discorda")
+    parser.add_argument("--dry-run-dir", default="dry_run", help="Katalog wyników przebiegu próbnego (domyślnie dry_run)")
+    parser.add_argument("--dry-run-cycles", nargs="+", choices=('bugs', 'report', 'leaderboard'),
+                        default=['bugs', 'report', 'leaderboard'], help="Cykle przebiegu próbnego")
+    parser.add_argument("--profile-cycle", choices=('bugs', 'report', 'leaderboard'),
+                        help="Wykonaj jeden cykl bez Discorda i zapisz profil cProfile oraz raport alokacji")
+    parser.add_argument("--profile-dir", default="profile", help="Katalog wyników profilowania (domyślnie profile)")
+    parser.add_argument("--profile-top", type=int, default=25, help="Liczba pozycji w raporcie profilowania")
+    return parser.parse_args()
+
+
 # Uruchomienie bota z obsługą przerwania
 if __name__ == "__main__":
+    args = parse_arguments()
     try:
+        if args.dry_run:
+            # Bez połączenia z Discordem (bez gatewaya i synchronizacji komend) - wyniki trafiają do plików JSON
+            from dry_run import render_dry_run
+            load_environment_variables()
+            sys.exit(render_dry_run(args.dry_run_dir, args.dry_run_cycles))
+        if args.profile_cycle:
+            # Jeden cykl na sztucznym kliencie Discorda - bez logowania i pętli harmonogramu
+            from dry_run import profile_cycle
+            load_environment_variables()
+            sys.exit(profile_cycle(args.profile_cycle, args.profile_dir, args.profile_top))
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Bot zatrzymany przez użytkownika (Ctrl+C)")
     except Exception as e:
         logger.critical(f"Nieoczekiwany błąd: {e}")
         logger.critical(traceback.format_exc())
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    finally:
+        # Zapisz wpisy oczekujące w kolejce logowania
+        stop_logging()
\ No newline at end of file
@@ -6,9 +6,16 @@ import traceback
 import discord
 import pytz
 
-from bot_config import get_channel_id, get_last_message_id, set_last_message_id
-from discord_embeds import create_bugs_embeds
+from bot_config import (
+    get_channel_id, get_last_message_id, get_bug_message_ids, set_bug_message_ids, set_last_run, get_board_mode
+)
+from bug_board import build_board_message, get_snapshot, update_snapshot
+from embed_layout import paginate_embeds
+from render_model import to_discord_embeds
+from renderers import render_bugs_board
 from jira_client import fetch_jira_bugs
+from metrics import ISSUES_PROCESSED, RENDER_SECONDS
+from tracing import span
 
 logger = logging.getLogger('WielkiInkwizytorFilipa')
 
@@ -64,12 +71,130 @@ async def clear_previous_bug_messages(client, channel):
         return 0
 
 
-async def update_bugs_message(client):
+async def send_new_bug_messages(client, channel, embeds):
+    """
+    Czyści stare wiadomości z bugami i wysyła tablicę od nowa.
+
+    Args:
+        client (discord.Client): Klient Discord
+        channel (discord.TextChannel): Kanał bugów
+        embeds (List[RenderedEmbed]): Wyrenderowane embedy tablicy bugów
+
+    Returns:
+        List[int]: ID wysłanych wiadomości
+    """
+    # Wyczyść poprzednie wiadomości z bugami przed wysłaniem nowych
+    await clear_previous_bug_messages(client, channel)
+
+    message_ids = []
+    for message_embeds in paginate_embeds(embeds):
+        new_message = await channel.send(embeds=to_discord_embeds(message_embeds))
+        message_ids.append(new_message.id)
+
+    set_bug_message_ids(message_ids)
+    logger.info(f"Wysłano {len(message_ids)} nowych wiadomości z bugami, ID ostatniej: {get_last_message_id()}")
+    return message_ids
+
+
+async def edit_bug_messages(channel, message_ids, embeds):
+    """
+    Aktualizuje istniejące wiadomości tablicy bugów w miejscu.
+    Embedy są grupowane w wiadomości (do 10 embedów i 6000 znaków na wiadomość);
+    brakujące wiadomości są dosyłane, a nadmiarowe usuwane. Edycja odbywa się przez PartialMessage, więc nie
+    wymaga wcześniejszego pobierania wiadomości z API.
+
+    Args:
+        channel (discord.TextChannel): Kanał bugów
+        message_ids (List[int]): ID wiadomości tablicy zapisane w stanie bota
+        embeds (List[RenderedEmbed]): Nowe wyrenderowane embedy tablicy bugów
+
+    Returns:
+        List[int]: Aktualne ID wiadomości tablicy
+
+    Raises:
+        discord.NotFound: Jeśli któraś z edytowanych wiadomości nie istnieje
+    """
+    messages = paginate_embeds(embeds)
+    new_ids = []
+    for i, message_embeds in enumerate(messages):
+        if i < len(message_ids):
+            await channel.get_partial_message(message_ids[i]).edit(embeds=to_discord_embeds(message_embeds))
+            new_ids.append(message_ids[i])
+        else:
+            new_message = await channel.send(embeds=to_discord_embeds(message_embeds))
+            new_ids.append(new_message.id)
+
+    # Usuń wiadomości, które nie są już potrzebne (tablica się skróciła)
+    for message_id in message_ids[len(messages):]:
+        try:
+            await channel.get_partial_message(message_id).delete()
+            logger.info(f"Usunięto nadmiarową wiadomość z bugami (ID: {message_id})")
+        except discord.NotFound:
+            pass
+        except Exception as delete_error:
+            logger.warning(f"Nie można usunąć nadmiarowej wiadomości {message_id}: {delete_error}")
+
+    set_bug_message_ids(new_ids)
+    return new_ids
+
+
+async def update_paginated_board(client, channel, issues, force=False):
+    """
+    Aktualizuje tablicę stronicowaną - zawsze jedną wiadomość, niezależnie od liczby bugów.
+    Wiadomość jest edytowana tylko wtedy, gdy zmieniła się wersja migawki (lub przy force=True).
+
+    Args:
+        client (discord.Client): Klient Discord
+        channel (discord.TextChannel): Kanał bugów
+        issues (List[Issue]): Bugi pobrane z Jiry
+        force (bool): Wymuś edycję wiadomości nawet bez zmian
+
+    Returns:
+        bool: True, jeśli aktualizacja się powiodła
+    """
+    previous_version = get_snapshot().version
+    with RENDER_SECONDS.time(renderer='bugs_snapshot'), span('render.bugs_snapshot', issues=len(issues)):
+        snapshot = update_snapshot(issues)
+    message_ids = get_bug_message_ids()
+
+    if message_ids and snapshot.version == previous_version and not force:
+        logger.debug(f"Tablica bugów bez zmian (wersja {snapshot.version}), pomijam edycję wiadomości")
+        return True
+
+    with RENDER_SECONDS.time(renderer='bugs_board_page'), span('render.bugs_board_page') as render:
+        embeds, view = build_board_message()
+        render.set(embeds=len(embeds), chars=sum(len(embed) for embed in embeds))
+
+    if message_ids:
+        try:
+            await channel.get_partial_message(message_ids[0]).edit(embeds=embeds, view=view)
+            logger.debug(f"Zaktualizowano tablicę stronicowaną (ID: {message_ids[0]}, wersja {snapshot.version})")
+            return True
+        except discord.NotFound:
+            logger.warning(f"Nie znaleziono wiadomości tablicy stronicowanej ({message_ids[0]}), wysyłanie nowej")
+        except Exception as e:
+            logger.error(f"Błąd podczas edycji tablicy stronicowanej: {e}")
+            logger.error(traceback.format_exc())
+
+    try:
+        await clear_previous_bug_messages(client, channel)
+        new_message = await channel.send(embeds=embeds, view=view)
+        set_bug_message_ids([new_message.id])
+        logger.info(f"Wysłano tablicę stronicowaną (ID: {new_message.id}, wersja {snapshot.version})")
+        return True
+    except Exception as e:
+        logger.error(f"Nie można wysłać tablicy stronicowanej: {e}")
+        logger.error(traceback.format_exc())
+        return False
+
+
+async def update_bugs_message(client, force=False):
     """
     Aktualizuje wiadomość z bugami na odpowiednim kanale.
 
     Args:
         client (discord.Client): Klient Discord
+        force (bool): Wymuś edycję tablicy stronicowanej nawet bez zmian w bugach
 
     Returns:
         bool: True, jeśli aktualizacja się powiodła, False w przeciwnym razie
@@ -86,58 +211,35 @@ async def update_bugs_message(client):
             return False
 
         # Pobieranie bugów
-        logger.info(f"Pobieranie bugów z Jiry dla kanału {channel.name} (ID: {channel_id})")
+        logger.debug(f"Pobieranie bugów z Jiry dla kanału {channel.name} (ID: {channel_id})")
         issues = await fetch_jira_bugs()
-        embeds = create_bugs_embeds(issues)
+        ISSUES_PROCESSED.inc(len(issues), source='bugs')
 
-        last_message_id = get_last_message_id()
+        if get_board_mode() == 'paginated':
+            success = await update_paginated_board(client, channel, issues, force=force)
+            if success:
+                set_last_run('bugs_update')
+            return success
 
-        if last_message_id:
-            # Próba pobrania i edycji istniejącej wiadomości
-            try:
-                message = await channel.fetch_message(last_message_id)
-                logger.info(f"Znaleziono istniejącą wiadomość z bugami (ID: {last_message_id})")
-
-                # Discord pozwala tylko na jeden embed na aktualizację wiadomości,
-                # więc usuwamy starą wiadomość i wysyłamy nową, jeśli mamy wiele embedów
-                if len(embeds) > 1:
-                    logger.info("Wykryto wiele embedów, usuwanie starej wiadomości i wysyłanie nowych")
-                    try:
-                        await message.delete()
-                        logger.info(f"Usunięto starą wiadomość (ID: {last_message_id})")
-                    except Exception as delete_error:
-                        logger.warning(f"Nie można usunąć starej wiadomości: {delete_error}")
-
-                    # Wysyłanie nowych wiadomości
-                    new_message_id = None
-                    for i, embed in enumerate(embeds):
-                        new_message = await channel.send(embed=embed)
-                        if i == len(embeds) - 1:  # zapisujemy ID tylko ostatniej wiadomości
-                            new_message_id = new_message.id
-
-                    set_last_message_id(new_message_id)
-                    logger.info(f"Wysłano {len(embeds)} nowych wiadomości z bugami, ID ostatniej: {new_message_id}")
-                else:
-                    # Jeśli jest tylko jeden embed, po prostu aktualizujemy wiadomość
-                    await message.edit(embed=embeds[0])
-                    logger.info(
-                        f"Zaktualizowano istniejącą wiadomość z bugami (ID: {last_message_id}) o {get_warsaw_timestamp()}")
+        # Migawka śledzi zmiany tablicy także w trybie pełnej listy (np. dla adaptacyjnego odpytywania)
+        with RENDER_SECONDS.time(renderer='bugs_board'), span('render.bugs_board', issues=len(issues)) as render:
+            update_snapshot(issues)
+            embeds = render_bugs_board(issues)
+            render.set(embeds=len(embeds), chars=sum(embed.size for embed in embeds))
 
-            except discord.NotFound:
-                logger.warning(f"Wiadomość o ID {last_message_id} nie została znaleziona, wysyłanie nowej")
+        message_ids = get_bug_message_ids()
 
-                # Wyczyść poprzednie wiadomości z bugami przed wysłaniem nowych
-                await clear_previous_bug_messages(client, channel)
-
-                # Wysyłanie nowych wiadomości
-                new_message_id = None
-                for i, embed in enumerate(embeds):
-                    new_message = await channel.send(embed=embed)
-                    if i == len(embeds) - 1:  # zapisujemy ID tylko ostatniej wiadomości
-                        new_message_id = new_message.id
+        if message_ids:
+            # Edycja istniejących wiadomości (również tych zapamiętanych przed restartem)
+            try:
+                await edit_bug_messages(channel, message_ids, embeds)
+                logger.debug(
+                    f"Zaktualizowano wiadomości z bugami ({len(embeds)} embedów, ID ostatniej: {get_last_message_id()}) "
+                    f"o {get_warsaw_timestamp()}")
 
-                set_last_message_id(new_message_id)
-                logger.info(f"Wysłano {len(embeds)} nowych wiadomości z bugami, ID ostatniej: {new_message_id}")
+            except discord.NotFound:
+                logger.warning(f"Nie znaleziono wiadomości tablicy bugów ({message_ids}), wysyłanie nowej")
+                await send_new_bug_messages(client, channel, embeds)
 
             except Exception as e:
                 logger.error(f"Nieoczekiwany błąd podczas aktualizacji wiadomości: {e}")
@@ -145,40 +247,17 @@ async def update_bugs_message(client):
                 # W przypadku błędu aktualizacji próbujemy wysłać nową wiadomość
                 try:
                     logger.info("Próba wysłania nowej wiadomości po błędzie aktualizacji")
-
-                    # Wyczyść poprzednie wiadomości z bugami przed wysłaniem nowych
-                    await clear_previous_bug_messages(client, channel)
-
-                    new_message_id = None
-                    for i, embed in enumerate(embeds):
-                        new_message = await channel.send(embed=embed)
-                        if i == len(embeds) - 1:
-                            new_message_id = new_message.id
-
-                    set_last_message_id(new_message_id)
-                    logger.info(
-                        f"Wysłano {len(embeds)} nowych wiadomości z bugami po błędzie, ID ostatniej: {new_message_id}")
+                    await send_new_bug_messages(client, channel, embeds)
                 except Exception as new_error:
                     logger.error(f"Nie można wysłać nowej wiadomości po błędzie: {new_error}")
                     logger.error(traceback.format_exc())
                     return False
         else:
-            # Brak poprzedniej wiadomości (np. po restarcie bota)
+            # Brak zapamiętanych wiadomości (pierwsze uruchomienie lub zmiana kanału)
             logger.info("Brak poprzedniej wiadomości, czyszczenie starych wiadomości z bugami")
+            await send_new_bug_messages(client, channel, embeds)
 
-            # Wyczyść poprzednie wiadomości z bugami przed wysłaniem nowych
-            await clear_previous_bug_messages(client, channel)
-
-            # Wysyłanie nowych wiadomości
-            new_message_id = None
-            for i, embed in enumerate(embeds):
-                new_message = await channel.send(embed=embed)
-                if i == len(embeds) - 1:  # zapisujemy ID tylko ostatniej wiadomości
-                    new_message_id = new_message.id
-
-            set_last_message_id(new_message_id)
-            logger.info(f"Wysłano {len(embeds)} nowych wiadomości z bugami, ID ostatniej: {new_message_id}")
-
+        set_last_run('bugs_update')
         return True
     except Exception as e:
         logger.error(f"Błąd podczas aktualizacji wiadomości z bugami: {e}")
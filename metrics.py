@@ -0,0 +1,386 @@
+# metrics.py
+"""
+Rejestr metryk bota (liczniki, wskaźniki, histogramy) w formacie tekstowym Prometheusa.
+
+Jeśli ustawiono METRICS_PORT, metryki są udostępniane lokalnie pod http://METRICS_HOST:METRICS_PORT/metrics
+(domyślnie tylko na 127.0.0.1). Bez tej zmiennej metryki są tylko zbierane (np. dla /stan i benchmarków).
+"""
+import abc
+import asyncio
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import discord
+
+from tracing import current_trace, record_span, span
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+DEFAULT_METRICS_HOST = '127.0.0.1'
+
+# Domyślne przedziały histogramów czasu (sekundy)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(abc.ABC):
+    """Wspólna część metryk: nazwa, opis, etykiety i blokada (metryki są aktualizowane także z wątków)"""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Zwraca linie z próbkami metryki"""
+
+
+class Counter(_Metric):
+    """Licznik - wartość tylko rośnie"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """Zwiększa licznik dla podanych etykiet"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Zwraca bieżącą wartość licznika"""
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    """Wskaźnik - wartość ustawiana dowolnie"""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        """Ustawia wartość wskaźnika"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Histogram - rozkład obserwowanych wartości w przedziałach (buckets) wraz z sumą i liczbą"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        """Dodaje obserwację"""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Mierzy czas wykonania bloku with"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        """Zwraca liczbę obserwacji"""
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Rejestr wszystkich metryk bota"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Zwraca (tworząc przy pierwszym użyciu) licznik o podanej nazwie"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Zwraca (tworząc przy pierwszym użyciu) wskaźnik o podanej nazwie"""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Zwraca (tworząc przy pierwszym użyciu) histogram o podanej nazwie"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Zwraca wszystkie metryki w formacie tekstowym Prometheusa"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Zmienne globalne
+_registry = MetricsRegistry()
+
+# Klasa bieżącego zapytania do Jiry - asyncio.to_thread kopiuje kontekst, więc hook odpowiedzi
+# wykonywany w wątku wie, do którego zapytania należy dana strona wyników
+_jira_query_class: contextvars.ContextVar = contextvars.ContextVar('jira_query_class', default='other')
+
+
+def get_registry() -> MetricsRegistry:
+    """Zwraca współdzielony rejestr metryk"""
+    return _registry
+
+
+# Metryki Jiry
+JIRA_REQUEST_SECONDS = _registry.histogram(
+    'jira_request_duration_seconds', 'Czas pojedynczego żądania HTTP do Jiry', ('query',))
+JIRA_CALL_SECONDS = _registry.histogram(
+    'jira_call_duration_seconds', 'Czas pełnego wywołania Jiry (wszystkie strony wyników)', ('query',))
+JIRA_RESPONSE_BYTES = _registry.counter(
+    'jira_response_bytes_total', 'Rozmiar odpowiedzi Jiry w bajtach', ('query',))
+JIRA_REQUESTS = _registry.counter(
+    'jira_requests_total', 'Liczba żądań HTTP do Jiry', ('query', 'status'))
+JIRA_RATE_LIMITED = _registry.counter(
+    'jira_rate_limited_total', 'Liczba odpowiedzi 429 z Jiry', ('query',))
+
+# Metryki Discorda
+DISCORD_REQUEST_SECONDS = _registry.histogram(
+    'discord_request_duration_seconds', 'Czas wywołania API Discorda (z oczekiwaniem na limity)', ('route',))
+DISCORD_REQUESTS = _registry.counter(
+    'discord_requests_total', 'Liczba wywołań API Discorda', ('route', 'result'))
+DISCORD_RATE_LIMITED = _registry.counter(
+    'discord_rate_limited_total', 'Liczba wywołań API Discorda zakończonych odpowiedzią 429', ('route',))
+
+# Metryki cykli pracy bota
+CYCLE_SECONDS = _registry.histogram(
+    'bot_cycle_duration_seconds', 'Czas cyklu pracy (aktualizacja bugów, raport, tablica wyników)', ('cycle',))
+RENDER_SECONDS = _registry.histogram(
+    'bot_render_duration_seconds', 'Czas renderowania embedów', ('renderer',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+ISSUES_PROCESSED = _registry.counter(
+    'bot_issues_processed_total', 'Liczba przetworzonych zadań z Jiry', ('source',))
+
+# Metryki pętli zdarzeń
+LOOP_LAG_SECONDS = _registry.histogram(
+    'event_loop_lag_seconds', 'Opóźnienie wznowienia korutyny względem planu (blokada pętli)',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_SLOW_CALLBACKS = _registry.counter(
+    'event_loop_slow_callbacks_total', 'Liczba wywołań blokujących pętlę dłużej niż LOOP_SLOW_CALLBACK_MS',
+    ('callback',))
+
+
+@contextmanager
+def jira_query(query_class: str):
+    """
+    Oznacza wywołania Jiry w bloku with klasą zapytania (etykieta metryk) i mierzy ich łączny czas.
+
+    Args:
+        query_class (str): Klasa zapytania, np. 'bugs', 'completed_tasks', 'leaderboard', 'counters_sync'
+    """
+    token = _jira_query_class.set(query_class)
+    start = time.perf_counter()
+    try:
+        with span(f"jira.{query_class}"):
+            yield
+    finally:
+        JIRA_CALL_SECONDS.observe(time.perf_counter() - start, query=query_class)
+        _jira_query_class.reset(token)
+
+
+def _record_jira_response(response, *args, **kwargs):
+    """Hook sesji requests klienta Jira - rejestruje czas, rozmiar i status każdej odpowiedzi"""
+    try:
+        query_class = _jira_query_class.get()
+        JIRA_REQUESTS.inc(query=query_class, status=str(response.status_code))
+        JIRA_REQUEST_SECONDS.observe(response.elapsed.total_seconds(), query=query_class)
+        size = response.headers.get('Content-Length')
+        size = int(size) if size else len(response.content)
+        JIRA_RESPONSE_BYTES.inc(size, query=query_class)
+        if response.status_code == 429:
+            JIRA_RATE_LIMITED.inc(query=query_class)
+        # Każda strona wyników to osobne żądanie - osobny etap w śladzie cyklu
+        record_span('jira.page', response.elapsed.total_seconds(), query=query_class,
+                    status=response.status_code, bytes=size)
+    except Exception as e:
+        logger.debug(f"Nie udało się zarejestrować metryk odpowiedzi Jiry: {e}")
+    return response
+
+
+def instrument_jira_client(jira):
+    """
+    Dodaje do sesji HTTP klienta Jira hook zbierający metryki.
+
+    Args:
+        jira (JIRA): Klient Jira
+    """
+    session = getattr(jira, '_session', None)
+    if session is not None and _record_jira_response not in session.hooks['response']:
+        session.hooks['response'].append(_record_jira_response)
+    return jira
+
+
+# Nazwy etapów śladu dla metod HTTP API Discorda
+_DISCORD_OPERATIONS = {'POST': 'send', 'PATCH': 'edit', 'DELETE': 'delete', 'GET': 'fetch', 'PUT': 'put'}
+
+
+def instrument_discord_client(client):
+    """
+    Opakowuje HTTPClient klienta Discord tak, aby każde wywołanie API było mierzone
+    (etykietą jest szablon ścieżki, np. PATCH /channels/{channel_id}/messages/{message_id}).
+
+    Args:
+        client (discord.Client): Klient Discord
+    """
+    http = client.http
+    if getattr(http, '_metrics_instrumented', False):
+        return
+    original_request = http.request
+
+    async def request(route, *args, **kwargs):
+        label = f"{route.method} {route.path}"
+        start = time.perf_counter()
+        result = 'ok'
+        try:
+            with span(f"discord.{_DISCORD_OPERATIONS.get(route.method, 'request')}", route=label) as call:
+                if 'json' in kwargs and current_trace() is not None:
+                    call.set(bytes=len(json.dumps(kwargs['json'])))
+                return await original_request(route, *args, **kwargs)
+        except Exception as e:
+            result = str(getattr(e, 'status', type(e).__name__))
+            if isinstance(e, discord.RateLimited) or getattr(e, 'status', None) == 429:
+                DISCORD_RATE_LIMITED.inc(route=label)
+            raise
+        finally:
+            DISCORD_REQUEST_SECONDS.observe(time.perf_counter() - start, route=label)
+            DISCORD_REQUESTS.inc(route=label, result=result)
+
+    http.request = request
+    http._metrics_instrumented = True
+
+
+async def _handle_metrics_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Obsługuje pojedyncze żądanie HTTP do serwera metryk"""
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Nagłówki żądania nie są potrzebne - wystarczy je odczytać do pustej linii
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b'\r\n', b'\n', b''):
+            pass
+        parts = request_line.decode('latin-1').split()
+        if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+            body = _registry.render().encode('utf-8')
+            status, content_type = "200 OK", "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = b"Not Found\n"
+            status, content_type = "404 Not Found", "text/plain; charset=utf-8"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+    except Exception as e:
+        logger.debug(f"Błąd podczas obsługi żądania metryk: {e}")
+    finally:
+        writer.close()
+
+
+def get_metrics_port() -> Optional[int]:
+    """Zwraca port serwera metryk (METRICS_PORT) lub None, jeśli serwer jest wyłączony"""
+    port = os.getenv('METRICS_PORT', '')
+    return int(port) if port.strip() else None
+
+
+async def serve_metrics(port: Optional[int] = None, host: Optional[str] = None):
+    """
+    Udostępnia metryki pod http://host:port/metrics (do uruchomienia przez supervisor).
+
+    Args:
+        port (int, optional): Port serwera (domyślnie z METRICS_PORT; bez niego serwer nie jest uruchamiany)
+        host (str, optional): Adres nasłuchiwania (domyślnie z METRICS_HOST, a bez niego tylko lokalnie)
+    """
+    if port is None:
+        port = get_metrics_port()
+    if port is None:
+        logger.info("Serwer metryk wyłączony (brak METRICS_PORT)")
+        return
+    if host is None:
+        host = os.getenv('METRICS_HOST', DEFAULT_METRICS_HOST)
+    try:
+        server = await asyncio.start_server(_handle_metrics_request, host, port)
+    except OSError as e:
+        logger.error(f"Nie można uruchomić serwera metryk na {host}:{port}: {e}")
+        logger.error(traceback.format_exc())
+        raise
+    logger.info(f"Metryki dostępne pod http://{host}:{port}/metrics")
+    async with server:
+        await server.serve_forever()
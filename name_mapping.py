@@ -0,0 +1,143 @@
+# name_mapping.py
+import logging
+import os
+import threading
+import time
+import traceback
+import unicodedata
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from tracing import accumulate, current_trace
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Litery, których NFKD nie rozkłada na literę bazową i znak diakrytyczny
+_EXTRA_FOLDS = str.maketrans({'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D', 'ø': 'o', 'Ø': 'O'})
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizuje nazwę do porównań: bez wielkości liter, znaków diakrytycznych
+    i nadmiarowych spacji ("Łukasz  Żółć" -> "lukasz zolc").
+
+    Args:
+        name (str): Nazwa do znormalizowania
+
+    Returns:
+        str: Znormalizowana nazwa
+    """
+    decomposed = unicodedata.normalize('NFKD', name.translate(_EXTRA_FOLDS))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+class NameMappingIndex:
+    """
+    Indeks mapowania pełnych nazw (i accountId z Jiry) na skrócone imiona.
+    Budowany raz z zawartości zmiennych NAME_MAPPING i NAME_MAPPING_ACCOUNTS; same mapowania
+    są tylko do odczytu, a zmienia się jedynie pamięć wyników dopasowań po nazwie znormalizowanej
+    (nazwy z Jiry nie są znane z góry). Zmiana konfiguracji oznacza zbudowanie nowego indeksu.
+    """
+
+    def __init__(self, name_source: str = "", account_source: str = ""):
+        self.source = (name_source, account_source)
+
+        by_name = {}
+        for pair in name_source.split(';'):
+            if ':' in pair:
+                full_name, short_name = pair.split(':', 1)
+                if full_name.strip():
+                    by_name[full_name.strip()] = short_name.strip()
+
+        # accountId w Jira Cloud może zawierać ':', dlatego tu separatorem jest '='
+        by_account_id = {}
+        for pair in account_source.split(';'):
+            if '=' in pair:
+                account_id, short_name = pair.split('=', 1)
+                if account_id.strip():
+                    by_account_id[account_id.strip()] = short_name.strip()
+
+        by_normalized = {normalize_name(full_name): (full_name, short_name) for full_name, short_name in by_name.items()}
+
+        self.by_name: Mapping[str, str] = MappingProxyType(by_name)
+        self.by_account_id: Mapping[str, str] = MappingProxyType(by_account_id)
+        self._by_normalized: Mapping[str, Tuple[str, str]] = MappingProxyType(by_normalized)
+
+        # Wyniki dopasowań po nazwie znormalizowanej (te same osoby powtarzają się w każdym zadaniu)
+        self._normalized_cache: Dict[str, Optional[str]] = {}
+
+    def __len__(self):
+        return len(self.by_name) + len(self.by_account_id)
+
+    def resolve(self, full_name: Optional[str], account_id: Optional[str] = None) -> Optional[str]:
+        """
+        Zwraca skrócone imię dla użytkownika lub None, jeśli nie ma mapowania.
+        Kolejność dopasowania: accountId, dokładna nazwa, nazwa znormalizowana.
+
+        Args:
+            full_name (str): Pełna nazwa użytkownika (displayName)
+            account_id (str, optional): accountId użytkownika w Jira
+
+        Returns:
+            str: Skrócone imię lub None
+        """
+        if current_trace() is None:
+            return self._resolve(full_name, account_id)
+        # W śladzie cyklu mapowanie imion jest jednym zbiorczym etapem (czas i liczba wywołań)
+        start = time.perf_counter()
+        try:
+            return self._resolve(full_name, account_id)
+        finally:
+            accumulate('name_mapping', time.perf_counter() - start)
+
+    def _resolve(self, full_name: Optional[str], account_id: Optional[str]) -> Optional[str]:
+        if account_id and account_id in self.by_account_id:
+            return self.by_account_id[account_id]
+        if not full_name:
+            return None
+        short_name = self.by_name.get(full_name)
+        if short_name is not None:
+            return short_name
+        if full_name not in self._normalized_cache:
+            match = self._by_normalized.get(normalize_name(full_name))
+            self._normalized_cache[full_name] = match[1] if match else None
+        return self._normalized_cache[full_name]
+
+    def display_name(self, full_name: str, account_id: Optional[str] = None) -> str:
+        """Zwraca skrócone imię lub oryginalną nazwę, jeśli nie ma mapowania"""
+        short_name = self.resolve(full_name, account_id)
+        return short_name if short_name is not None else full_name
+
+
+# Zmienne globalne
+_index = NameMappingIndex()
+_lock = threading.Lock()
+
+
+def get_name_mapping_index() -> NameMappingIndex:
+    """
+    Zwraca indeks mapowania imion. Indeks jest przebudowywany tylko wtedy,
+    gdy zmieniła się zawartość NAME_MAPPING lub NAME_MAPPING_ACCOUNTS,
+    więc wywołanie dla każdego buga kosztuje jedynie dwa odczyty os.environ.
+
+    Returns:
+        NameMappingIndex: Aktualny indeks
+    """
+    global _index
+    source = (os.environ.get('NAME_MAPPING', ''), os.environ.get('NAME_MAPPING_ACCOUNTS', ''))
+    index = _index
+    if index.source == source:
+        return index
+
+    with _lock:
+        if _index.source != source:
+            try:
+                _index = NameMappingIndex(*source)
+                logger.info(f"Wczytano {len(_index.by_name)} mapowań imion i {len(_index.by_account_id)} mapowań accountId")
+                for full_name, short_name in _index.by_name.items():
+                    logger.debug(f"Mapowanie imienia: {full_name} -> {short_name}")
+            except Exception as e:
+                logger.error(f"Błąd podczas wczytywania mapowania imion: {e}")
+                logger.error(traceback.format_exc())
+        return _index
@@ -0,0 +1,169 @@
+# polling.py
+import datetime
+import logging
+import os
+from typing import Optional, Set, Tuple
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Zmiana interwału po odpytaniu ze zmianami (skrócenie) i bez zmian (wydłużenie)
+SHRINK_FACTOR = 0.5
+GROW_FACTOR = 1.5
+
+
+def parse_working_hours(value: str) -> Optional[Tuple[datetime.time, datetime.time]]:
+    """
+    Parsuje zakres godzin pracy w formacie "HH:MM-HH:MM" (lub "H-H").
+
+    Args:
+        value (str): Zakres godzin
+
+    Returns:
+        Tuple[datetime.time, datetime.time]: Początek i koniec lub None, jeśli kalendarz jest wyłączony
+    """
+    if not value.strip():
+        return None
+    try:
+        start, end = (part.strip() for part in value.split('-'))
+        times = []
+        for part in (start, end):
+            hour, _, minute = part.partition(':')
+            times.append(datetime.time(int(hour), int(minute or 0)))
+        return times[0], times[1]
+    except ValueError:
+        logger.warning(f"Nieprawidłowy format BUGS_WORKING_HOURS: {value}, kalendarz godzin pracy wyłączony")
+        return None
+
+
+def parse_working_days(value: str) -> Set[int]:
+    """
+    Parsuje dni pracy, np. "0-4" lub "0,1,2,3,4" (0 = poniedziałek).
+
+    Args:
+        value (str): Lista lub zakres dni tygodnia
+
+    Returns:
+        Set[int]: Numery dni pracy
+    """
+    days = set()
+    try:
+        for part in value.split(','):
+            first, _, last = part.strip().partition('-')
+            days.update(range(int(first), int(last or first) + 1))
+    except ValueError:
+        logger.warning(f"Nieprawidłowy format BUGS_WORKING_DAYS: {value}, używam pon-pt")
+        return set(range(5))
+    return {day for day in days if 0 <= day <= 6}
+
+
+class AdaptivePoller:
+    """
+    Wyznacza interwał odpytywania Jiry o bugi.
+
+    Po odpytaniu, które zmieniło tablicę (nowa wersja migawki), interwał jest skracany,
+    a po odpytaniach bez zmian stopniowo wydłużany aż do limitu. Poza godzinami pracy
+    używany jest dłuższy interwał, ale nie dłuższy niż czas do początku godzin pracy.
+    """
+
+    def __init__(self, min_interval: int, max_interval: int,
+                 working_hours: Optional[Tuple[datetime.time, datetime.time]] = None,
+                 working_days: Optional[Set[int]] = None, off_hours_interval: int = 3600):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.working_hours = working_hours
+        self.working_days = working_days if working_days is not None else set(range(5))
+        self.off_hours_interval = off_hours_interval
+        self.interval: Optional[float] = None
+        self.last_changed = False
+
+    def reset(self, interval: int):
+        """Ustawia interwał początkowy (np. po zmianie UPDATE_INTERVAL komendą)"""
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+
+    def observe(self, changed: bool):
+        """
+        Uwzględnia wynik odpytania.
+
+        Args:
+            changed (bool): Czy odpytanie zmieniło tablicę bugów
+        """
+        if self.interval is None:
+            self.interval = self.max_interval
+        factor = SHRINK_FACTOR if changed else GROW_FACTOR
+        self.interval = min(max(self.interval * factor, self.min_interval), self.max_interval)
+        self.last_changed = changed
+
+    def is_working_time(self, now: datetime.datetime) -> bool:
+        """Sprawdza, czy `now` (czas lokalny) wypada w godzinach pracy"""
+        if self.working_hours is None:
+            return True
+        start, end = self.working_hours
+        return now.weekday() in self.working_days and start <= now.time() < end
+
+    def _seconds_to_working_time(self, now: datetime.datetime) -> Optional[float]:
+        """Zwraca liczbę sekund do najbliższego początku godzin pracy"""
+        start = self.working_hours[0]
+        for days_ahead in range(8):
+            day = now.date() + datetime.timedelta(days=days_ahead)
+            if day.weekday() not in self.working_days:
+                continue
+            naive = datetime.datetime.combine(day, start)
+            tz = now.tzinfo
+            candidate = tz.localize(naive) if hasattr(tz, 'localize') else naive.replace(tzinfo=tz)
+            if candidate > now:
+                return (candidate - now).total_seconds()
+        return None
+
+    def next_interval(self, now: datetime.datetime, base_interval: int) -> int:
+        """
+        Zwraca interwał do następnego odpytania.
+
+        Args:
+            now (datetime.datetime): Aktualny czas w strefie harmonogramu
+            base_interval (int): Skonfigurowany UPDATE_INTERVAL (interwał startowy)
+
+        Returns:
+            int: Interwał w sekundach
+        """
+        if self.interval is None:
+            self.reset(base_interval)
+        if self.is_working_time(now):
+            return int(self.interval)
+
+        interval = max(self.interval, self.off_hours_interval)
+        until_work = self._seconds_to_working_time(now)
+        if until_work is not None:
+            # Pierwsze odpytanie w godzinach pracy zaraz po ich rozpoczęciu
+            interval = min(interval, max(until_work, self.min_interval))
+        return int(interval)
+
+
+# Zmienne globalne
+_poller: Optional[AdaptivePoller] = None
+
+
+def is_adaptive_polling() -> bool:
+    """
+    Sprawdza, czy włączono adaptacyjne odpytywanie o bugi (BUGS_POLL_MODE: 'fixed' - stały
+    UPDATE_INTERVAL, 'adaptive' - interwał zależny od zmian).
+    """
+    return os.getenv('BUGS_POLL_MODE', 'fixed').lower() == 'adaptive'
+
+
+def get_bug_poller() -> AdaptivePoller:
+    """
+    Zwraca współdzielony stan adaptacyjnego odpytywania o bugi. Przy pierwszym użyciu ustawienia
+    są czytane ze zmiennych środowiskowych:
+    - BUGS_POLL_MIN_INTERVAL, BUGS_POLL_MAX_INTERVAL - granice interwału w sekundach (domyślnie 60 i 1800)
+    - BUGS_WORKING_HOURS, BUGS_WORKING_DAYS - godziny i dni pracy w strefie TIMEZONE, np. "8:00-18:00"
+      i "0-4" (pon-pt); puste godziny = bez kalendarza
+    - BUGS_OFF_HOURS_INTERVAL - interwał poza godzinami pracy w sekundach (domyślnie 3600)
+    """
+    global _poller
+    if _poller is None:
+        _poller = AdaptivePoller(int(os.getenv('BUGS_POLL_MIN_INTERVAL', '60')),
+                                 int(os.getenv('BUGS_POLL_MAX_INTERVAL', '1800')),
+                                 parse_working_hours(os.getenv('BUGS_WORKING_HOURS', '')),
+                                 parse_working_days(os.getenv('BUGS_WORKING_DAYS', '0-4')),
+                                 int(os.getenv('BUGS_OFF_HOURS_INTERVAL', '3600')))
+    return _poller
@@ -0,0 +1,120 @@
+# render_model.py
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Kolory embedów (wartości odpowiadające discord.Color)
+COLOR_RED = 0xE74C3C
+COLOR_ORANGE = 0xE67E22
+COLOR_BLUE = 0x3498DB
+COLOR_JIRA_BLUE = 0x0052CC
+COLOR_GREEN = 0x2ECC71
+COLOR_YELLOW = 0xFEE75C
+
+
+@dataclass(frozen=True)
+class RenderedField:
+    """Pole embeda w postaci czystych danych"""
+    name: str
+    value: str
+    inline: bool = False
+
+    @property
+    def size(self) -> int:
+        """Liczba znaków liczona do limitów Discord"""
+        return len(self.name) + len(self.value)
+
+
+@dataclass(frozen=True)
+class RenderedEmbed:
+    """
+    Wyrenderowany embed niezależny od discord.py. Można go zapamiętać, zapisać jako JSON,
+    porównać (content_hash) i dopiero przy wysyłce zamienić na discord.Embed (to_discord_embed).
+    """
+    title: str
+    description: str = ""
+    color: Optional[int] = None
+    fields: Tuple[RenderedField, ...] = ()
+    footer: str = ""
+    size: int = field(default=-1, compare=False)
+
+    def __post_init__(self):
+        if self.size < 0:
+            size = len(self.title) + len(self.description) + len(self.footer)
+            size += sum(f.size for f in self.fields)
+            object.__setattr__(self, 'size', size)
+
+    @property
+    def content_hash(self) -> str:
+        """Skrót treści embeda - identyczna treść daje identyczny skrót"""
+        payload = json.dumps(self.to_dict(), ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def with_footer(self, footer: str) -> "RenderedEmbed":
+        """Zwraca kopię embeda z nową stopką"""
+        return RenderedEmbed(self.title, self.description, self.color, self.fields, footer)
+
+    def to_dict(self) -> Dict:
+        """Zwraca embed jako słownik gotowy do serializacji"""
+        return {
+            "title": self.title,
+            "description": self.description,
+            "color": self.color,
+            "fields": [{"name": f.name, "value": f.value, "inline": f.inline} for f in self.fields],
+            "footer": self.footer,
+            "size": self.size,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RenderedEmbed":
+        """Odtwarza embed ze słownika utworzonego przez to_dict"""
+        return cls(
+            title=data.get("title", ""),
+            description=data.get("description", ""),
+            color=data.get("color"),
+            fields=tuple(RenderedField(f["name"], f["value"], f.get("inline", False)) for f in data.get("fields", [])),
+            footer=data.get("footer", ""),
+        )
+
+
+def board_hash(embeds: Sequence[RenderedEmbed]) -> str:
+    """
+    Zwraca skrót treści całej listy embedów (np. tablicy bugów).
+
+    Args:
+        embeds (Sequence[RenderedEmbed]): Wyrenderowane embedy
+
+    Returns:
+        str: Skrót SHA-1 w postaci szesnastkowej
+    """
+    digest = hashlib.sha1()
+    for embed in embeds:
+        digest.update(embed.content_hash.encode('ascii'))
+    return digest.hexdigest()
+
+
+def to_discord_embed(rendered: RenderedEmbed):
+    """
+    Zamienia wyrenderowany embed na discord.Embed. discord.py jest importowany
+    dopiero tutaj, więc warstwa renderowania działa bez niego.
+
+    Args:
+        rendered (RenderedEmbed): Wyrenderowany embed
+
+    Returns:
+        discord.Embed: Embed gotowy do wysłania
+    """
+    import discord
+
+    embed = discord.Embed(title=rendered.title, description=rendered.description or None, color=rendered.color)
+    for f in rendered.fields:
+        embed.add_field(name=f.name, value=f.value, inline=f.inline)
+    if rendered.footer:
+        embed.set_footer(text=rendered.footer)
+    return embed
+
+
+def to_discord_embeds(rendered: Sequence[RenderedEmbed]) -> List:
+    """Zamienia listę wyrenderowanych embedów na listę discord.Embed"""
+    return [to_discord_embed(r) for r in rendered]
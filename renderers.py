@@ -0,0 +1,578 @@
+# renderers.py
+import datetime
+import logging
+import os
+import traceback
+from typing import Dict, List, Optional
+
+import pytz
+from jira.resources import Issue
+
+from embed_layout import EmbedLayout, section_fields
+from name_mapping import get_name_mapping_index
+from render_model import (
+    RenderedEmbed, RenderedField, COLOR_RED, COLOR_ORANGE, COLOR_BLUE, COLOR_JIRA_BLUE, COLOR_GREEN, COLOR_YELLOW
+)
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+
+def _get_display_name(full_name: str, account_id: Optional[str] = None) -> str:
+    """
+    Konwertuje pełną nazwę użytkownika na nazwę wyświetlaną, używając mapowania z .env.
+    Dopasowanie nie uwzględnia wielkości liter ani znaków diakrytycznych.
+
+    Args:
+        full_name (str): Pełna nazwa użytkownika
+        account_id (str, optional): accountId użytkownika w Jira (NAME_MAPPING_ACCOUNTS)
+
+    Returns:
+        str: Nazwa wyświetlana (skrócona lub oryginalna jeśli nie ma mapowania)
+    """
+    return get_name_mapping_index().display_name(full_name, account_id)
+
+
+def format_bug_entry(bug: Issue) -> str:
+    """
+    Formatuje pojedynczy wpis buga na tablicy.
+
+    Args:
+        bug (Issue): Bug z Jiry
+
+    Returns:
+        str: Wpis zakończony znakiem nowej linii
+    """
+    if hasattr(bug.fields, 'assignee') and bug.fields.assignee:
+        assignee = _get_display_name(bug.fields.assignee.displayName, getattr(bug.fields.assignee, 'accountId', None))
+        return f"• **{bug.key}** - {bug.fields.summary} (_Przypisany: {assignee}_)\n"
+    return f"• **{bug.key}** - {bug.fields.summary} (_Nieprzypisany_)\n"
+
+
+def render_error(title: str, description: str) -> RenderedEmbed:
+    """
+    Renderuje embed z informacją o błędzie.
+
+    Args:
+        title (str): Tytuł embeda (bez ikony)
+        description (str): Opis błędu
+
+    Returns:
+        RenderedEmbed: Wyrenderowany embed błędu
+    """
+    return RenderedEmbed(title=f"⚠️ {title}", description=description, color=COLOR_ORANGE)
+
+
+def render_bugs_board(issues: List[Issue]) -> List[RenderedEmbed]:
+    """
+    Renderuje tablicę bugów do postaci czystych danych.
+
+    Args:
+        issues (List[Issue]): Lista bugów z Jiry
+
+    Returns:
+        List[RenderedEmbed]: Wyrenderowane embedy tablicy
+    """
+    try:
+        # Aktualny timestamp dla wszystkich embedów w strefie czasowej Warszawy
+        timezone = pytz.timezone('Europe/Warsaw')
+        now = datetime.datetime.now(timezone)
+        timestamp = now.strftime('%d.%m.%Y %H:%M:%S')
+
+        if not issues:
+            return [RenderedEmbed(
+                title="Aktualna lista bugów",
+                description=f"Ostatnia aktualizacja: {timestamp}",
+                color=COLOR_RED,
+                fields=(RenderedField("Brak bugów", "Nie znaleziono żadnych bugów spełniających kryteria."),)
+            )]
+
+        # Grupowanie bugów według statusu
+        status_groups = {}
+        for issue in issues:
+            try:
+                status = issue.fields.status.name
+                if status not in status_groups:
+                    status_groups[status] = []
+                status_groups[status].append(issue)
+            except AttributeError as ae:
+                logger.warning(
+                    f"Pominięto buga z powodu braku atrybutu: {ae} (Issue key: {issue.key if hasattr(issue, 'key') else 'unknown'})")
+                continue
+
+        # Układ embedów liczony przyrostowo - bez ponownego mierzenia całego embeda przy każdym polu
+        layout = EmbedLayout(
+            title="Aktualna lista bugów",
+            continuation_title="Aktualna lista bugów (kontynuacja)",
+            description=f"Ostatnia aktualizacja: {timestamp}",
+            footer="Aby odświeżyć ręcznie użyj /refresh | Wielki Inkwizytor Filipa",
+            color=COLOR_RED
+        )
+
+        # Dla każdego statusu dodaj bugi jako sekcję (dzieloną na pola po 1024 znaki)
+        for status, bugs in status_groups.items():
+            bug_entries = []
+
+            # Przygotuj wpisy dla wszystkich bugów w danym statusie
+            for bug in bugs:
+                try:
+                    bug_entries.append(format_bug_entry(bug))
+                except Exception as bug_error:
+                    logger.error(
+                        f"Błąd podczas przetwarzania buga {bug.key if hasattr(bug, 'key') else 'unknown'}: {bug_error}")
+                    continue
+
+            layout.add_section(status, bug_entries)
+
+        embeds = layout.finish()
+        logger.debug(f"Utworzono {len(embeds)} embedów z bugami")
+        return embeds
+
+    except Exception as e:
+        logger.error(f"Błąd podczas tworzenia embedów z bugami: {e}")
+        logger.error(traceback.format_exc())
+        # Zwróć podstawowy embed z informacją o błędzie
+        return [RenderedEmbed(
+            title="Błąd podczas pobierania bugów",
+            description=f"Wystąpił błąd podczas generowania listy bugów: {str(e)}",
+            color=COLOR_ORANGE
+        )]
+
+
+def render_completed_tasks_report(tasks: List[Issue], start_time: datetime.datetime, end_time: datetime.datetime,
+                                  jira_server: str) -> RenderedEmbed:
+    """
+    Renderuje raport ukończonych zadań do postaci czystych danych.
+
+    Args:
+        tasks (List[Issue]): Lista ukończonych zadań
+        start_time (datetime.datetime): Czas początkowy raportu
+        end_time (datetime.datetime): Czas końcowy raportu
+        jira_server (str): URL serwera Jira
+
+    Returns:
+        RenderedEmbed: Wyrenderowany raport
+    """
+    try:
+        title = "📊 Raport ukończonych zadań"
+        description = f"Okres: {start_time.strftime('%d.%m.%Y %H:%M')} - {end_time.strftime('%d.%m.%Y %H:%M')}"
+        fields = []
+
+        if not tasks:
+            fields.append(RenderedField("Brak zadań", "Nie znaleziono żadnych ukończonych zadań w tym okresie."))
+            return RenderedEmbed(title, description, COLOR_JIRA_BLUE, tuple(fields))
+
+        # Przetwarzanie zadań według użytkowników
+        tasks_by_user = {}
+        for task in tasks:
+            try:
+                assignee = task.fields.assignee
+                if assignee:
+                    display_name = _get_display_name(assignee.displayName, getattr(assignee, 'accountId', None))
+
+                    if display_name not in tasks_by_user:
+                        tasks_by_user[display_name] = {"count": 0, "tasks": []}
+
+                    tasks_by_user[display_name]["count"] += 1
+                    task_link = f"[{task.key}]({jira_server}/browse/{task.key})"
+                    tasks_by_user[display_name]["tasks"].append(task_link)
+            except Exception as task_error:
+                logger.error(
+                    f"Błąd podczas przetwarzania zadania {task.key if hasattr(task, 'key') else 'unknown'}: {task_error}")
+                continue
+
+        # Dodawanie pól dla każdego użytkownika
+        for user, data in tasks_by_user.items():
+            # Limit długości pola Discord to 1024 znaki
+            task_data = ", ".join(data["tasks"])
+            # Jeśli lista zadań jest zbyt długa, dzielimy ją na części
+            if len(task_data) > 1000:
+                # Podziel listę zadań na części, które zmieszczą się w polu
+                user_field_count = 1
+                for i in range(0, len(data["tasks"]), 10):  # Po 10 zadań na pole
+                    chunk = ", ".join(data["tasks"][i:i + 10])
+                    field_name = f"{user} (część {user_field_count})" if len(data["tasks"]) > 10 else user
+                    fields.append(RenderedField(field_name, f"{len(data['tasks'][i:i + 10])} zadań: {chunk}"))
+                    user_field_count += 1
+            else:
+                # Jeśli lista zadań zmieści się w jednym polu
+                fields.append(RenderedField(user, f"{data['count']} zadań: {task_data}"))
+
+        # Dodawanie informacji o łącznej liczbie zadań
+        fields.append(RenderedField(
+            f"Łączna liczba ukończonych zadań: {len(tasks)}",
+            "\u200b"  # Niewidoczny znak, by pole miało treść
+        ))
+
+        return RenderedEmbed(title, description, COLOR_JIRA_BLUE, tuple(fields))
+    except Exception as e:
+        logger.error(f"Błąd podczas tworzenia raportu z zadaniami: {e}")
+        logger.error(traceback.format_exc())
+        return render_error("Błąd raportu", f"Wystąpił błąd podczas generowania raportu: {str(e)}")
+
+
+def get_roast_for_inactive_member(name: str) -> str:
+    """
+    Zwraca humorystyczny "roast" dla nieaktywnego członka zespołu.
+
+    Args:
+        name (str): Imię członka zespołu
+
+    Returns:
+        str: Humorystyczny tekst
+    """
+    roasts = [
+        f"{name} - widziani ostatnio: nigdy. Może są na wakacjach... które trwają cały rok?",
+        f"{name} wykonał tyle zadań, ile jest jednorożców na świecie.",
+        f"{name} - legenda głosi, że kiedyś coś zrobił, ale nikt tego nie widział.",
+        f"{name} osiągnął idealne zero. Brawo za konsekwencję!",
+        f"{name} ma ciekawą strategię: \"nie można zrobić błędu w zadaniu, jeśli się go nie podejmie\".",
+        f"{name} prawdopodobnie myśli, że Jira to gatunek kawy.",
+        f"{name} - ekspert od delegowania zadań... sobie samemu w przyszłości.",
+        f"{name} traktuje deadline'y jak wskazówki, a nie zobowiązania.",
+        f"{name} - mistrz prokrastynacji roku!",
+        f"{name} ma tyle samo zadań co smutny Excel bez danych.",
+        f"{name} występuje w projekcie na takiej samej zasadzie jak John Cena - nikt go nie widzi.",
+        f"{name} to ekspert w sztuce niedotrzymywania terminów.",
+        f"{name} pobiera pensję za mistrzowskie udawanie, że pracuje.",
+        f"{name} podobno wciąż poszukuje przycisku \"Start\" w Jirze.",
+        f"{name} ma na koncie więcej wymówek niż zadań.",
+        f"{name} - dział HR wciąż sprawdza, czy faktycznie istnieje.",
+        f"{name} traktuje zadania jak UFO - wierzy, że istnieją, ale nigdy ich nie widział.",
+        f"{name} myśli, że \"sprint\" to konkurencja lekkoatletyczna, a nie termin na zadania.",
+        f"{name} będzie dostępny kiedy skończy oglądać \"jeszcze jeden odcinek\".",
+        f"{name} osiągnął stan nirwany produkcyjnej - pełna pustka.",
+        f"{name} - status projektów: dane wrażliwe, nikt nie może ich zobaczyć.",
+        f"{name} - według naukowców, jego produktywność jest mniejsza niż u kamienia.",
+        f"{name} - gdyby lenistwo było olimpijską dyscypliną, miałby złoty medal.",
+        f"{name} spędza więcej czasu na pisaniu wymówek niż na faktycznej pracy.",
+        f"{name} myśli, że \"deadline\" to nazwa nowego filmu akcji.",
+        f"{name} - nawet Bot spędza więcej czasu przy komputerze.",
+        f"{name} jest jak WiFi w tunelu - straciliśmy połączenie.",
+        f"{name} - Wielki Inkwizytor Filipa wysyła mu już trzecie wezwanie do pracy.",
+        f"{name} używa projektu jak statusu na LinkedIn - jest tam, ale nic nie robi.",
+        f"{name} uważa, że \"backlog\" to nowa restauracja w mieście.",
+        f"{name} myśli, że \"pull request\" to prośba o wyciągnięcie go z łóżka.",
+        f"{name} - jedyne co ciągnie, to wagary od projektu.",
+        f"{name} mógłby wystąpić w \"Gdzie jest Waldo?\" projektu.",
+        f"{name} jest jak yeti projektu - wszyscy o nim słyszeli, ale nikt go nie widział.",
+        f"{name} ma więcej nieukończonych zadań niż Tolkien niedokończonych historii.",
+        f"{name} - uśpiony agent, wciąż czeka na kod aktywacyjny.",
+        f"{name} uczestniczy w projekcie jak duch - wszyscy wiedzą, że gdzieś jest, ale nikt go nie widzi.",
+        f"{name} wnosi do zespołu tyle samo, co pusty kubek do kolekcji kawy.",
+        f"{name} ma więcej wykrętów niż szwajcarski scyzoryk funkcji.",
+        f"{name} - jego ulubiony film to \"Zniknięcie\" a ulubiona piosenka \"Sound of Silence\".",
+        f"{name} to jedyna osoba, która traktuje pracę jak starą znajomą - odwiedza ją raz na rok.",
+        f"{name} - odkrył sposób na pracę bez pracy. Naukowcy są zaskoczeni!",
+        f"{name} myśli, że GitHub to serwis społecznościowy dla kotów.",
+        f"{name} - gdyby prokrastynacja była walutą, byłby miliarderem.",
+        f"{name} nie wierzy w żadną religię, ale święcie wierzy, że zadania rozwiążą się same.",
+        f"{name} podchodzi do terminów jak pirat do kodeksu - traktuje je bardziej jak wytyczne.",
+        f"{name} ma na koncie mniej commitów niż przeciętny kamień.",
+        f"{name} używa \"zajęty\" jako statusu permanentnego, mimo braku dowodów na to zajęcie.",
+        f"{name} - nawet BOT ma wyższy wskaźnik aktywności.",
+        f"{name} pomaga projektowi przez niezabieranie czasu innym.",
+        f"{name} myśli, że \"klient\" to postać z bajki, a \"deadline\" to miejsce, gdzie umierają marzenia.",
+        f"{name} istnieje w projekcie na zasadzie placebo - niby jest, ale efektów brak.",
+        f"{name} uważa commita za rodzaj zobowiązania którego powinien unikać.",
+        f"{name} przeżywa obecnie najdłuższy urlop w historii korporacji.",
+        f"{name} pojawia się w projekcie rzadziej niż zaćmienie słońca.",
+        f"{name} - w konkurencji na najrzadziej widzianego członka zespołu, zajmuje pierwsze miejsce.",
+        f"{name} ma tyle samo ukończonych zadań co pingwin lotów transatlantyckich.",
+        f"{name} myśli, że \"dokumentacja\" to nowy horror na Netflixie.",
+        f"{name} został oficjalnie dodany do słownika jako synonim słowa \"nieobecny\".",
+        f"{name} - jedyne, co push'uje, to przycisk \"snooze\" w budziku.",
+        f"{name} jest jak ofiara w horrorze - wszyscy wiedzą, że nie przetrwa do końca projektu.",
+        f"{name} ma najczystszą historię commitów - idealnie pustą.",
+        f"{name} - jego wkład w projekt jest jak wkład homeopatyczny - teoretycznie istnieje.",
+        f"{name} przechodzi przez całe życie używając jednego wymówienia: \"Zaraz do tego wrócę\".",
+        f"{name} to mistrz w znajdowaniu wymówek, dlaczego nie może wykonać zadania.",
+        f"{name} buduje swoje portfolio składające się głównie z pustych obietnic.",
+        f"{name} jest tak zajęty \"planowaniem pracy\", że nie ma czasu na jej wykonanie.",
+        f"{name} traktuje zadania jak dobre chęci - ma je, ale nic z nimi nie robi.",
+        f"{name} - specjalista od deadlinów... pośmiertnych.",
+        f"{name} - gdyby prokrastynacja była pracą, byłby prezesem firmy.",
+        f"{name} ma więcej pustych obietnic niż pusty automat z przekąskami.",
+        f"{name} prawdopodobnie myśli, że \"bug\" to tylko nieprzyjemne stworzenie.",
+        f"{name} wykorzystuje system zarządzania projektem jak Facebooka - tylko podgląda.",
+        f"{name} - już dwa stanowiska zajęte przez jego ghosting.",
+        f"{name} ciągle pracuje zdalnie... od pracy.",
+        f"{name} czeka na idealny moment, który nigdy nie nadejdzie.",
+        f"{name} pojawia się w projekcie rzadziej niż kometa Halleya.",
+        f"{name} opracował nową metodologię: NADA (Never Actually Do Anything).",
+        f"{name} udowadnia, że można być częścią zespołu bez bycia częścią pracy zespołowej.",
+        f"{name} prawdopodobnie myśli, że \"sprint\" to tylko sposób na szybkie bieganie.",
+        f"{name} jest ekspertem w sztuce bycia niewidocznym w projekcie.",
+        f"{name} został oficjalnie uznany za legendę miejską projektu.",
+        f"{name} - badacze wciąż szukają dowodów na jego wkład w projekt.",
+        f"{name} myśli, że \"milestone\" to nazwa zespołu rockowego.",
+        f"{name} traktuje zadania jak swoje urodziny - pamięta o nich raz w roku.",
+        f"{name} ma w grafiku więcej wolnego niż nauczyciel w wakacje.",
+        f"{name} ma więcej nieobecności niż obecności.",
+        f"{name} myśli, że \"feedback\" to nazwa nowego fast foodu.",
+        f"{name} jest jak Schrödinger's Dev - teoretycznie pracuje i nie pracuje jednocześnie.",
+        f"{name} osiągnął perfekcję w sztuce unikania odpowiedzialności.",
+        f"{name} jest tak dobry w ukrywaniu się, że nawet satelity go nie widzą.",
+        f"{name} - ostatni raz widziany podczas rekrutacji.",
+        f"{name} jest niczym ninja - nigdy nie wiesz, czy jest, czy go nie ma. Zazwyczaj go nie ma.",
+        f"{name} myśli, że Jira to egzotyczne danie kuchni tajskiej.",
+        f"{name} - jego ostatni commit jest już zabytkiem archeologicznym.",
+        f"{name} ma mniej aktywności w projekcie niż średniowieczny mnich w internecie.",
+        f"{name} pojawia się w pracy rzadziej niż deszcz na Saharze.",
+        f"{name} wykonał imponującą liczbę zadań: 0. Tylko nieliczni potrafią utrzymać taką konsekwencję!",
+        f"{name} stosuje metodologię pracy: \"Zostawię to dla przyszłego mnie, który i tak tego nie zrobi.\"",
+        f"{name} - prawdopodobnie myśli, że \"deployment\" to rodzaj dekoracji.",
+        f"{name} osiągnął zen poprzez całkowity brak jakiejkolwiek produkcji."
+    ]
+    import random
+    return random.choice(roasts)
+
+
+def _format_trend(user: Dict) -> str:
+    """Zwraca dopisek z trendem tygodniowym i serią dni dla wiersza rankingu (pusty bez tych danych)"""
+    parts = []
+    week_delta = user.get("week_delta")
+    if week_delta:
+        parts.append(f"{'▲' if week_delta > 0 else '▼'}{abs(week_delta)} t/t")
+    streak = user.get("streak", 0)
+    if streak >= 3:
+        parts.append(f"🔥 {streak} dni z rzędu")
+    return f" ({', '.join(parts)})" if parts else ""
+
+
+def render_leaderboard(stats_list: List[Dict], days: int) -> RenderedEmbed:
+    """
+    Renderuje tablicę wyników do postaci czystych danych.
+
+    Args:
+        stats_list (List[Dict]): Lista statystyk użytkowników
+        days (int): Okres w dniach, za który generowana jest tablica
+
+    Returns:
+        RenderedEmbed: Wyrenderowana tablica wyników
+    """
+    try:
+        # Pobierz strefę czasową z konfiguracji
+        timezone_str = os.getenv('TIMEZONE', 'Europe/Warsaw')
+        timezone = pytz.timezone(timezone_str)
+
+        # Aktualna data i czas
+        now = datetime.datetime.now(timezone)
+
+        # Usuwamy "Nieprzypisane zadania" z rankingu
+        stats_list = [user for user in stats_list if user["name"] != "Nieprzypisane zadania"]
+
+        # Znajdź aktywnych i nieaktywnych użytkowników
+        active_users = [user for user in stats_list if user["tasks_total"] > 0]
+        inactive_users = [user for user in stats_list if user["tasks_total"] == 0]
+
+        # Sortujemy aktywnych użytkowników według liczby zadań
+        active_users.sort(key=lambda x: x["tasks_total"], reverse=True)
+
+        title = f"🏆 Tablica wyników - ostatnie {days} dni"
+        description = (f"Ranking zaangażowania członków zespołu od "
+                       f"{(now - datetime.timedelta(days=days)).strftime('%d.%m.%Y')} do {now.strftime('%d.%m.%Y')}")
+        color = 0x00AAFF  # Niebieski kolor
+        fields = []
+
+        if not active_users:
+            fields.append(RenderedField("Brak danych", "Nie znaleziono ukończonych zadań w analizowanym okresie."))
+            return RenderedEmbed(title, description, color, tuple(fields))
+
+        # Generowanie rankingu aktywnych użytkowników
+        leaderboard_lines = []
+        for index, user in enumerate(active_users):
+            # Emoji dla top 3
+            position_emoji = "🥇" if index == 0 else "🥈" if index == 1 else "🥉" if index == 2 else f"{index + 1}."
+
+            # Dodanie wpisu dla użytkownika z liczbą zadań (i trendem, jeśli statystyki go zawierają)
+            leaderboard_lines.append(f"{position_emoji} **{user['name']}**: {user['tasks_total']} zadań{_format_trend(user)}\n")
+
+        # Przy wielu aktywnych osobach ranking nie mieści się w jednym polu (limit 1024 znaków)
+        fields.extend(section_fields("Ranking ukończonych zadań", leaderboard_lines))
+
+        # Dodanie informacji o typach zadań dla top 3 (maksymalnie)
+        for index, user in enumerate(active_users[:3]):
+            # Przygotowanie tekstu o typach zadań (pomijamy epiki)
+            shares = user.get("type_shares", {})
+            task_types_text = "".join(
+                f"{task_type}: {count}" + (f" ({shares[task_type]:.0%})" if task_type in shares else "") + "\n"
+                for task_type, count in sorted(user["task_types"].items(), key=lambda item: item[1], reverse=True)
+                if task_type.lower() != "epic"
+            )
+
+            medal = "🥇" if index == 0 else "🥈" if index == 1 else "🥉"
+            fields.append(RenderedField(
+                f"{medal} {user['name']} - szczegóły",
+                task_types_text if task_types_text else "Brak zadań",
+                inline=True
+            ))
+
+        # Dodaj roasty dla nieaktywnych użytkowników
+        if inactive_users:
+            fields.extend(section_fields("⚠️ Ściana wstydu ⚠️",
+                                         [f"• {get_roast_for_inactive_member(user['name'])}\n" for user in inactive_users]))
+
+        # Dodanie stopki
+        footer = f"Wygenerowano {now.strftime('%d.%m.%Y %H:%M:%S')} • Wielki Inkwizytor Filipa"
+
+        return RenderedEmbed(title, description, color, tuple(fields), footer)
+
+    except Exception as e:
+        logger.error(f"Błąd podczas tworzenia embeda z tablicą wyników: {e}")
+        logger.error(traceback.format_exc())
+        return render_error("Błąd tablicy wyników", f"Wystąpił błąd podczas generowania tablicy wyników: {str(e)}")
+
+
+def render_bot_status(status: Dict) -> RenderedEmbed:
+    """
+    Renderuje szczegółowy stan bota (komenda /stan).
+
+    Args:
+        status (Dict): Stan bota z get_bot_status()
+
+    Returns:
+        RenderedEmbed: Wyrenderowany embed stanu
+    """
+    # Jeśli jedna z głównych funkcji jest wyłączona, użyj żółtego koloru
+    color = COLOR_GREEN
+    if not status["reports_enabled"] or not status["leaderboard_enabled"]:
+        color = COLOR_YELLOW
+
+    fields = [
+        # Kanały
+        RenderedField(
+            "🔧 Kanały",
+            f"🐞 **Bugi**: <#{status['bugs_channel_id']}>\n"
+            f"📝 **Raporty**: <#{status['reports_channel_id']}>\n"
+            f"🏆 **Leaderboard**: <#{status['leaderboard_channel_id']}>"
+        ),
+        # Funkcje
+        RenderedField(
+            "⚙️ Funkcje",
+            f"🔄 **Interwał aktualizacji bugów**: {status['update_interval']} sekund\n"
+            f"📄 **Tryb tablicy bugów**: {'stronicowana' if status['bugs_board_mode'] == 'paginated' else 'pełna lista'}\n"
+            f"📝 **Raporty**: {'✅ Włączone' if status['reports_enabled'] else '❌ Wyłączone'}\n"
+            f"🏆 **Leaderboard**: {'✅ Włączone' if status['leaderboard_enabled'] else '❌ Wyłączone'}"
+        ),
+        # Harmonogram
+        RenderedField(
+            "⏰ Harmonogram",
+            f"📝 **Czas raportów**: {status['report_time']}\n"
+            f"🏆 **Czas leaderboardu**: {status['leaderboard_time']}"
+        ),
+        # Jira
+        RenderedField(
+            "🔗 Jira",
+            f"🌐 **Serwer**: {status['jira_server']}\n"
+            f"📂 **Projekt**: {status['jira_project']}\n"
+            f"🕒 **Strefa czasowa**: {status['timezone']}"
+        ),
+    ]
+
+    # Ostatnie uruchomienia zadań (zapisane w trwałym stanie, przetrwają restart)
+    last_run = status.get("last_run", {})
+    if last_run:
+        job_labels = {
+            "bugs_update": "🐞 **Aktualizacja bugów**",
+            "daily_report": "📝 **Raport dzienny**",
+            "leaderboard": "🏆 **Leaderboard**"
+        }
+        fields.append(RenderedField(
+            "🕓 Ostatnie uruchomienia",
+            "\n".join(
+                f"{job_labels.get(job, job)}: <t:{int(datetime.datetime.fromisoformat(when).timestamp())}:R>"
+                for job, when in last_run.items()
+            )
+        ))
+
+    # Zadania w tle (supervisor) i najbliższe terminy harmonogramu
+    task_lines = []
+    state_labels = {
+        "running": "✅ działa",
+        "restarting": "🔁 restart",
+        "stopped": "⏹️ zatrzymane",
+        "cancelled": "⏹️ anulowane"
+    }
+    for task in status.get("background_tasks", []):
+        line = f"⚙️ **{task['name']}**: {state_labels.get(task['state'], task['state'])}"
+        if task["restarts"]:
+            line += f", restartów: {task['restarts']}"
+        if task["last_error"]:
+            line += f"\n   ostatni błąd: {task['last_error'][:100]}"
+        task_lines.append(line)
+    for job in status.get("scheduled_jobs", []):
+        if job["running"]:
+            when = "w trakcie"
+        elif job["next_run"]:
+            when = f"<t:{int(datetime.datetime.fromisoformat(job['next_run']).timestamp())}:R>"
+        else:
+            when = "wyłączone"
+        line = f"⏰ {job['name']}: {when}"
+        if job["failures"]:
+            line += f" (błędów z rzędu: {job['failures']})"
+        task_lines.append(line)
+    if task_lines:
+        fields.append(RenderedField("⚙️ Zadania w tle", "\n".join(task_lines)[:1024]))
+
+    # Opóźnienie pętli zdarzeń i wywołania, które ją blokowały
+    loop = status.get("event_loop")
+    if loop and loop["samples"]:
+        loop_lines = [
+            f"⏱️ **Opóźnienie**: p50 {loop['lag_p50_ms']} ms, p99 {loop['lag_p99_ms']} ms, "
+            f"max {loop['lag_max_ms']} ms",
+            f"🐢 **Wolne wywołania** (≥ {loop['slow_threshold_ms']:.0f} ms): {loop['slow_callbacks']}"
+        ]
+        for offender in loop["worst"]:
+            loop_lines.append(f"   `{offender['name'][:60]}`: max {offender['max_ms']} ms, {offender['count']}×")
+        fields.append(RenderedField("🔁 Pętla zdarzeń", "\n".join(loop_lines)[:1024]))
+
+    return RenderedEmbed(
+        title="📊 Stan bota Wielki Inkwizytor Filipa",
+        description="Szczegółowe informacje o konfiguracji i stanie bota",
+        color=color,
+        fields=tuple(fields)
+    )
+
+
+def render_perf_summary(summary: Dict) -> RenderedEmbed:
+    """
+    Renderuje podsumowanie śladów ostatnich cykli pracy (komenda /perf).
+
+    Args:
+        summary (Dict): Podsumowanie z TraceBuffer.summary()
+
+    Returns:
+        RenderedEmbed: Wyrenderowany embed podsumowania
+    """
+    if not summary["traces"]:
+        return RenderedEmbed(
+            title="⏱️ Wydajność bota",
+            description="Brak zapisanych śladów - żaden cykl pracy jeszcze się nie zakończył.",
+            color=COLOR_BLUE
+        )
+
+    cycle_lines = []
+    for cycle in summary["cycles"]:
+        line = (f"**{cycle['name']}** ×{cycle['count']}: p50 {cycle['p50_ms']} ms, "
+                f"max {cycle['max_ms']} ms, ostatni {cycle['last_ms']} ms")
+        if cycle["errors"]:
+            line += f", błędów: {cycle['errors']}"
+        cycle_lines.append(line)
+
+    span_lines = []
+    for row in summary["spans"]:
+        line = f"`{row['name']}` ×{row['count']}: łącznie {row['total_ms']} ms, max {row['max_ms']} ms"
+        if row["bytes"]:
+            line += f", {row['bytes'] / 1024:.1f} KiB"
+        span_lines.append(line)
+
+    fields = [RenderedField("🔁 Cykle", "\n".join(cycle_lines)[:1024])]
+    if span_lines:
+        fields.append(RenderedField("🧩 Najdłuższe etapy (łącznie)", "\n".join(span_lines)[:1024]))
+
+    return RenderedEmbed(
+        title="⏱️ Wydajność bota",
+        description=f"Podsumowanie {summary['traces']} ostatnich cykli pracy (pełne ślady: `/perf eksport:True`)",
+        color=COLOR_BLUE,
+        fields=tuple(fields)
+    )
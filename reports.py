@@ -7,12 +7,144 @@ import traceback
 import discord
 import pytz
 
-from bot_config import get_channel_id
-from discord_embeds import create_completed_tasks_report, create_error_embed
+from bot_config import get_channel_id, set_last_run
+from discord_embeds import create_error_embed
 from jira_client import get_completed_tasks_for_report
+from metrics import RENDER_SECONDS
+from render_model import RenderedEmbed, to_discord_embed
+from renderers import render_completed_tasks_report
+from tracing import span
 
 logger = logging.getLogger('WielkiInkwizytorFilipa')
 
+# Z jakim wyprzedzeniem (w sekundach) przed godziną wysyłki pobierane są zadania do dziennego raportu
+DEFAULT_REPORT_PREFETCH_LEAD = 300
+
+
+def get_report_prefetch_lead() -> int:
+    """
+    Zwraca wyprzedzenie pobierania zadań do dziennego raportu.
+
+    Returns:
+        int: Liczba sekund przed godziną wysyłki (REPORT_PREFETCH_LEAD); 0 wyłącza wstępne pobieranie
+    """
+    return int(os.getenv('REPORT_PREFETCH_LEAD', str(DEFAULT_REPORT_PREFETCH_LEAD)))
+
+
+class PreparedReport:
+    """
+    Zadania dziennego raportu pobrane przed godziną wysyłki. W momencie wysyłki
+    wystarczy dopytać Jirę o zadania ukończone od fetched_until i scalić je po kluczu.
+    """
+
+    def __init__(self, start_time: datetime.datetime, start_date_time: str, fetched_until: datetime.datetime,
+                 tasks: list):
+        self.start_time = start_time
+        self.start_date_time = start_date_time
+        self.fetched_until = fetched_until
+        self.tasks = {task.key: task for task in tasks}
+
+
+# Zmienne globalne
+_prepared_report = None
+
+
+def _daily_report_window(now: datetime.datetime):
+    """
+    Zwraca początek okresu dziennego raportu (21:37 poprzedniego dnia).
+
+    Returns:
+        Tuple[datetime.datetime, str]: Początek okresu i jego zapis dla zapytania JQL
+    """
+    yesterday = now - datetime.timedelta(days=1)
+    start_time = yesterday.replace(hour=21, minute=37, second=0, microsecond=0)
+    return start_time, f"{start_time.strftime('%Y-%m-%d')} 21:37"
+
+
+class ReportDateError(ValueError):
+    """Nieprawidłowy format dat własnego okresu raportu"""
+
+
+async def build_on_demand_report(period="day", custom_start=None, custom_end=None) -> RenderedEmbed:
+    """
+    Buduje raport ukończonych zadań na żądanie w postaci czystych danych.
+    Błędy (np. brak połączenia z Jirą) są przekazywane dalej, a nie zamieniane na pusty raport.
+
+    Args:
+        period (str): Okres raportu: 'day', 'week', 'month', 'custom'
+        custom_start (str, optional): Własna data początkowa w formacie YYYY-MM-DD
+        custom_end (str, optional): Własna data końcowa w formacie YYYY-MM-DD
+
+    Returns:
+        RenderedEmbed: Wyrenderowany raport
+
+    Raises:
+        ReportDateError: Gdy daty własnego okresu mają nieprawidłowy format
+    """
+    # Ustawienie strefy czasowej na Warsaw
+    timezone_str = 'Europe/Warsaw'
+    timezone = pytz.timezone(timezone_str)
+    now = datetime.datetime.now(timezone)
+    logger.info(f"Generowanie raportu na żądanie o {now.strftime('%Y-%m-%d %H:%M:%S %Z')} dla okresu {period}")
+
+    # Obliczanie przedziału czasowego w zależności od wybranego okresu
+    if period == "custom" and custom_start and custom_end:
+        # Użyj własnego zakresu dat
+        try:
+            # Parsuj daty podane przez użytkownika
+            start_time = datetime.datetime.strptime(custom_start, '%Y-%m-%d').replace(tzinfo=timezone)
+            end_time = datetime.datetime.strptime(custom_end, '%Y-%m-%d').replace(hour=23, minute=59, second=59,
+                                                                                  tzinfo=timezone)
+
+            # Formatowanie dat dla zapytania JQL
+            start_date_time = custom_start + " 00:00"
+            end_date_time = custom_end + " 23:59"
+        except ValueError as date_error:
+            logger.error(f"Błąd formatu daty: {date_error}")
+            raise ReportDateError("Podaj daty w formacie YYYY-MM-DD (np. 2023-12-31)")
+    elif period == "day":
+        # Koniec to aktualny czas (gdy raport jest generowany)
+        end_time = now
+
+        # Początek to 21:37 poprzedniego dnia
+        start_time, start_date_time = _daily_report_window(now)
+        end_date_time = end_time.strftime('%Y-%m-%d %H:%M')
+
+    elif period == "week":
+        # Ostatnie 7 dni
+        end_time = now.replace(hour=23, minute=59, second=59, microsecond=0)
+        start_time = (end_time - datetime.timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # Formatowanie dat dla zapytania JQL
+        start_date_time = start_time.strftime('%Y-%m-%d %H:%M')
+        end_date_time = end_time.strftime('%Y-%m-%d %H:%M')
+    elif period == "month":
+        # Ostatnie 30 dni
+        end_time = now.replace(hour=23, minute=59, second=59, microsecond=0)
+        start_time = (end_time - datetime.timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # Formatowanie dat dla zapytania JQL
+        start_date_time = start_time.strftime('%Y-%m-%d %H:%M')
+        end_date_time = end_time.strftime('%Y-%m-%d %H:%M')
+    else:
+        # Nieznany okres, użyj domyślnego (dzień)
+        logger.warning(f"Nieznany okres: {period}, używam domyślnego (dzień)")
+        return await build_on_demand_report()
+
+    logger.debug(f"Pobieranie zadań ukończonych w okresie: {start_date_time} - {end_date_time}")
+    logger.debug(f"Używając strefy czasowej: {timezone_str}")
+
+    # Pobieranie zadań z Jiry
+    tasks = await get_completed_tasks_for_report(start_date_time, end_date_time, raise_errors=True)
+
+    # Renderowanie raportu
+    with RENDER_SECONDS.time(renderer='completed_tasks_report'), \
+            span('render.completed_tasks_report', tasks=len(tasks)) as render:
+        rendered = render_completed_tasks_report(tasks, start_time, end_time, os.getenv('JIRA_SERVER'))
+        render.set(chars=rendered.size)
+    logger.info(f"Wygenerowano raport z {len(tasks)} zadaniami")
+    return rendered
+
 
 async def generate_on_demand_report(period="day", custom_start=None, custom_end=None):
     """
@@ -27,85 +159,82 @@ async def generate_on_demand_report(period="day", custom_start=None, custom_end=
         discord.Embed: Embed z raportem
     """
     try:
-        # Ustawienie strefy czasowej na Warsaw
-        timezone_str = 'Europe/Warsaw'
-        timezone = pytz.timezone(timezone_str)
-        now = datetime.datetime.now(timezone)
-        logger.info(f"Generowanie raportu na żądanie o {now.strftime('%Y-%m-%d %H:%M:%S %Z')} dla okresu {period}")
-
-        # Obliczanie przedziału czasowego w zależności od wybranego okresu
-        if period == "custom" and custom_start and custom_end:
-            # Użyj własnego zakresu dat
-            try:
-                # Parsuj daty podane przez użytkownika
-                start_time = datetime.datetime.strptime(custom_start, '%Y-%m-%d').replace(tzinfo=timezone)
-                end_time = datetime.datetime.strptime(custom_end, '%Y-%m-%d').replace(hour=23, minute=59, second=59,
-                                                                                      tzinfo=timezone)
-
-                # Formatowanie dat dla zapytania JQL
-                start_date_time = custom_start + " 00:00"
-                end_date_time = custom_end + " 23:59"
-            except ValueError as date_error:
-                logger.error(f"Błąd formatu daty: {date_error}")
-                return create_error_embed(
-                    "Błąd formatu daty",
-                    "Podaj daty w formacie YYYY-MM-DD (np. 2023-12-31)"
-                )
-        elif period == "day":
-            # Koniec to aktualny czas (gdy raport jest generowany)
-            end_time = now
-
-            # Początek to 21:37 poprzedniego dnia
-            yesterday = now - datetime.timedelta(days=1)
-            start_time = yesterday.replace(hour=21, minute=37, second=0, microsecond=0)
+        return to_discord_embed(await build_on_demand_report(period, custom_start, custom_end))
+    except ReportDateError as date_error:
+        return create_error_embed("Błąd formatu daty", str(date_error))
+    except Exception as e:
+        logger.error(f"Błąd podczas generowania raportu na żądanie: {e}")
+        logger.error(traceback.format_exc())
+        return create_error_embed(
+            "Błąd raportu",
+            f"Wystąpił błąd podczas generowania raportu: {str(e)}"
+        )
 
-            # Formatowanie dat dla zapytania JQL
-            start_date = start_time.strftime('%Y-%m-%d')
-            end_date = end_time.strftime('%Y-%m-%d')
 
-            start_date_time = f"{start_date} 21:37"
-            end_date_time = f"{end_date} {end_time.strftime('%H:%M')}"
+async def prefetch_daily_report():
+    """
+    Pobiera z wyprzedzeniem zadania do dziennego raportu, żeby w momencie wysyłki
+    wystarczyło małe zapytanie o ostatnie minuty.
+
+    Returns:
+        bool: True, jeśli zadania zostały pobrane
+    """
+    global _prepared_report
+    try:
+        timezone = pytz.timezone('Europe/Warsaw')
+        now = datetime.datetime.now(timezone)
+        start_time, start_date_time = _daily_report_window(now)
 
-        elif period == "week":
-            # Ostatnie 7 dni
-            end_time = now.replace(hour=23, minute=59, second=59, microsecond=0)
-            start_time = (end_time - datetime.timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
+        tasks = await get_completed_tasks_for_report(start_date_time, now.strftime('%Y-%m-%d %H:%M'))
+        _prepared_report = PreparedReport(start_time, start_date_time, now, tasks)
+        logger.info(f"Przygotowano dzienny raport z wyprzedzeniem ({len(tasks)} zadań do {now.strftime('%H:%M:%S')})")
+        return True
+    except Exception as e:
+        _prepared_report = None
+        logger.error(f"Błąd podczas przygotowywania dziennego raportu: {e}")
+        logger.error(traceback.format_exc())
+        return False
 
-            # Formatowanie dat dla zapytania JQL
-            start_date_time = start_time.strftime('%Y-%m-%d %H:%M')
-            end_date_time = end_time.strftime('%Y-%m-%d %H:%M')
-        elif period == "month":
-            # Ostatnie 30 dni
-            end_time = now.replace(hour=23, minute=59, second=59, microsecond=0)
-            start_time = (end_time - datetime.timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
 
-            # Formatowanie dat dla zapytania JQL
-            start_date_time = start_time.strftime('%Y-%m-%d %H:%M')
-            end_date_time = end_time.strftime('%Y-%m-%d %H:%M')
-        else:
-            # Nieznany okres, użyj domyślnego (dzień)
-            logger.warning(f"Nieznany okres: {period}, używam domyślnego (dzień)")
-            return await generate_on_demand_report()  # Wywołaj rekurencyjnie z domyślnymi parametrami
+async def build_daily_report() -> discord.Embed:
+    """
+    Buduje dzienny raport. Jeśli zadania zostały pobrane wcześniej (prefetch_daily_report),
+    z Jiry pobierane są tylko zadania ukończone od tamtej chwili i scalane po kluczu.
+    W przeciwnym razie raport jest generowany w całości.
 
-        logger.info(f"Pobieranie zadań ukończonych w okresie: {start_date_time} - {end_date_time}")
-        logger.info(f"Używając strefy czasowej: {timezone_str}")
+    Returns:
+        discord.Embed: Embed z raportem
+    """
+    global _prepared_report
+    prepared, _prepared_report = _prepared_report, None
 
-        # Pobieranie zadań z Jiry
-        tasks = await get_completed_tasks_for_report(start_date_time, end_date_time)
+    timezone = pytz.timezone('Europe/Warsaw')
+    now = datetime.datetime.now(timezone)
+    start_time, start_date_time = _daily_report_window(now)
 
-        # Tworzenie embeda z raportem
-        jira_server = os.getenv('JIRA_SERVER')
-        embed = create_completed_tasks_report(tasks, start_time, end_time, jira_server)
-        logger.info(f"Wygenerowano raport z {len(tasks)} zadaniami")
+    if prepared is None or prepared.start_date_time != start_date_time:
+        return await generate_on_demand_report()
 
-        return embed
+    try:
+        # JQL operuje na minutach, więc zakładka jednej minuty gwarantuje, że nic nie umknie
+        delta_start = (prepared.fetched_until - datetime.timedelta(minutes=1)).strftime('%Y-%m-%d %H:%M')
+        delta_tasks = await get_completed_tasks_for_report(delta_start, now.strftime('%Y-%m-%d %H:%M'))
+
+        tasks = dict(prepared.tasks)
+        for task in delta_tasks:
+            tasks[task.key] = task
+        logger.info(f"Dopytano o zadania od {delta_start}: {len(delta_tasks)} zadań, "
+                    f"łącznie {len(tasks)} w raporcie")
+
+        with RENDER_SECONDS.time(renderer='completed_tasks_report'), \
+                span('render.completed_tasks_report', tasks=len(tasks)) as render:
+            rendered = render_completed_tasks_report(list(tasks.values()), start_time, now, os.getenv('JIRA_SERVER'))
+            render.set(chars=rendered.size)
+        return to_discord_embed(rendered)
     except Exception as e:
-        logger.error(f"Błąd podczas generowania raportu na żądanie: {e}")
+        logger.error(f"Błąd podczas uzupełniania przygotowanego raportu, generowanie od nowa: {e}")
         logger.error(traceback.format_exc())
-        return create_error_embed(
-            "Błąd raportu",
-            f"Wystąpił błąd podczas generowania raportu: {str(e)}"
-        )
+        return await generate_on_demand_report()
 
 
 async def send_daily_report(client):
@@ -136,8 +265,8 @@ async def send_daily_report(client):
         logger.info(
             f"Generowanie dziennego raportu dla kanału {channel.name} (ID: {channel_id}) o {now.strftime('%Y-%m-%d %H:%M:%S %Z')}")
 
-        # Generuj raport - domyślny okres "day"
-        report_embed = await generate_on_demand_report()
+        # Generuj raport - domyślny okres "day" (z zadań pobranych z wyprzedzeniem, jeśli są)
+        report_embed = await build_daily_report()
 
         # Dodaj informację o automatycznym wygenerowaniu
         if isinstance(report_embed, discord.Embed):
@@ -151,6 +280,7 @@ async def send_daily_report(client):
         # Wysłij raport
         await channel.send(embed=report_embed)
         logger.info(f"Wysłano dzienny raport na kanał {channel.name}")
+        set_last_run('daily_report')
 
         # Sprawdź, czy mamy również tablicę wyników do wysłania
         try:
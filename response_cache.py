@@ -0,0 +1,134 @@
+# response_cache.py
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from render_model import RenderedEmbed
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Jak długo (w sekundach) zapamiętana odpowiedź komendy jest ważna, nawet jeśli dane się nie zmieniły
+DEFAULT_RESPONSE_CACHE_TTL = 300
+
+# Maksymalna liczba zapamiętanych odpowiedzi
+RESPONSE_CACHE_SIZE = 64
+
+
+def make_key(command: str, **args) -> Tuple:
+    """
+    Buduje klucz cache z nazwy komendy i znormalizowanych argumentów
+    (kolejność argumentów nie ma znaczenia, napisy są przycinane, a puste wartości pomijane).
+
+    Args:
+        command (str): Nazwa komendy
+        **args: Argumenty komendy
+
+    Returns:
+        Tuple: Klucz cache
+    """
+    normalized = []
+    for name, value in sorted(args.items()):
+        if isinstance(value, str):
+            value = value.strip().lower()
+        if value is None or value == "":
+            continue
+        normalized.append((name, value))
+    return (command, tuple(normalized))
+
+
+class CachedResponse:
+    """Zapamiętana odpowiedź komendy"""
+
+    def __init__(self, embeds: Sequence[RenderedEmbed], version: Hashable, expires_at: float):
+        self.embeds = tuple(embeds)
+        self.version = version  # Wersja danych, z których zbudowano odpowiedź
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    Cache wyrenderowanych odpowiedzi komend (RenderedEmbed), z kluczem z komendy i argumentów.
+
+    Wpis jest ważny, dopóki nie minie TTL i nie zmieni się wersja danych, z których go
+    zbudowano (np. wersja tablicy liczników ukończonych zadań), więc kolejne takie same
+    pytania są obsługiwane od razu, bez odpytywania Jiry.
+    """
+
+    def __init__(self, ttl: int = DEFAULT_RESPONSE_CACHE_TTL, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[List[RenderedEmbed]]:
+        """
+        Zwraca zapamiętaną odpowiedź, jeśli jest aktualna.
+
+        Args:
+            key (Hashable): Klucz (make_key)
+            version (Hashable): Bieżąca wersja danych
+
+        Returns:
+            List[RenderedEmbed]: Zapamiętane embedy lub None
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        logger.debug(f"Odpowiedź {key} z cache (wersja {version})")
+        return list(entry.embeds)
+
+    def put(self, key: Hashable, version: Hashable, embeds: Sequence[RenderedEmbed], ttl: Optional[int] = None):
+        """
+        Zapamiętuje odpowiedź.
+
+        Args:
+            key (Hashable): Klucz (make_key)
+            version (Hashable): Wersja danych, z których zbudowano odpowiedź
+            embeds (Sequence[RenderedEmbed]): Wyrenderowane embedy
+            ttl (int, optional): Czas ważności w sekundach (domyślnie TTL cache)
+        """
+        if self.ttl <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        self._entries[key] = CachedResponse(embeds, version, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, command: Optional[str] = None):
+        """Usuwa wszystkie wpisy (lub tylko wpisy danej komendy)"""
+        if command is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == command]:
+            del self._entries[key]
+
+    def stats(self) -> Dict:
+        """Zwraca liczbę wpisów, trafień i chybień"""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Zmienne globalne
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Zwraca współdzielony cache odpowiedzi komend. Przy pierwszym wywołaniu tworzy go
+    z TTL z ustawienia RESPONSE_CACHE_TTL (0 wyłącza cache).
+
+    Returns:
+        ResponseCache: Cache odpowiedzi
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(int(os.getenv('RESPONSE_CACHE_TTL', str(DEFAULT_RESPONSE_CACHE_TTL))))
+    return _response_cache
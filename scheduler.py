@@ -0,0 +1,275 @@
+# scheduler.py
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+import os
+import time
+import traceback
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import pytz
+
+from metrics import CYCLE_SECONDS
+from tracing import start_trace
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Funkcja wyznaczająca następne uruchomienie: (teraz w strefie harmonogramu, zadanie) -> moment lub None (wyłączone)
+Trigger = Callable[[datetime.datetime, "Job"], Optional[datetime.datetime]]
+
+
+def get_schedule_timezone():
+    """Zwraca strefę czasową harmonogramu (TIMEZONE, domyślnie Europe/Warsaw)"""
+    return pytz.timezone(os.getenv('TIMEZONE', 'Europe/Warsaw'))
+
+
+def _local_time(now: datetime.datetime, day: datetime.date, hour: int, minute: int) -> datetime.datetime:
+    """Zwraca podaną godzinę danego dnia w strefie `now`, z poprawną obsługą zmiany czasu"""
+    naive = datetime.datetime(day.year, day.month, day.day, hour, minute)
+    tz = now.tzinfo
+    return tz.localize(naive) if hasattr(tz, 'localize') else naive.replace(tzinfo=tz)
+
+
+def interval_trigger(get_seconds: Callable[["Job"], int], enabled: Callable[[], bool] = lambda: True) -> Trigger:
+    """
+    Uruchamia zadanie co get_seconds(job) sekund, licząc od zakończenia poprzedniego uruchomienia
+    (pierwsze uruchomienie następuje od razu).
+
+    Args:
+        get_seconds (Callable[[Job], int]): Funkcja zwracająca aktualny interwał (może zależeć np. od liczby błędów)
+        enabled (Callable[[], bool]): Funkcja sprawdzająca, czy zadanie jest włączone
+    """
+    def trigger(now, job):
+        if not enabled():
+            return None
+        if job.last_finished is None:
+            return now
+        return max(now, job.last_finished + datetime.timedelta(seconds=get_seconds(job)))
+    return trigger
+
+
+def daily_trigger(get_time: Callable[[], Tuple[int, int]], enabled: Callable[[], bool] = lambda: True,
+                  offset: Callable[[], int] = lambda: 0) -> Trigger:
+    """
+    Uruchamia zadanie codziennie o godzinie get_time() (w strefie harmonogramu),
+    opcjonalnie przesuniętej o offset() sekund (np. ujemne wyprzedzenie).
+    """
+    def trigger(now, job):
+        if not enabled():
+            return None
+        hour, minute = get_time()
+        shift = datetime.timedelta(seconds=offset())
+        for days_ahead in range(3):
+            candidate = _local_time(now, now.date() + datetime.timedelta(days=days_ahead), hour, minute) + shift
+            if candidate > now and (job.last_fired is None or candidate > job.last_fired):
+                return candidate
+        return None
+    return trigger
+
+
+def weekly_trigger(get_time: Callable[[], Tuple[int, int, int]], enabled: Callable[[], bool] = lambda: True) -> Trigger:
+    """Uruchamia zadanie co tydzień w dniu i o godzinie get_time() -> (dzień tygodnia 0=pon, godzina, minuta)"""
+    def trigger(now, job):
+        if not enabled():
+            return None
+        weekday, hour, minute = get_time()
+        for days_ahead in range(8):
+            day = now.date() + datetime.timedelta(days=days_ahead)
+            if day.weekday() != weekday:
+                continue
+            candidate = _local_time(now, day, hour, minute)
+            if candidate > now and (job.last_fired is None or candidate > job.last_fired):
+                return candidate
+        return None
+    return trigger
+
+
+class Job:
+    """Zadanie harmonogramu: akcja (korutyna) i reguła wyznaczająca kolejne uruchomienia"""
+
+    def __init__(self, name: str, action: Callable[[], Awaitable], trigger: Trigger):
+        self.name = name
+        self.action = action
+        self.trigger = trigger
+        self.next_run: Optional[datetime.datetime] = None  # Zaplanowany moment (w strefie harmonogramu)
+        self.last_fired: Optional[datetime.datetime] = None  # Planowany moment ostatniego uruchomienia
+        self.last_finished: Optional[datetime.datetime] = None
+        self.last_result = None
+        self.failures = 0  # Liczba kolejnych nieudanych uruchomień
+        self.running = False
+        self.generation = 0  # Zwiększane przy każdym przeplanowaniu - starsze wpisy w kopcu są ignorowane
+
+
+class Scheduler:
+    """
+    Jeden harmonogram dla wszystkich zadań okresowych bota.
+
+    Zadania leżą w kopcu (heapq) uporządkowanym według terminów na zegarze monotonicznym,
+    a jedna korutyna śpi dokładnie do najbliższego terminu. Zmiana konfiguracji budzi
+    harmonogram (wake), który od razu przelicza terminy - bez czekania na nieaktualny sleep.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running_tasks = set()
+        self._reschedule_all = False
+
+    def add_job(self, name: str, action: Callable[[], Awaitable], trigger: Trigger) -> Job:
+        """
+        Dodaje zadanie do harmonogramu.
+
+        Args:
+            name (str): Unikalna nazwa zadania
+            action (Callable[[], Awaitable]): Korutyna do uruchomienia; wynik False liczony jest jako błąd
+            trigger (Trigger): Reguła wyznaczająca kolejne uruchomienia
+
+        Returns:
+            Job: Utworzone zadanie
+        """
+        job = Job(name, action, trigger)
+        self._jobs[name] = job
+        self._schedule(job)
+        return job
+
+    def jobs(self) -> List[Job]:
+        """Zwraca zadania harmonogramu"""
+        return list(self._jobs.values())
+
+    def status(self) -> List[Dict]:
+        """
+        Zwraca stan zadań harmonogramu.
+
+        Returns:
+            List[Dict]: Dla każdego zadania: name, next_run, last_finished, failures, running
+        """
+        return [
+            {
+                "name": job.name,
+                "next_run": job.next_run.isoformat() if job.next_run else None,
+                "last_finished": job.last_finished.isoformat() if job.last_finished else None,
+                "failures": job.failures,
+                "running": job.running,
+            }
+            for job in self._jobs.values()
+        ]
+
+    def _schedule(self, job: Job):
+        """Wyznacza następny termin zadania i odkłada go na kopiec"""
+        job.generation += 1
+        now = datetime.datetime.now(get_schedule_timezone())
+        try:
+            job.next_run = job.trigger(now, job)
+        except Exception as e:
+            job.next_run = None
+            logger.error(f"Błąd podczas wyznaczania terminu zadania {job.name}: {e}")
+            logger.error(traceback.format_exc())
+
+        if job.next_run is None:
+            logger.debug(f"Zadanie {job.name} jest wyłączone")
+            return
+        deadline = time.monotonic() + max((job.next_run - now).total_seconds(), 0)
+        heapq.heappush(self._heap, (deadline, next(self._counter), job.name, job.generation))
+        logger.debug(f"Zadanie {job.name} zaplanowano na {job.next_run.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+
+    def wake(self):
+        """
+        Przelicza terminy wszystkich zadań (np. po zmianie konfiguracji).
+        Można wywołać z dowolnego wątku.
+        """
+        self._reschedule_all = True
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run_job(self, job: Job, fired_at: datetime.datetime):
+        """Uruchamia zadanie i planuje jego kolejne wykonanie"""
+        job.running = True
+        job.last_fired = fired_at
+        started = time.perf_counter()
+        try:
+            with start_trace(job.name) as trace:
+                result = await job.action()
+                if isinstance(result, bool):
+                    trace.set(success=result)
+            job.last_result = result
+            job.failures = job.failures + 1 if result is False else 0
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_result = None
+            logger.error(f"Błąd w zadaniu {job.name}: {e}")
+            logger.error(traceback.format_exc())
+        finally:
+            job.running = False
+            job.last_finished = datetime.datetime.now(get_schedule_timezone())
+            CYCLE_SECONDS.observe(time.perf_counter() - started, cycle=job.name)
+        self._schedule(job)
+        self._wakeup.set()
+
+    async def run(self):
+        """Główna pętla harmonogramu - śpi do najbliższego terminu i uruchamia zadania"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        logger.info(f"Uruchomiono harmonogram zadań ({len(self._jobs)} zadań)")
+
+        # Po ponownym uruchomieniu (np. przez supervisor po awarii) zbuduj kopiec od nowa
+        self._heap = []
+        for job in self._jobs.values():
+            job.running = False
+            self._schedule(job)
+
+        try:
+            while True:
+                if self._reschedule_all:
+                    self._reschedule_all = False
+                    for job in self._jobs.values():
+                        if not job.running:
+                            self._schedule(job)
+                    logger.info("Przeplanowano zadania po zmianie konfiguracji")
+
+                # Odrzuć nieaktualne wpisy (zadanie zostało w międzyczasie przeplanowane)
+                while self._heap and self._heap[0][3] != self._jobs[self._heap[0][2]].generation:
+                    heapq.heappop(self._heap)
+
+                timeout = None
+                if self._heap:
+                    timeout = self._heap[0][0] - time.monotonic()
+
+                if timeout is None or timeout > 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                _, _, name, _ = heapq.heappop(self._heap)
+                job = self._jobs[name]
+                if job.running:
+                    continue
+                logger.debug(f"Uruchamianie zadania {job.name}")
+                task = asyncio.create_task(self._run_job(job, job.next_run))
+                self._running_tasks.add(task)
+                task.add_done_callback(self._running_tasks.discard)
+        finally:
+            for task in list(self._running_tasks):
+                task.cancel()
+            self._loop = None
+
+
+# Zmienne globalne
+_scheduler: Optional[Scheduler] = None
+
+
+def get_scheduler() -> Scheduler:
+    """Zwraca współdzielony harmonogram zadań"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
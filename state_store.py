@@ -0,0 +1,168 @@
+# state_store.py
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import traceback
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Domyślna lokalizacja pliku stanu - obok plików bota
+DEFAULT_STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bot_state.json')
+
+# Opóźnienie zapisu (write-behind) - kolejne zmiany w tym oknie trafiają do jednego zapisu
+FLUSH_DELAY = 2.0
+
+# Najdłuższy odstęp między ponownymi próbami nieudanego zapisu (odstęp rośnie dwukrotnie po każdej porażce)
+MAX_FLUSH_RETRY_DELAY = 300.0
+
+# Zmienne globalne
+_state = {}
+_state_path = None
+_dirty = False
+_flush_timer = None
+_flush_failures = 0
+_read_only = False
+_lock = threading.RLock()
+
+
+def get_state_path():
+    """Zwraca ścieżkę pliku stanu (BOT_STATE_FILE lub domyślna)"""
+    return _state_path or os.getenv('BOT_STATE_FILE', DEFAULT_STATE_FILE)
+
+
+def load_state(path=None):
+    """
+    Wczytuje trwały stan bota z pliku JSON.
+    Brak pliku lub uszkodzony plik oznacza pusty stan - bot startuje z konfiguracją z .env.
+
+    Args:
+        path (str, optional): Ścieżka do pliku stanu
+
+    Returns:
+        dict: Kopia wczytanego stanu
+    """
+    global _state, _state_path, _dirty
+    with _lock:
+        _state_path = path or os.getenv('BOT_STATE_FILE', DEFAULT_STATE_FILE)
+        _dirty = False
+        try:
+            if os.path.exists(_state_path):
+                with open(_state_path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                _state = loaded if isinstance(loaded, dict) else {}
+                logger.info(f"Wczytano stan bota z pliku {_state_path} ({len(_state)} kluczy)")
+            else:
+                _state = {}
+                logger.info(f"Brak pliku stanu {_state_path}, używam konfiguracji z .env")
+        except Exception as e:
+            _state = {}
+            logger.error(f"Błąd podczas wczytywania stanu bota z {_state_path}: {e}")
+            logger.error(traceback.format_exc())
+        return dict(_state)
+
+
+def get_state(key, default=None):
+    """Zwraca wartość zapisaną w stanie bota lub wartość domyślną"""
+    with _lock:
+        return _state.get(key, default)
+
+
+def set_state(key, value):
+    """
+    Ustawia wartość w stanie bota. Zapis na dysk odbywa się z opóźnieniem
+    FLUSH_DELAY sekund, więc seria zmian kończy się jednym zapisem pliku.
+    """
+    update_state({key: value})
+
+
+def update_state(values):
+    """
+    Ustawia wiele wartości w stanie bota jednocześnie.
+
+    Args:
+        values (dict): Słownik klucz -> wartość (musi dać się zapisać jako JSON)
+    """
+    global _dirty
+    with _lock:
+        changed = False
+        for key, value in values.items():
+            if _state.get(key, object()) != value:
+                _state[key] = value
+                changed = True
+        if changed:
+            _dirty = True
+            _schedule_flush()
+
+
+def set_read_only(read_only=True):
+    """
+    Włącza tryb tylko do odczytu: zmiany stanu działają w pamięci, ale nie są zapisywane na dysk
+    (np. przebieg próbny, który nie może nadpisać ID wiadomości prawdziwej tablicy).
+
+    Args:
+        read_only (bool): Czy wyłączyć zapis stanu
+    """
+    global _read_only
+    with _lock:
+        _read_only = read_only
+
+
+def _schedule_flush(delay=None):
+    """Planuje zapis stanu za `delay` sekund (domyślnie FLUSH_DELAY), jeśli nie jest już zaplanowany"""
+    global _flush_timer
+    if _flush_timer is not None or _read_only:
+        return
+    _flush_timer = threading.Timer(FLUSH_DELAY if delay is None else delay, flush_state)
+    _flush_timer.daemon = True
+    _flush_timer.start()
+
+
+def flush_state():
+    """
+    Atomowo zapisuje stan na dysk (plik tymczasowy + os.replace),
+    dzięki czemu przerwanie w trakcie zapisu nie uszkodzi pliku stanu.
+    Nieudany zapis jest ponawiany z rosnącym odstępem (do MAX_FLUSH_RETRY_DELAY sekund).
+
+    Returns:
+        bool: True jeśli zapis się powiódł lub nie było nic do zapisania
+    """
+    global _dirty, _flush_timer, _flush_failures
+    with _lock:
+        _flush_timer = None
+        if not _dirty or _read_only:
+            return True
+
+        path = get_state_path()
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, tmp_path = tempfile.mkstemp(prefix='.bot_state.', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(_state, f, ensure_ascii=False, indent=2, sort_keys=True)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            _dirty = False
+            _flush_failures = 0
+            logger.debug(f"Zapisano stan bota do pliku {path}")
+            return True
+        except Exception as e:
+            _flush_failures += 1
+            retry_delay = min(FLUSH_DELAY * 2 ** _flush_failures, MAX_FLUSH_RETRY_DELAY)
+            logger.error(f"Błąd podczas zapisywania stanu bota do {path}: {e} "
+                         f"(próba {_flush_failures}, ponowienie za {retry_delay:.0f}s)")
+            if _flush_failures == 1:
+                logger.error(traceback.format_exc())
+            _schedule_flush(retry_delay)
+            return False
+
+
+# Zapisz niezapisane zmiany przy zamykaniu procesu
+atexit.register(flush_state)
@@ -0,0 +1,260 @@
+# stats_engine.py
+import bisect
+import datetime
+import logging
+import os
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy jest opcjonalne - bez niego działa wersja w czystym Pythonie
+    np = None
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Wymuszenie wersji (np. do porównań w benchmarkach); None - według STATS_ENGINE_NUMPY
+USE_NUMPY: Optional[bool] = None
+
+# Maksymalna długość liczonej serii dni z ukończonymi zadaniami
+MAX_STREAK_DAYS = 365
+
+
+def use_numpy() -> bool:
+    """
+    Sprawdza, czy obliczenia mają używać numpy: gdy jest zainstalowane i nie wyłączono go
+    przez STATS_ENGINE_NUMPY=0 (albo przez USE_NUMPY).
+    """
+    if np is None:
+        return False
+    if USE_NUMPY is not None:
+        return USE_NUMPY
+    return os.getenv('STATS_ENGINE_NUMPY', '1') != '0'
+
+
+class CompletionColumns:
+    """
+    Kolumnowy zapis ukończonych zadań: równoległe tablice indeksu użytkownika,
+    indeksu typu zadania, dnia ukończenia (ordinal) i momentu ukończenia (sekundy epoki).
+
+    Wiersze są utrzymywane w kolejności dni (sortowanie tylko, gdy dopisano zadanie
+    starsze niż ostatnie), więc każde okno czasowe to ciągły wycinek wyznaczany bisekcją.
+    """
+
+    def __init__(self):
+        self.user_idx = array('I')
+        self.type_idx = array('I')
+        self.day = array('i')
+        self.timestamp = array('q')
+        self._sorted = True
+
+    def __len__(self):
+        return len(self.day)
+
+    def append(self, user_idx: int, type_idx: int, day: datetime.date, timestamp: int):
+        """Dopisuje jedno ukończone zadanie"""
+        ordinal = day.toordinal()
+        if self._sorted and self.day and ordinal < self.day[-1]:
+            self._sorted = False
+        self.user_idx.append(user_idx)
+        self.type_idx.append(type_idx)
+        self.day.append(ordinal)
+        self.timestamp.append(timestamp)
+
+    def extend(self, user_indices: Sequence[int], type_indices: Sequence[int], ordinals: Sequence[int],
+               timestamps: Sequence[int]):
+        """Dopisuje wiele ukończonych zadań naraz (dni jako ordinal)"""
+        if not ordinals:
+            return
+        if self._sorted and (any(a > b for a, b in zip(ordinals, ordinals[1:]))
+                             or (self.day and ordinals[0] < self.day[-1])):
+            self._sorted = False
+        self.user_idx.extend(user_indices)
+        self.type_idx.extend(type_indices)
+        self.day.extend(ordinals)
+        self.timestamp.extend(timestamps)
+
+    def _ensure_sorted(self):
+        """Sortuje wiersze według dnia, jeśli kolejność została zaburzona"""
+        if self._sorted:
+            return
+        if use_numpy():
+            order = np.argsort(np.frombuffer(self.day, dtype=np.int32), kind='stable')
+            for name, typecode, dtype in (('user_idx', 'I', np.uint32), ('type_idx', 'I', np.uint32),
+                                          ('day', 'i', np.int32), ('timestamp', 'q', np.int64)):
+                column = np.frombuffer(getattr(self, name), dtype=dtype)[order]
+                setattr(self, name, array(typecode, column.tobytes()))
+        else:
+            order = sorted(range(len(self.day)), key=self.day.__getitem__)
+            for name in ('user_idx', 'type_idx', 'day', 'timestamp'):
+                column = getattr(self, name)
+                setattr(self, name, array(column.typecode, [column[i] for i in order]))
+        self._sorted = True
+
+    def day_range(self, start_day: datetime.date, end_day: datetime.date) -> Tuple[int, int]:
+        """Zwraca zakres wierszy [lo, hi) dla dni od start_day do end_day włącznie"""
+        self._ensure_sorted()
+        lo = bisect.bisect_left(self.day, start_day.toordinal())
+        hi = bisect.bisect_right(self.day, end_day.toordinal())
+        return lo, hi
+
+
+def bucket_counts(columns: CompletionColumns, boundaries: Sequence[datetime.date], n_users: int,
+                  n_types: int) -> List[List[List[int]]]:
+    """
+    Zlicza zadania w przedziałach dni wyznaczonych przez kolejne granice
+    (przedział i to dni od boundaries[i] włącznie do boundaries[i + 1] wyłącznie),
+    w jednym przebiegu po kolumnach.
+
+    Args:
+        columns (CompletionColumns): Kolumny ukończonych zadań
+        boundaries (Sequence[datetime.date]): Rosnące granice przedziałów
+        n_users (int): Liczba użytkowników (rozmiar pierwszego wymiaru macierzy)
+        n_types (int): Liczba typów zadań (rozmiar drugiego wymiaru macierzy)
+
+    Returns:
+        List[List[List[int]]]: Dla każdego przedziału macierz liczników [użytkownik][typ]
+    """
+    columns._ensure_sorted()
+    n_buckets = len(boundaries) - 1
+    if n_buckets <= 0:
+        return []
+
+    ordinals = [b.toordinal() for b in boundaries]
+    offsets = [bisect.bisect_left(columns.day, o) for o in ordinals]
+    lo, hi = offsets[0], offsets[-1]
+
+    if use_numpy() and n_users and n_types:
+        users = np.frombuffer(columns.user_idx, dtype=np.uint32)[lo:hi].astype(np.int64)
+        types = np.frombuffer(columns.type_idx, dtype=np.uint32)[lo:hi]
+        # Numer przedziału każdego wiersza wynika z pozycji (wiersze są posortowane po dniu)
+        buckets = np.repeat(np.arange(n_buckets, dtype=np.int64), np.diff(offsets))
+        flat = np.bincount((buckets * n_users + users) * n_types + types, minlength=n_buckets * n_users * n_types)
+        return flat.reshape(n_buckets, n_users, n_types).tolist()
+
+    result = []
+    for i in range(n_buckets):
+        matrix = [[0] * n_types for _ in range(n_users)]
+        a, b = offsets[i], offsets[i + 1]
+        # Counter po zip iteruje w C, bez pętli Pythona na każde zadanie
+        for (user, issue_type), count in Counter(zip(columns.user_idx[a:b], columns.type_idx[a:b])).items():
+            matrix[user][issue_type] = count
+        result.append(matrix)
+    return result
+
+
+def window_counts(columns: CompletionColumns, end_day: datetime.date, windows: Sequence[int], n_users: int,
+                  n_types: int) -> Dict[int, List[List[int]]]:
+    """
+    Zwraca macierze liczników [użytkownik][typ] dla kilku okien kończących się w end_day.
+    Wszystkie okna są liczone w jednym przebiegu (przedziały między kolejnymi oknami
+    są zliczane raz, a następnie sumowane narastająco).
+
+    Args:
+        columns (CompletionColumns): Kolumny ukończonych zadań
+        end_day (datetime.date): Ostatni dzień okien (włącznie)
+        windows (Sequence[int]): Długości okien w dniach (okno N obejmuje dni od end_day - N)
+        n_users (int): Liczba użytkowników
+        n_types (int): Liczba typów zadań
+
+    Returns:
+        Dict[int, List[List[int]]]: Macierz liczników dla każdego okna
+    """
+    ordered = sorted(set(windows), reverse=True)
+    boundaries = [end_day - datetime.timedelta(days=days) for days in ordered]
+    boundaries.append(end_day + datetime.timedelta(days=1))
+    buckets = bucket_counts(columns, boundaries, n_users, n_types)
+
+    result = {}
+    running = [[0] * n_types for _ in range(n_users)]
+    # Od najkrótszego okna do najdłuższego: każde kolejne to poprzednie plus starszy przedział
+    for days, matrix in zip(reversed(ordered), reversed(buckets)):
+        running = [[a + b for a, b in zip(row, add)] for row, add in zip(running, matrix)]
+        result[days] = running
+    return result
+
+
+def working_day_streaks(columns: CompletionColumns, end_day: datetime.date, n_users: int) -> List[int]:
+    """
+    Liczy dla każdego użytkownika serię kolejnych dni roboczych (pon-pt) z ukończonymi zadaniami,
+    kończącą się w end_day. Weekendy nie przerywają serii (praca w weekend ją wydłuża),
+    a dzisiejszy dzień bez zadań jeszcze jej nie kończy.
+
+    Args:
+        columns (CompletionColumns): Kolumny ukończonych zadań
+        end_day (datetime.date): Ostatni dzień serii
+        n_users (int): Liczba użytkowników
+
+    Returns:
+        List[int]: Długość serii dla każdego indeksu użytkownika
+    """
+    span = MAX_STREAK_DAYS
+    end_ordinal = end_day.toordinal()
+    lo, hi = columns.day_range(end_day - datetime.timedelta(days=span - 1), end_day)
+    # Kolumna i siatki to dzień end_day - i
+    is_weekday = [(end_day - datetime.timedelta(days=i)).weekday() < 5 for i in range(span)]
+    is_weekday[0] = False
+
+    if use_numpy():
+        if not n_users:
+            return []
+        grid = np.zeros((n_users, span), dtype=bool)
+        users = np.frombuffer(columns.user_idx, dtype=np.uint32)[lo:hi]
+        days_back = end_ordinal - np.frombuffer(columns.day, dtype=np.int32)[lo:hi]
+        grid[users, days_back] = True
+        breaks = ~grid & np.array(is_weekday)
+        first_break = np.where(breaks.any(axis=1), breaks.argmax(axis=1), span)
+        active_before = np.concatenate([np.zeros((n_users, 1), dtype=np.int64), np.cumsum(grid, axis=1)], axis=1)
+        return active_before[np.arange(n_users), first_break].tolist()
+
+    grid = [bytearray(span) for _ in range(n_users)]
+    for user, day in set(zip(columns.user_idx[lo:hi], columns.day[lo:hi])):
+        grid[user][end_ordinal - day] = 1
+    streaks = []
+    for row in grid:
+        streak = 0
+        for active, weekday in zip(row, is_weekday):
+            if active:
+                streak += 1
+            elif weekday:
+                break
+        streaks.append(streak)
+    return streaks
+
+
+def compute_insights(columns: CompletionColumns, end_day: datetime.date, days: int, n_users: int,
+                     n_types: int) -> Dict[int, Dict]:
+    """
+    Liczy rozszerzone statystyki tablicy wyników dla każdego użytkownika:
+    liczniki typów w oknie, zmianę tydzień do tygodnia i serię dni roboczych.
+
+    Args:
+        columns (CompletionColumns): Kolumny ukończonych zadań
+        end_day (datetime.date): Ostatni dzień okna
+        days (int): Długość okna tablicy wyników
+        n_users (int): Liczba użytkowników
+        n_types (int): Liczba typów zadań
+
+    Returns:
+        Dict[int, Dict]: Dla indeksu użytkownika: window (liczniki typów w oknie),
+            week_delta (ostatnie 7 dni minus poprzednie 7) i streak
+    """
+    # Okno N dni obejmuje dni od end_day - N do end_day, więc tydzień to okno 6 dni
+    counts = window_counts(columns, end_day, [days, 6, 13], n_users, n_types)
+    window, this_week, two_weeks = counts[days], counts[6], counts[13]
+    streaks = working_day_streaks(columns, end_day, n_users)
+
+    insights = {}
+    for user in range(n_users):
+        total = sum(window[user])
+        current = sum(this_week[user])
+        previous = sum(two_weeks[user]) - current
+        if not total and not current and not previous:
+            continue
+        insights[user] = {
+            "window": window[user],
+            "week_delta": current - previous,
+            "streak": streaks[user],
+        }
+    return insights
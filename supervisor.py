@@ -0,0 +1,167 @@
+# supervisor.py
+import asyncio
+import datetime
+import logging
+import time
+import traceback
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Opóźnienie ponownego uruchomienia po awarii: 5 s, 10 s, 20 s, ... maksymalnie 10 minut
+RESTART_BACKOFF_BASE = 5
+RESTART_BACKOFF_MAX = 600
+
+# Zadanie działające dłużej niż tyle sekund uznajemy za stabilne - licznik awarii jest zerowany
+STABLE_RUN_SECONDS = 300
+
+# Stany zadania w tle
+STATE_RUNNING = 'running'
+STATE_RESTARTING = 'restarting'
+STATE_STOPPED = 'stopped'
+STATE_CANCELLED = 'cancelled'
+
+
+class SupervisedTask:
+    """Zadanie w tle pilnowane przez Supervisor"""
+
+    def __init__(self, name: str, factory: Callable[[], Awaitable]):
+        self.name = name
+        self.factory = factory  # Tworzy nową korutynę przy każdym (ponownym) uruchomieniu
+        self.task: Optional[asyncio.Task] = None
+        self.state = STATE_STOPPED
+        self.started_at: Optional[datetime.datetime] = None
+        self.restarts = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[datetime.datetime] = None
+
+    def is_alive(self) -> bool:
+        """Czy zadanie (lub oczekiwanie na jego ponowne uruchomienie) nadal trwa"""
+        return self.task is not None and not self.task.done()
+
+
+class Supervisor:
+    """
+    Rejestr zadań w tle bota.
+
+    Każde zadanie jest uruchamiane dokładnie raz, nawet jeśli on_ready zostanie wywołane
+    ponownie po wznowieniu połączenia z Discordem. Zadanie zakończone wyjątkiem jest
+    uruchamiane ponownie z wykładniczo rosnącym opóźnieniem, a przy zamykaniu bota
+    wszystkie zadania są anulowane i dokańczane.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, SupervisedTask] = {}
+        self._closing = False
+
+    def start(self, name: str, factory: Callable[[], Awaitable]) -> bool:
+        """
+        Uruchamia zadanie w tle, jeśli nie działa jeszcze zadanie o tej nazwie.
+
+        Args:
+            name (str): Unikalna nazwa zadania
+            factory (Callable[[], Awaitable]): Funkcja tworząca korutynę zadania
+
+        Returns:
+            bool: True, jeśli zadanie zostało uruchomione; False, jeśli już działało
+        """
+        if self._closing:
+            logger.warning(f"Pominięto uruchomienie zadania {name} - bot jest zamykany")
+            return False
+
+        entry = self._tasks.get(name)
+        if entry is not None and entry.is_alive():
+            logger.info(f"Zadanie w tle {name} już działa - pomijam ponowne uruchomienie")
+            return False
+
+        entry = SupervisedTask(name, factory)
+        self._tasks[name] = entry
+        entry.task = asyncio.create_task(self._supervise(entry), name=f"supervised:{name}")
+        logger.info(f"Uruchomiono zadanie w tle {name}")
+        return True
+
+    async def _supervise(self, entry: SupervisedTask):
+        """Uruchamia zadanie i w razie awarii uruchamia je ponownie z opóźnieniem"""
+        while True:
+            entry.state = STATE_RUNNING
+            entry.started_at = datetime.datetime.now(datetime.timezone.utc)
+            started = time.monotonic()
+            try:
+                await entry.factory()
+                entry.state = STATE_STOPPED
+                logger.info(f"Zadanie w tle {entry.name} zakończyło się")
+                return
+            except asyncio.CancelledError:
+                entry.state = STATE_CANCELLED
+                raise
+            except Exception as e:
+                if time.monotonic() - started >= STABLE_RUN_SECONDS:
+                    entry.consecutive_failures = 0
+                entry.consecutive_failures += 1
+                entry.last_error = f"{type(e).__name__}: {e}"
+                entry.last_error_at = datetime.datetime.now(datetime.timezone.utc)
+                logger.error(f"Błąd w zadaniu w tle {entry.name}: {e}")
+                logger.error(traceback.format_exc())
+
+            delay = min(RESTART_BACKOFF_BASE * 2 ** (entry.consecutive_failures - 1), RESTART_BACKOFF_MAX)
+            entry.state = STATE_RESTARTING
+            logger.warning(f"Ponowne uruchomienie zadania {entry.name} za {delay} sekund "
+                           f"(awaria {entry.consecutive_failures} z rzędu)")
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                entry.state = STATE_CANCELLED
+                raise
+            entry.restarts += 1
+
+    def status(self) -> List[Dict]:
+        """
+        Zwraca stan zadań w tle.
+
+        Returns:
+            List[Dict]: Dla każdego zadania: name, state, started_at, restarts, last_error, last_error_at
+        """
+        return [
+            {
+                "name": entry.name,
+                "state": entry.state,
+                "started_at": entry.started_at.isoformat() if entry.started_at else None,
+                "restarts": entry.restarts,
+                "last_error": entry.last_error,
+                "last_error_at": entry.last_error_at.isoformat() if entry.last_error_at else None,
+            }
+            for entry in self._tasks.values()
+        ]
+
+    async def shutdown(self, timeout: float = 10.0):
+        """
+        Anuluje wszystkie zadania w tle i czeka na ich zakończenie.
+
+        Args:
+            timeout (float): Maksymalny czas oczekiwania w sekundach
+        """
+        self._closing = True
+        tasks = [entry.task for entry in self._tasks.values() if entry.is_alive()]
+        if not tasks:
+            return
+        logger.info(f"Zatrzymywanie zadań w tle ({len(tasks)})...")
+        for task in tasks:
+            task.cancel()
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            logger.warning(f"Nie zakończono {len(pending)} zadań w tle w ciągu {timeout} sekund")
+        else:
+            logger.info("Zadania w tle zostały zatrzymane")
+
+
+# Zmienne globalne
+_supervisor: Optional[Supervisor] = None
+
+
+def get_supervisor() -> Supervisor:
+    """Zwraca współdzielony rejestr zadań w tle"""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = Supervisor()
+    return _supervisor
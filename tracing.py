@@ -0,0 +1,346 @@
+# tracing.py
+import asyncio
+import datetime
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('WielkiInkwizytorFilipa')
+
+# Liczba ostatnich śladów (cykli pracy) przechowywanych w pamięci
+DEFAULT_TRACE_BUFFER_SIZE = 50
+
+# Liczba rodzajów etapów pokazywanych w podsumowaniu /perf
+TOP_SPANS = 10
+
+
+class Span:
+    """Etap cyklu (zapytanie do Jiry, renderowanie, wywołanie API Discorda) z czasem i atrybutami"""
+
+    __slots__ = ('index', 'name', 'parent', 'start', 'duration', 'attrs')
+
+    def __init__(self, index: int, name: str, parent: Optional[int], start: float, attrs: Dict):
+        self.index = index  # Pozycja etapu w śladzie
+        self.name = name
+        self.parent = parent  # Indeks etapu nadrzędnego w śladzie (None - etap główny)
+        self.start = start  # Sekundy od początku śladu
+        self.duration: Optional[float] = None
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Dodaje atrybuty etapu (np. rozmiary)"""
+        self.attrs.update(attrs)
+
+    def mark_error(self, message: str):
+        """Oznacza etap jako zakończony błędem"""
+        self.attrs["error"] = message[:200]
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "start_ms": round(self.start * 1000, 2),
+            "duration_ms": None if self.duration is None else round(self.duration * 1000, 2),
+            "attrs": self.attrs
+        }
+
+
+class _NullSpan:
+    """Etap poza śladem - atrybuty są pomijane"""
+
+    def set(self, **attrs):
+        pass
+
+    def mark_error(self, message: str):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """Ślad jednego cyklu pracy (aktualizacja bugów, raport, tablica wyników, komenda)"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name: str, attrs: Optional[Dict] = None):
+        self.id = next(self._ids)
+        self.name = name
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.duration: Optional[float] = None
+        self.status = 'ok'
+        self.error: Optional[str] = None
+        self.attrs = dict(attrs or {})
+        self.spans: List[Span] = []
+        self._start = time.perf_counter()
+        self._aggregates: Dict[str, Span] = {}
+        # Etapy z odpowiedzi Jiry są dopisywane z wątków asyncio.to_thread
+        self._lock = threading.Lock()
+
+    def set(self, **attrs):
+        """Dodaje atrybuty śladu (np. wynik cyklu)"""
+        self.attrs.update(attrs)
+
+    def mark_error(self, message: str):
+        """Oznacza cykl jako zakończony błędem (także gdy wyjątek został obsłużony)"""
+        self.status = 'error'
+        self.error = message[:200]
+
+    def elapsed(self) -> float:
+        """Zwraca liczbę sekund od początku śladu"""
+        return time.perf_counter() - self._start
+
+    def add_span(self, name: str, parent: Optional[int], start: float, attrs: Dict) -> Span:
+        """Dopisuje etap i zwraca go (czas trwania uzupełnia wywołujący)"""
+        with self._lock:
+            span = Span(len(self.spans), name, parent, start, attrs)
+            self.spans.append(span)
+        return span
+
+    def accumulate(self, name: str, duration: float, parent: Optional[int]):
+        """Dolicza czas do zbiorczego etapu (dla bardzo krótkich, licznych operacji jak mapowanie imion)"""
+        with self._lock:
+            span = self._aggregates.get(name)
+            if span is None:
+                span = Span(len(self.spans), name, parent, self.elapsed(), {"calls": 0})
+                span.duration = 0.0
+                self._aggregates[name] = span
+                self.spans.append(span)
+            span.duration += duration
+            span.attrs["calls"] += 1
+
+    def stage_totals(self) -> Dict[str, Dict]:
+        """
+        Zwraca łączny czas, liczbę i rozmiar etapów według rodzaju (jira, render, discord, name_mapping).
+        Etapy zagnieżdżone w etapie tego samego rodzaju nie są liczone podwójnie.
+
+        Returns:
+            Dict[str, Dict]: Rodzaj etapu -> {"seconds", "calls", "bytes"}
+        """
+        groups: Dict[str, Dict] = {}
+        for span in self.spans:
+            if span.duration is None:
+                continue
+            group_name = span.name.split('.')[0]
+            group = groups.setdefault(group_name, {"seconds": 0.0, "calls": 0, "bytes": 0})
+            group["bytes"] += span.attrs.get("bytes", 0)
+            if span.name == 'jira.page':
+                # Strony wyników liczą się jako żądania, ich czas zawiera już etap zapytania
+                group["calls"] += 1
+                continue
+            parent = self.spans[span.parent] if span.parent is not None else None
+            if parent is None or parent.name.split('.')[0] != group_name:
+                group["seconds"] += span.duration
+                if group_name != 'jira':
+                    group["calls"] += span.attrs.get("calls", 1)
+        return groups
+
+    def summary_line(self) -> str:
+        """
+        Zwraca jednoliniowe podsumowanie cyklu do logu: czas całkowity oraz łączny czas,
+        liczba i rozmiar etapów według rodzaju (jira, render, discord, name_mapping).
+
+        Returns:
+            str: Podsumowanie cyklu
+        """
+        parts = [f"Cykl {self.name}: {self.duration * 1000:.0f} ms, {self.status}"]
+        for group_name, group in self.stage_totals().items():
+            part = f"{group_name} {group['seconds'] * 1000:.0f} ms ×{group['calls']}"
+            if group["bytes"]:
+                part += f" {group['bytes'] / 1024:.1f} KiB"
+            parts.append(part)
+        if self.attrs.get("success") is False:
+            parts.append("zakończony niepowodzeniem")
+        if self.error:
+            parts.append(f"błąd: {self.error}")
+        return " | ".join(parts)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": None if self.duration is None else round(self.duration * 1000, 2),
+            "status": self.status,
+            "error": self.error,
+            "attrs": self.attrs,
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+
+class TraceBuffer:
+    """Bufor cykliczny ostatnich śladów"""
+
+    def __init__(self, size: int = DEFAULT_TRACE_BUFFER_SIZE):
+        self._traces: deque = deque(maxlen=max(1, size))
+
+    def add(self, trace: Trace):
+        self._traces.append(trace)
+
+    def traces(self) -> List[Trace]:
+        """Zwraca zapamiętane ślady od najstarszego"""
+        return list(self._traces)
+
+    def to_json(self) -> str:
+        """Eksportuje zapamiętane ślady jako JSON"""
+        return json.dumps([trace.to_dict() for trace in self.traces()], ensure_ascii=False, indent=2, default=str)
+
+    def summary(self) -> Dict:
+        """
+        Podsumowuje zapamiętane ślady: czasy cykli według nazwy i etapy, które zajęły najwięcej czasu.
+
+        Returns:
+            Dict: {"traces", "cycles": [...], "spans": [...]} (czasy w milisekundach)
+        """
+        traces = self.traces()
+        cycles: Dict[str, List[Trace]] = {}
+        for trace in traces:
+            cycles.setdefault(trace.name, []).append(trace)
+
+        cycle_rows = []
+        for name, runs in cycles.items():
+            durations = sorted(run.duration for run in runs if run.duration is not None)
+            cycle_rows.append({
+                "name": name,
+                "count": len(runs),
+                "errors": sum(1 for run in runs if run.status != 'ok' or run.attrs.get('success') is False),
+                "p50_ms": round(durations[len(durations) // 2] * 1000, 1) if durations else None,
+                "max_ms": round(durations[-1] * 1000, 1) if durations else None,
+                "last_ms": round(runs[-1].duration * 1000, 1) if runs[-1].duration is not None else None
+            })
+        cycle_rows.sort(key=lambda row: row["max_ms"] or 0, reverse=True)
+
+        spans: Dict[str, Dict] = {}
+        for trace in traces:
+            for span in trace.spans:
+                if span.duration is None:
+                    continue
+                row = spans.setdefault(span.name, {"name": span.name, "count": 0, "total_ms": 0.0,
+                                                   "max_ms": 0.0, "bytes": 0})
+                row["count"] += span.attrs.get("calls", 1)
+                row["total_ms"] += span.duration * 1000
+                row["max_ms"] = max(row["max_ms"], span.duration * 1000)
+                row["bytes"] += span.attrs.get("bytes", 0)
+        span_rows = sorted(spans.values(), key=lambda row: row["total_ms"], reverse=True)[:TOP_SPANS]
+        for row in span_rows:
+            row["total_ms"] = round(row["total_ms"], 1)
+            row["max_ms"] = round(row["max_ms"], 1)
+
+        return {"traces": len(traces), "cycles": cycle_rows, "spans": span_rows}
+
+
+# Zmienne globalne
+_trace_buffer: Optional[TraceBuffer] = None
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+_current_span: ContextVar[Optional[int]] = ContextVar('current_span', default=None)
+
+
+def get_trace_buffer() -> TraceBuffer:
+    """
+    Zwraca współdzielony bufor ostatnich śladów. Przy pierwszym wywołaniu tworzy go
+    z rozmiarem z ustawienia TRACE_BUFFER_SIZE.
+
+    Returns:
+        TraceBuffer: Bufor śladów
+    """
+    global _trace_buffer
+    if _trace_buffer is None:
+        _trace_buffer = TraceBuffer(int(os.getenv('TRACE_BUFFER_SIZE', str(DEFAULT_TRACE_BUFFER_SIZE))))
+    return _trace_buffer
+
+
+def current_trace() -> Optional[Trace]:
+    """Zwraca ślad bieżącego cyklu lub None"""
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str, **attrs):
+    """
+    Rejestruje blok with jako ślad cyklu pracy i po zakończeniu zapisuje go w buforze.
+    Wewnątrz istniejącego śladu blok staje się zwykłym etapem.
+
+    Args:
+        name (str): Nazwa cyklu, np. 'bugs_update' lub 'command:leaderboard'
+        **attrs: Atrybuty śladu
+    """
+    if _current_trace.get() is not None:
+        with span(name, **attrs) as nested:
+            yield nested
+        return
+
+    trace = Trace(name, attrs)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    except asyncio.CancelledError:
+        trace.status = 'cancelled'
+        raise
+    except Exception as e:
+        trace.mark_error(str(e))
+        raise
+    finally:
+        trace.duration = trace.elapsed()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        get_trace_buffer().add(trace)
+        # Jeden wpis na cykl zamiast komunikatów z każdego etapu
+        failed = trace.status != 'ok' or trace.attrs.get("success") is False
+        logger.log(logging.WARNING if failed else logging.INFO, trace.summary_line())
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Mierzy etap bieżącego cyklu. Poza śladem nic nie rejestruje.
+
+    Args:
+        name (str): Nazwa etapu, np. 'render.bugs_board' lub 'discord.edit'
+        **attrs: Atrybuty etapu (rozmiary, identyfikatory)
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NULL_SPAN
+        return
+
+    current = trace.add_span(name, _current_span.get(), trace.elapsed(), attrs)
+    token = _current_span.set(current.index)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        current.duration = trace.elapsed() - current.start
+        _current_span.reset(token)
+
+
+def record_span(name: str, duration: float, **attrs):
+    """
+    Dopisuje do bieżącego śladu etap, który właśnie się zakończył (np. z hooka odpowiedzi HTTP).
+
+    Args:
+        name (str): Nazwa etapu
+        duration (float): Czas trwania w sekundach
+        **attrs: Atrybuty etapu
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    completed = trace.add_span(name, _current_span.get(), max(0.0, trace.elapsed() - duration), attrs)
+    completed.duration = duration
+
+
+def accumulate(name: str, duration: float):
+    """Dolicza czas krótkiej operacji do zbiorczego etapu bieżącego śladu"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.accumulate(name, duration, _current_span.get())